@@ -0,0 +1,37 @@
+{#
+    dbt_utils.star without the warehouse round-trip: the column list of the
+    relation comes from column_cache() (macros/column_cache.sql, generated by
+    scripts/refresh_column_cache.py from target/catalog.json) instead of a
+    live lookup, so compiling obt_sales makes no metadata calls to Athena/Glue.
+
+    Each cached entry keeps the checksum of the model file it was read from. If
+    the model changed since (or is not cached), the columns are looked up live
+    as dbt_utils.star does, with a warning to refresh the cache.
+#}
+{% macro relation_columns(relation) -%}
+    {%- set nodes = graph.nodes.values() | selectattr('resource_type', 'equalto', 'model')
+                                          | selectattr('alias', 'equalto', relation.identifier) | list -%}
+    {%- set cached = column_cache().get(relation.identifier) -%}
+    {%- if cached and nodes and cached['checksum'] == nodes[0]['checksum']['checksum'] -%}
+        {{ return(cached['columns']) }}
+    {%- endif -%}
+    {%- do log("column_cache: " ~ relation.identifier ~ " is " ~ ('stale' if cached else 'not cached')
+               ~ ", looking up its columns (refresh with scripts/refresh_column_cache.py)", info=true) -%}
+    {{ return(adapter.get_columns_in_relation(relation) | map(attribute='name') | list) }}
+{%- endmacro %}
+
+{% macro cached_star(from, relation_alias=none, except=[]) -%}
+    {#- Nothing to resolve while parsing -#}
+    {%- if not execute -%}
+        {{ return('*') }}
+    {%- endif -%}
+    {%- set except = except | map('lower') | list -%}
+    {%- set columns = [] -%}
+    {%- for column in relation_columns(from) if column | lower not in except -%}
+        {%- do columns.append((relation_alias ~ '.' if relation_alias else '') ~ adapter.quote(column) | trim) -%}
+    {%- endfor -%}
+    {%- if not columns -%}
+        {{ exceptions.raise_compiler_error("cached_star: no columns left in " ~ from ~ " after except") }}
+    {%- endif -%}
+    {{ return(columns | join(',\n    ')) }}
+{%- endmacro %}
@@ -0,0 +1,15 @@
+{#
+    Cast to timestamp that works on every target.
+    Iceberg tables in Athena only accept microsecond precision: timestamp(6).
+#}
+{% macro cast_timestamp(expression) -%}
+    {{ return(adapter.dispatch('cast_timestamp')(expression)) }}
+{%- endmacro %}
+
+{% macro default__cast_timestamp(expression) -%}
+    cast({{ expression }} as timestamp)
+{%- endmacro %}
+
+{% macro athena__cast_timestamp(expression) -%}
+    cast({{ expression }} as timestamp(6))
+{%- endmacro %}
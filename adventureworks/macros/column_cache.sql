@@ -0,0 +1,66 @@
+{#
+    Generated by scripts/refresh_column_cache.py from target/catalog.json: do not edit.
+    Columns of each model (in table order) and the checksum of the model file they
+    were read from, for cached_star.
+#}
+
+{% macro column_cache() %}
+{{ return({
+    "agg_sales_customer": {
+        "checksum": "b293fc0dc18283ed401c59d99aff1afa70a8b3f57e253d249a0a90d6091998ad",
+        "columns": ["customerid", "fullname", "storename", "items", "orders", "orderqty", "unitprice_sum", "revenue"]
+    },
+    "agg_sales_daily_product": {
+        "checksum": "19372f5e5172b353619d1957316bc706e7b56b6c547ccb11fbf9a4038f842c94",
+        "columns": ["date_day", "productid", "product_name", "product_subcategory_name", "product_category_name", "items", "orders", "orderqty", "unitprice_sum", "revenue"]
+    },
+    "agg_sales_daily_status": {
+        "checksum": "4e964ad58e3056ddb8e874b2412229c9368fd1920775a8a9e486e0284661a510",
+        "columns": ["date_day", "day_of_week", "day_of_week_name", "order_status_name", "cardtype", "items", "orders", "orderqty", "unitprice_sum", "revenue"]
+    },
+    "agg_sales_monthly_category": {
+        "checksum": "d3d8d76871b0a078402654c6753c779bb2a4edc94dfb7e2b090166b499653f9d",
+        "columns": ["order_year", "order_quarter", "order_month", "product_category_name", "items", "orders", "orderqty", "unitprice_sum", "revenue"]
+    },
+    "agg_sales_monthly_country": {
+        "checksum": "6a159443bbbfb0dde82677457104f57a23f2bac44d85b64115eff9610691bc3c",
+        "columns": ["order_year", "order_quarter", "order_month", "country_name", "items", "orders", "orderqty", "unitprice_sum", "revenue"]
+    },
+    "dim_address": {
+        "checksum": "5ac929196f7bdd719e6db06e131de6755eac8a2495bef6bf3749b8d6cecd9541",
+        "columns": ["address_key", "addressid", "city_name", "state_name", "country_name", "modifieddate"]
+    },
+    "dim_credit_card": {
+        "checksum": "27b21c70deddaa20533876c5c8795c69a41cef14a8a5cbe1611c03fb67c0a531",
+        "columns": ["creditcard_key", "creditcardid", "cardtype", "modifieddate"]
+    },
+    "dim_customer": {
+        "checksum": "8458561190fdced84d59975bb60adf2cf615811e1ca501b761a0b1b9fee98c4e",
+        "columns": ["customer_key", "customerid", "businessentityid", "fullname", "storebusinessentityid", "storename", "valid_from", "valid_to", "modifieddate"]
+    },
+    "dim_date": {
+        "checksum": "9bc42e442b25b3fa771dfd330bd5a443c996d61685cf58ec22502e7698e83461",
+        "columns": ["date_key", "date_day", "prior_date_day", "next_date_day", "prior_year_date_day", "prior_year_over_year_date_day", "day_of_week", "day_of_week_name", "day_of_month", "day_of_year"]
+    },
+    "dim_order_status": {
+        "checksum": "cd05db8353877f418cd7902a95483ca7e926d79e54d40111d0efc754a05844b7",
+        "columns": ["order_status_key", "order_status", "order_status_name"]
+    },
+    "dim_product": {
+        "checksum": "7b879dc6b501f8c469ffd9fe206490a3c686956a8fc4a2223a98020f6339b659",
+        "columns": ["product_key", "productid", "product_name", "productnumber", "color", "class", "product_subcategory_name", "product_category_name", "valid_from", "valid_to", "modifieddate"]
+    },
+    "fct_sales": {
+        "checksum": "8d26f5e4bf880879e44da9f93fa44e632523af15010f2e1e4dee7a623ca627f6",
+        "columns": ["sales_key", "product_key", "customer_key", "creditcard_key", "ship_address_key", "order_status_key", "order_date_key", "salesorderid", "salesorderdetailid", "orderdate", "unitprice", "orderqty", "revenue", "modifieddate"]
+    },
+    "obt_sales": {
+        "checksum": "c610d58f824a194b1ba372cf23e4b74593469f349fbf52a73fbd8bc04e0aaa80",
+        "columns": ["sales_key", "salesorderid", "salesorderdetailid", "orderdate", "unitprice", "orderqty", "revenue", "modifieddate", "productid", "product_name", "productnumber", "color", "class", "product_subcategory_name", "product_category_name", "customerid", "businessentityid", "fullname", "storebusinessentityid", "storename", "creditcardid", "cardtype", "addressid", "city_name", "state_name", "country_name", "order_status", "order_status_name", "date_day", "prior_date_day", "next_date_day", "prior_year_date_day", "prior_year_over_year_date_day", "day_of_week", "day_of_week_name", "day_of_month", "day_of_year", "product_modifieddate", "customer_modifieddate", "creditcard_modifieddate", "ship_address_modifieddate"]
+    },
+    "stg_salesorderheader": {
+        "checksum": "0865df3997efd07c28dc83443193d2b5bfff10f9e43c0a2005dd20cc5d6239bb",
+        "columns": ["salesorderid", "customerid", "creditcardid", "shiptoaddressid", "order_status", "orderdate", "modifieddate"]
+    }
+}) }}
+{% endmacro %}
@@ -0,0 +1,7 @@
+{#
+    Highest value already loaded in an incremental model, for filtering new rows.
+    Falls back to a very old timestamp if the column has no values yet.
+#}
+{% macro incremental_watermark(column='modifieddate') -%}
+    (select coalesce(max({{ column }}), {{ cast_timestamp("'1900-01-01 00:00:00'") }}) from {{ this }})
+{%- endmacro %}
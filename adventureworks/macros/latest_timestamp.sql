@@ -0,0 +1,11 @@
+{#
+    Latest of several timestamp columns, ignoring nulls (Athena's greatest
+    returns null if any argument is null). Used to track when a row last changed.
+#}
+{% macro latest_timestamp(columns) -%}
+    greatest(
+        {%- for column in columns %}
+        coalesce({{ cast_timestamp(column) }}, {{ cast_timestamp("'1900-01-01 00:00:00'") }}){{ ',' if not loop.last }}
+        {%- endfor %}
+    )
+{%- endmacro %}
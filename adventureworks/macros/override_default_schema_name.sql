@@ -1,10 +1,14 @@
 {% macro generate_schema_name(custom_schema_name, node) -%}
     {%- set default_schema = target.schema -%}
-    
-    {%- if custom_schema_name is none -%}
+
+    {#- Outside Athena the seeds are loaded by dbt: they go to the schema the raw source reads from -#}
+    {%- if node is not none and node.resource_type == 'seed' and target.type != 'athena' -%}
+        {{ var('raw_schema') }}
+    {#- CI targets (*_ci) build everything in their own schema, never in the production one -#}
+    {%- elif custom_schema_name is none or target.name.endswith('_ci') -%}
         {{ default_schema }}
     {%- else -%}
         {{ custom_schema_name | trim }}
     {%- endif -%}
 
-{%- endmacro %}
\ No newline at end of file
+{%- endmacro %}
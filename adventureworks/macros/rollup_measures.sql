@@ -0,0 +1,21 @@
+{#
+    Measures shared by the agg_sales_* rollups, with the fct_sales expression each
+    one is computed from. All of them can be summed to a coarser grain except
+    orders (count distinct salesorderid): it can only be summed over order-level
+    columns (date, address, customer, status), never over product columns.
+#}
+{% macro rollup_measure_definitions() -%}
+    {{ return({
+        'items': 'count(*)',
+        'orders': 'count(distinct salesorderid)',
+        'orderqty': 'sum(orderqty)',
+        'unitprice_sum': 'sum(unitprice)',
+        'revenue': 'sum(revenue)'
+    }) }}
+{%- endmacro %}
+
+{% macro rollup_measures() -%}
+    {%- for name, expression in rollup_measure_definitions().items() %}
+    {{ expression }} as {{ name }}{{ ',' if not loop.last }}
+    {%- endfor %}
+{%- endmacro %}
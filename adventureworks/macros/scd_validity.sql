@@ -0,0 +1,17 @@
+{#
+    Validity range of a snapshot version, for point-in-time joins:
+    valid_from <= t < valid_to. The first version of each key is valid since
+    1900-01-01, so that facts older than the first snapshot still find it, and
+    the current one until 9999-12-31 instead of null.
+#}
+{% macro scd_valid_from(unique_key) -%}
+    case
+        when dbt_valid_from = min(dbt_valid_from) over (partition by {{ unique_key }})
+            then {{ cast_timestamp("'1900-01-01 00:00:00'") }}
+        else {{ cast_timestamp('dbt_valid_from') }}
+    end
+{%- endmacro %}
+
+{% macro scd_valid_to() -%}
+    coalesce({{ cast_timestamp('dbt_valid_to') }}, {{ cast_timestamp("'9999-12-31 00:00:00'") }})
+{%- endmacro %}
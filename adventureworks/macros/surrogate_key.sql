@@ -0,0 +1,64 @@
+{#
+    Surrogate keys for the marts.
+
+    surrogate_key_type selects the key format: the `surrogate_key_type` config of
+    the model, or else the `surrogate_key_type` var.
+      - integer: 64-bit integer (bigint) taken from the first 8 bytes of the MD5
+        of the fields. Same value on every adapter, and cheaper to store and join.
+      - md5: the 32-character hex string of dbt_utils.generate_surrogate_key.
+
+    Both formats hash the same string, so an integer key is the first 16 hex
+    digits of its md5 key read as a signed bigint. Models joined on a key
+    (e.g. fct_sales and its dimensions) must use the same format, and incremental
+    models need --full-refresh after switching.
+#}
+{% macro surrogate_key_type() -%}
+    {%- set key_type = config.get('surrogate_key_type') or var('surrogate_key_type') -%}
+    {%- if key_type not in ('integer', 'md5') -%}
+        {{ exceptions.raise_compiler_error("surrogate_key_type must be 'integer' or 'md5', got '" ~ key_type ~ "'") }}
+    {%- endif -%}
+    {{ return(key_type) }}
+{%- endmacro %}
+
+{% macro surrogate_key(field_list) -%}
+    {%- if surrogate_key_type() == 'md5' -%}
+        {{ dbt_utils.generate_surrogate_key(field_list) }}
+    {%- else -%}
+        {#- Same string as dbt_utils.generate_surrogate_key hashes -#}
+        {%- set fields = [] -%}
+        {%- for field in field_list -%}
+            {%- do fields.append("coalesce(cast(" ~ field ~ " as " ~ dbt.type_string() ~ "), '_dbt_utils_surrogate_key_null_')") -%}
+            {%- if not loop.last %}{%- do fields.append("'-'") -%}{%- endif -%}
+        {%- endfor -%}
+        {{ hash_bigint(dbt.concat(fields)) }}
+    {%- endif -%}
+{%- endmacro %}
+
+{#- Signed bigint from the first 8 bytes of md5(expression) -#}
+{% macro hash_bigint(expression) -%}
+    {{ return(adapter.dispatch('hash_bigint')(expression)) }}
+{%- endmacro %}
+
+{% macro default__hash_bigint(expression) -%}
+    cast(cast('x' || substr(md5({{ expression }}), 1, 16) as bit(64)) as bigint)
+{%- endmacro %}
+
+{% macro duckdb__hash_bigint(expression) -%}
+    cast(cast(cast('0x' || substr(md5({{ expression }}), 1, 16) as ubigint) as bit) as bigint)
+{%- endmacro %}
+
+{% macro athena__hash_bigint(expression) -%}
+    from_big_endian_64(substr(md5(to_utf8({{ expression }})), 1, 8))
+{%- endmacro %}
+
+{#
+    Key of dim_date: yyyymmdd smart key (e.g. 20110531) with integer keys,
+    md5 of the date otherwise.
+#}
+{% macro date_key(column) -%}
+    {%- if surrogate_key_type() == 'md5' -%}
+        {{ dbt_utils.generate_surrogate_key([column]) }}
+    {%- else -%}
+        cast(extract(year from {{ column }}) * 10000 + extract(month from {{ column }}) * 100 + extract(day from {{ column }}) as integer)
+    {%- endif -%}
+{%- endmacro %}
@@ -0,0 +1,14 @@
+{#
+    Bernoulli sample of a table, appended right after the relation in a from clause.
+#}
+{% macro table_sample(percent) -%}
+    {{ return(adapter.dispatch('table_sample')(percent)) }}
+{%- endmacro %}
+
+{% macro default__table_sample(percent) -%}
+    tablesample bernoulli ({{ percent }})
+{%- endmacro %}
+
+{% macro duckdb__table_sample(percent) -%}
+    tablesample {{ percent }} percent (bernoulli)
+{%- endmacro %}
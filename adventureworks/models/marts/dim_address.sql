@@ -1,24 +1,30 @@
+{{
+    config(
+        bucketed_by=['address_key'],
+        bucket_count=var('athena_bucket_count'),
+        indexes=[{'columns': ['address_key'], 'unique': true}]
+    )
+}}
+
 with stg_address as (
-    select *
-    from {{ source('raw', 'address') }}
+    select * from {{ ref('stg_address') }}
 ),
 
 stg_stateprovince as (
-    select *
-    from {{ source('raw', 'stateprovince') }}
+    select * from {{ ref('stg_stateprovince') }}
 ),
 
 stg_countryregion as (
-    select *
-    from {{ source('raw', 'countryregion') }}
+    select * from {{ ref('stg_countryregion') }}
 )
 
 select
-    {{ dbt_utils.generate_surrogate_key(['stg_address.addressid']) }} as address_key,
+    {{ surrogate_key(['stg_address.addressid']) }} as address_key,
     stg_address.addressid,
     stg_address.city as city_name,
     stg_stateprovince.name as state_name,
-    stg_countryregion.name as country_name
+    stg_countryregion.name as country_name,
+    {{ latest_timestamp(['stg_address.modifieddate', 'stg_stateprovince.modifieddate', 'stg_countryregion.modifieddate']) }} as modifieddate
 from stg_address
 left join stg_stateprovince on stg_address.stateprovinceid = stg_stateprovince.stateprovinceid
 left join stg_countryregion on stg_stateprovince.countryregioncode = stg_countryregion.countryregioncode
@@ -1,17 +1,23 @@
-with stg_salesorderheader as (
-    select distinct creditcardid
-    from {{ source('raw', 'salesorderheader') }}
-    where creditcardid is not null
+{{
+    config(
+        bucketed_by=['creditcard_key'],
+        bucket_count=var('athena_bucket_count'),
+        indexes=[{'columns': ['creditcard_key'], 'unique': true}]
+    )
+}}
+
+with order_credit_cards as (
+    select * from {{ ref('stg_salesorderheader_creditcard') }}
 ),
 
 stg_creditcard as (
-    select *
-    from {{ source('raw', 'creditcard') }}
+    select * from {{ ref('stg_creditcard') }}
 )
 
 select
-    {{ dbt_utils.generate_surrogate_key(['stg_salesorderheader.creditcardid']) }} as creditcard_key,
-    stg_salesorderheader.creditcardid,
-    stg_creditcard.cardtype
-from stg_salesorderheader
-left join stg_creditcard on stg_salesorderheader.creditcardid = stg_creditcard.creditcardid
+    {{ surrogate_key(['order_credit_cards.creditcardid']) }} as creditcard_key,
+    order_credit_cards.creditcardid,
+    stg_creditcard.cardtype,
+    stg_creditcard.modifieddate
+from order_credit_cards
+left join stg_creditcard on order_credit_cards.creditcardid = stg_creditcard.creditcardid
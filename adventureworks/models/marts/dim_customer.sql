@@ -1,32 +1,28 @@
-with stg_customer as (
-    select
-        customerid,
-        try_cast(personid as bigint) as personid,
-        storeid
-    from {{ source('raw', 'customer') }}
-),
+{{
+    config(
+        bucketed_by=['customer_key'],
+        bucket_count=var('athena_bucket_count'),
+        indexes=[
+            {'columns': ['customer_key'], 'unique': true},
+            {'columns': ['customerid', 'valid_from', 'valid_to']}
+        ]
+    )
+}}
 
-stg_person as (
-    select
-        businessentityid,
-        concat(coalesce(firstname, ''), ' ', coalesce(middlename, ''), ' ', coalesce(lastname, '')) as fullname
-    from {{ source('raw', 'person') }}
-),
-
-stg_store as (
-    select
-        businessentityid as storebusinessentityid,
-        storename
-    from {{ source('raw', 'store') }}
+-- One row per version of each customer (type 2, from snap_customer):
+-- fct_sales takes the version valid on the order date
+with snap_customer as (
+    select * from {{ ref('snap_customer') }}
 )
 
 select
-    {{ dbt_utils.generate_surrogate_key(['stg_customer.customerid']) }} as customer_key,
-    stg_customer.customerid,
-    stg_person.businessentityid,
-    stg_person.fullname,
-    stg_store.storebusinessentityid,
-    stg_store.storename
-from stg_customer
-left join stg_person on stg_customer.personid = stg_person.businessentityid
-left join stg_store on stg_customer.storeid = stg_store.storebusinessentityid
+    {{ surrogate_key(['customerid', 'dbt_valid_from']) }} as customer_key,
+    customerid,
+    businessentityid,
+    fullname,
+    storebusinessentityid,
+    storename,
+    {{ scd_valid_from('customerid') }} as valid_from,
+    {{ scd_valid_to() }} as valid_to,
+    modifieddate
+from snap_customer
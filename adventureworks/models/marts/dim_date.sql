@@ -1,8 +1,14 @@
+{{
+    config(
+        indexes=[{'columns': ['date_key'], 'unique': true}]
+    )
+}}
+
 with stg_date as (
-    select * from {{ source('raw', 'date') }}
+    select * from {{ ref('stg_date') }}
 )
 
 select
-    {{ dbt_utils.generate_surrogate_key(['stg_date.date_day']) }} as date_key,
+    {{ date_key('stg_date.date_day') }} as date_key,
     *
 from stg_date
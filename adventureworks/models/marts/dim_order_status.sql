@@ -1,19 +1,19 @@
+{{
+    config(
+        indexes=[{'columns': ['order_status_key'], 'unique': true}]
+    )
+}}
+
+-- The status codes come from a static seed: no scan of salesorderheader
 with stg_order_status as (
-    select distinct status as order_status
-    from
-        {{ source('raw', 'salesorderheader') }}
+    select
+        status as order_status,
+        name as order_status_name
+    from {{ ref('stg_orderstatus') }}
 )
 
 select
-    {{ dbt_utils.generate_surrogate_key(['stg_order_status.order_status']) }} as order_status_key,
+    {{ surrogate_key(['stg_order_status.order_status']) }} as order_status_key,
     order_status,
-    case
-        when order_status = 1 then 'in_process'
-        when order_status = 2 then 'approved'
-        when order_status = 3 then 'backordered'
-        when order_status = 4 then 'rejected'
-        when order_status = 5 then 'shipped'
-        when order_status = 6 then 'cancelled'
-        else 'no_status'
-    end as order_status_name
+    order_status_name
 from stg_order_status
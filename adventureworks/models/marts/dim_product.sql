@@ -1,38 +1,30 @@
-with stg_product as (
-    select 
-        productid,
-        cast(name as varchar) as name,
-        productnumber,
-        color,
-        class,
-        try_cast(productsubcategoryid as bigint) as productsubcategoryid
-    from {{ source('raw', 'product') }}
-),
+{{
+    config(
+        bucketed_by=['product_key'],
+        bucket_count=var('athena_bucket_count'),
+        indexes=[
+            {'columns': ['product_key'], 'unique': true},
+            {'columns': ['productid', 'valid_from', 'valid_to']}
+        ]
+    )
+}}
 
-stg_product_subcategory as (
-    select 
-        productsubcategoryid,
-        productcategoryid,
-        cast(name as varchar) as name
-    from {{ source('raw', 'productsubcategory') }}
-),
-
-stg_product_category as (
-    select
-        productcategoryid,
-        name
-    from {{ source('raw', 'productcategory') }}
+-- One row per version of each product (type 2, from snap_product):
+-- fct_sales takes the version valid on the order date
+with snap_product as (
+    select * from {{ ref('snap_product') }}
 )
 
 select
-    {{ dbt_utils.generate_surrogate_key(['stg_product.productid']) }} as product_key,
-    stg_product.productid,
-    stg_product.name as product_name,
-    stg_product.productnumber,
-    stg_product.color,
-    stg_product.class,
-    stg_product_subcategory.name as product_subcategory_name,
-    stg_product_category.name as product_category_name
-from stg_product
-left join stg_product_subcategory on stg_product.productsubcategoryid = stg_product_subcategory.productsubcategoryid
-left join stg_product_category on stg_product_subcategory.productcategoryid = stg_product_category.productcategoryid
+    {{ surrogate_key(['productid', 'dbt_valid_from']) }} as product_key,
+    productid,
+    product_name,
+    productnumber,
+    color,
+    class,
+    product_subcategory_name,
+    product_category_name,
+    {{ scd_valid_from('productid') }} as valid_from,
+    {{ scd_valid_to() }} as valid_to,
+    modifieddate
+from snap_product
@@ -1,37 +1,70 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='sales_key',
+        incremental_strategy='merge' if target.type == 'athena' else 'delete+insert',
+        table_type='iceberg' if target.type == 'athena' else none,
+        s3_data_naming='schema_table_unique' if target.type == 'athena' else none,
+        partitioned_by=['month(orderdate)'] if target.type == 'athena' else none,
+        indexes=[
+            {'columns': ['sales_key'], 'unique': true},
+            {'columns': ['orderdate']},
+            {'columns': ['product_key']},
+            {'columns': ['customer_key']}
+        ],
+        on_schema_change='append_new_columns'
+    )
+}}
+
 with stg_salesorderheader as (
-    select
-        salesorderid,
-        customerid,
-        creditcardid,
-        shiptoaddressid,
-        status as order_status,
-        cast(orderdate as date) as orderdate
-    from {{ source('raw', 'salesorderheader') }}
+    select * from {{ ref('stg_salesorderheader') }}
 ),
 
 stg_salesorderdetail as (
     select
-        salesorderid,
-        salesorderdetailid,
-        productid,
-        orderqty,
-        unitprice,
+        *,
         unitprice * orderqty as revenue
-    from {{ source('raw', 'salesorderdetail') }}
+    from {{ ref('stg_salesorderdetail') }}
+),
+
+-- Versions of the type 2 dimensions, looked up by natural key and order date
+d_product as (
+    select product_key, productid, valid_from, valid_to from {{ ref('dim_product') }}
+),
+
+d_customer as (
+    select customer_key, customerid, valid_from, valid_to from {{ ref('dim_customer') }}
 )
 
 select
-    {{ dbt_utils.generate_surrogate_key(['stg_salesorderdetail.salesorderid', 'salesorderdetailid']) }} as sales_key,
-    {{ dbt_utils.generate_surrogate_key(['productid']) }} as product_key,
-    {{ dbt_utils.generate_surrogate_key(['customerid']) }} as customer_key,
-    {{ dbt_utils.generate_surrogate_key(['creditcardid']) }} as creditcard_key,
-    {{ dbt_utils.generate_surrogate_key(['shiptoaddressid']) }} as ship_address_key,
-    {{ dbt_utils.generate_surrogate_key(['order_status']) }} as order_status_key,
-    {{ dbt_utils.generate_surrogate_key(['orderdate']) }} as order_date_key,
+    {{ surrogate_key(['stg_salesorderdetail.salesorderid', 'salesorderdetailid']) }} as sales_key,
+    d_product.product_key,
+    d_customer.customer_key,
+    {{ surrogate_key(['creditcardid']) }} as creditcard_key,
+    {{ surrogate_key(['shiptoaddressid']) }} as ship_address_key,
+    {{ surrogate_key(['order_status']) }} as order_status_key,
+    {{ date_key('orderdate') }} as order_date_key,
     stg_salesorderdetail.salesorderid,
     stg_salesorderdetail.salesorderdetailid,
+    stg_salesorderheader.orderdate,
     stg_salesorderdetail.unitprice,
     stg_salesorderdetail.orderqty,
-    stg_salesorderdetail.revenue
+    stg_salesorderdetail.revenue,
+    {{ latest_timestamp(['stg_salesorderheader.modifieddate', 'stg_salesorderdetail.modifieddate']) }} as modifieddate
 from stg_salesorderdetail
 inner join stg_salesorderheader on stg_salesorderdetail.salesorderid = stg_salesorderheader.salesorderid
+-- Point-in-time lookup: equi-join on the natural key, then the version whose range holds orderdate
+left join d_product
+    on stg_salesorderdetail.productid = d_product.productid
+    and stg_salesorderheader.orderdate >= d_product.valid_from
+    and stg_salesorderheader.orderdate < d_product.valid_to
+left join d_customer
+    on stg_salesorderheader.customerid = d_customer.customerid
+    and stg_salesorderheader.orderdate >= d_customer.valid_from
+    and stg_salesorderheader.orderdate < d_customer.valid_to
+{% if is_incremental() %}
+-- Only order lines whose header or detail changed since the last load.
+-- >= re-processes the rows of the last timestamp; the merge on sales_key keeps it idempotent.
+where stg_salesorderheader.modifieddate >= {{ incremental_watermark() }}
+    or stg_salesorderdetail.modifieddate >= {{ incremental_watermark() }}
+{% endif %}
@@ -1,5 +1,43 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='sales_key',
+        incremental_strategy='merge' if target.type == 'athena' else 'delete+insert',
+        table_type='iceberg' if target.type == 'athena' else none,
+        s3_data_naming='schema_table_unique' if target.type == 'athena' else none,
+        partitioned_by=['month(orderdate)'] if target.type == 'athena' else none,
+        indexes=[
+            {'columns': ['sales_key'], 'unique': true},
+            {'columns': ['orderdate']}
+        ],
+        on_schema_change='append_new_columns'
+    )
+}}
+
 with f_sales as (
     select * from {{ ref('fct_sales') }}
+    {% if is_incremental() %}
+    -- Sales whose fact row changed, or that point to a dimension row that changed,
+    -- since the last load (tracked through the surrogate keys). Each source keeps
+    -- its own watermark: their modifieddates are not comparable with each other.
+    where modifieddate >= {{ incremental_watermark('modifieddate') }}
+        or product_key in (
+            select product_key from {{ ref('dim_product') }}
+            where modifieddate >= {{ incremental_watermark('product_modifieddate') }}
+        )
+        or customer_key in (
+            select customer_key from {{ ref('dim_customer') }}
+            where modifieddate >= {{ incremental_watermark('customer_modifieddate') }}
+        )
+        or creditcard_key in (
+            select creditcard_key from {{ ref('dim_credit_card') }}
+            where modifieddate >= {{ incremental_watermark('creditcard_modifieddate') }}
+        )
+        or ship_address_key in (
+            select address_key from {{ ref('dim_address') }}
+            where modifieddate >= {{ incremental_watermark('ship_address_modifieddate') }}
+        )
+    {% endif %}
 ),
 
 d_customer as (
@@ -27,15 +65,19 @@ d_date as (
 )
 
 select
-    {{ dbt_utils.star(from=ref('fct_sales'), relation_alias='f_sales', except=[
+    {{ cached_star(from=ref('fct_sales'), relation_alias='f_sales', except=[
         "product_key", "customer_key", "creditcard_key", "ship_address_key", "order_status_key", "order_date_key"
     ]) }},
-    {{ dbt_utils.star(from=ref('dim_product'), relation_alias='d_product', except=["product_key"]) }},
-    {{ dbt_utils.star(from=ref('dim_customer'), relation_alias='d_customer', except=["customer_key"]) }},
-    {{ dbt_utils.star(from=ref('dim_credit_card'), relation_alias='d_credit_card', except=["creditcard_key"]) }},
-    {{ dbt_utils.star(from=ref('dim_address'), relation_alias='d_address', except=["address_key"]) }},
-    {{ dbt_utils.star(from=ref('dim_order_status'), relation_alias='d_order_status', except=["order_status_key"]) }},
-    {{ dbt_utils.star(from=ref('dim_date'), relation_alias='d_date', except=["date_key"]) }}
+    {{ cached_star(from=ref('dim_product'), relation_alias='d_product', except=["product_key", "valid_from", "valid_to", "modifieddate"]) }},
+    {{ cached_star(from=ref('dim_customer'), relation_alias='d_customer', except=["customer_key", "valid_from", "valid_to", "modifieddate"]) }},
+    {{ cached_star(from=ref('dim_credit_card'), relation_alias='d_credit_card', except=["creditcard_key", "modifieddate"]) }},
+    {{ cached_star(from=ref('dim_address'), relation_alias='d_address', except=["address_key", "modifieddate"]) }},
+    {{ cached_star(from=ref('dim_order_status'), relation_alias='d_order_status', except=["order_status_key"]) }},
+    {{ cached_star(from=ref('dim_date'), relation_alias='d_date', except=["date_key"]) }},
+    d_product.modifieddate as product_modifieddate,
+    d_customer.modifieddate as customer_modifieddate,
+    d_credit_card.modifieddate as creditcard_modifieddate,
+    d_address.modifieddate as ship_address_modifieddate
 from f_sales
 left join d_product on f_sales.product_key = d_product.product_key
 left join d_customer on f_sales.customer_key = d_customer.customer_key
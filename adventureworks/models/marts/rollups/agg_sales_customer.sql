@@ -0,0 +1,20 @@
+with sales as (
+    select
+        f_sales.salesorderid,
+        f_sales.orderqty,
+        f_sales.unitprice,
+        f_sales.revenue,
+        d_customer.customerid,
+        d_customer.fullname,
+        d_customer.storename
+    from {{ ref('fct_sales') }} as f_sales
+    left join {{ ref('dim_customer') }} as d_customer on f_sales.customer_key = d_customer.customer_key
+)
+
+select
+    customerid,
+    fullname,
+    storename,
+    {{ rollup_measures() }}
+from sales
+group by customerid, fullname, storename
@@ -0,0 +1,25 @@
+with sales as (
+    select
+        f_sales.salesorderid,
+        f_sales.orderqty,
+        f_sales.unitprice,
+        f_sales.revenue,
+        d_date.date_day,
+        d_product.productid,
+        d_product.product_name,
+        d_product.product_subcategory_name,
+        d_product.product_category_name
+    from {{ ref('fct_sales') }} as f_sales
+    left join {{ ref('dim_date') }} as d_date on f_sales.order_date_key = d_date.date_key
+    left join {{ ref('dim_product') }} as d_product on f_sales.product_key = d_product.product_key
+)
+
+select
+    date_day,
+    productid,
+    product_name,
+    product_subcategory_name,
+    product_category_name,
+    {{ rollup_measures() }}
+from sales
+group by date_day, productid, product_name, product_subcategory_name, product_category_name
@@ -0,0 +1,26 @@
+with sales as (
+    select
+        f_sales.salesorderid,
+        f_sales.orderqty,
+        f_sales.unitprice,
+        f_sales.revenue,
+        d_date.date_day,
+        d_date.day_of_week,
+        d_date.day_of_week_name,
+        d_order_status.order_status_name,
+        d_credit_card.cardtype
+    from {{ ref('fct_sales') }} as f_sales
+    left join {{ ref('dim_date') }} as d_date on f_sales.order_date_key = d_date.date_key
+    left join {{ ref('dim_order_status') }} as d_order_status on f_sales.order_status_key = d_order_status.order_status_key
+    left join {{ ref('dim_credit_card') }} as d_credit_card on f_sales.creditcard_key = d_credit_card.creditcard_key
+)
+
+select
+    date_day,
+    day_of_week,
+    day_of_week_name,
+    order_status_name,
+    cardtype,
+    {{ rollup_measures() }}
+from sales
+group by date_day, day_of_week, day_of_week_name, order_status_name, cardtype
@@ -0,0 +1,22 @@
+with sales as (
+    select
+        f_sales.salesorderid,
+        f_sales.orderqty,
+        f_sales.unitprice,
+        f_sales.revenue,
+        cast(extract(year from f_sales.orderdate) as integer) as order_year,
+        cast(extract(quarter from f_sales.orderdate) as integer) as order_quarter,
+        cast(extract(month from f_sales.orderdate) as integer) as order_month,
+        d_product.product_category_name
+    from {{ ref('fct_sales') }} as f_sales
+    left join {{ ref('dim_product') }} as d_product on f_sales.product_key = d_product.product_key
+)
+
+select
+    order_year,
+    order_quarter,
+    order_month,
+    product_category_name,
+    {{ rollup_measures() }}
+from sales
+group by order_year, order_quarter, order_month, product_category_name
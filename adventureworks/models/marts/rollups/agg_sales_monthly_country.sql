@@ -0,0 +1,22 @@
+with sales as (
+    select
+        f_sales.salesorderid,
+        f_sales.orderqty,
+        f_sales.unitprice,
+        f_sales.revenue,
+        cast(extract(year from f_sales.orderdate) as integer) as order_year,
+        cast(extract(quarter from f_sales.orderdate) as integer) as order_quarter,
+        cast(extract(month from f_sales.orderdate) as integer) as order_month,
+        d_address.country_name
+    from {{ ref('fct_sales') }} as f_sales
+    left join {{ ref('dim_address') }} as d_address on f_sales.ship_address_key = d_address.address_key
+)
+
+select
+    order_year,
+    order_quarter,
+    order_month,
+    country_name,
+    {{ rollup_measures() }}
+from sales
+group by order_year, order_quarter, order_month, country_name
@@ -0,0 +1,6 @@
+select
+    addressid,
+    stateprovinceid,
+    city,
+    {{ cast_timestamp('modifieddate') }} as modifieddate
+from {{ source('raw', 'address') }}
@@ -0,0 +1,5 @@
+select
+    countryregioncode,
+    name,
+    {{ cast_timestamp('modifieddate') }} as modifieddate
+from {{ source('raw', 'countryregion') }}
@@ -0,0 +1,5 @@
+select
+    creditcardid,
+    cardtype,
+    {{ cast_timestamp('modifieddate') }} as modifieddate
+from {{ source('raw', 'creditcard') }}
@@ -0,0 +1,6 @@
+-- personid is empty for store customers: try_cast turns the empty string into null on Athena
+select
+    customerid,
+    try_cast(personid as bigint) as personid,
+    storeid
+from {{ source('raw', 'customer') }}
@@ -0,0 +1,11 @@
+select
+    cast(date_day as date) as date_day,
+    cast(prior_date_day as date) as prior_date_day,
+    cast(next_date_day as date) as next_date_day,
+    cast(prior_year_date_day as date) as prior_year_date_day,
+    cast(prior_year_over_year_date_day as date) as prior_year_over_year_date_day,
+    day_of_week,
+    day_of_week_name,
+    day_of_month,
+    day_of_year
+from {{ source('raw', 'date') }}
@@ -0,0 +1,4 @@
+select
+    status,
+    cast(name as varchar) as name
+from {{ source('raw', 'orderstatus') }}
@@ -0,0 +1,7 @@
+select
+    businessentityid,
+    firstname,
+    middlename,
+    lastname,
+    {{ cast_timestamp('modifieddate') }} as modifieddate
+from {{ source('raw', 'person') }}
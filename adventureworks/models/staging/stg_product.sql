@@ -0,0 +1,10 @@
+-- productsubcategoryid is empty for products without subcategory
+select
+    productid,
+    cast(name as varchar) as name,
+    productnumber,
+    color,
+    class,
+    try_cast(productsubcategoryid as bigint) as productsubcategoryid,
+    {{ cast_timestamp('modifieddate') }} as modifieddate
+from {{ source('raw', 'product') }}
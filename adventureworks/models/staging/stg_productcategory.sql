@@ -0,0 +1,5 @@
+select
+    productcategoryid,
+    cast(name as varchar) as name,
+    {{ cast_timestamp('modifieddate') }} as modifieddate
+from {{ source('raw', 'productcategory') }}
@@ -0,0 +1,6 @@
+select
+    productsubcategoryid,
+    productcategoryid,
+    cast(name as varchar) as name,
+    {{ cast_timestamp('modifieddate') }} as modifieddate
+from {{ source('raw', 'productsubcategory') }}
@@ -0,0 +1,8 @@
+select
+    salesorderid,
+    salesorderdetailid,
+    productid,
+    orderqty,
+    unitprice,
+    {{ cast_timestamp('modifieddate') }} as modifieddate
+from {{ source('raw', 'salesorderdetail') }}
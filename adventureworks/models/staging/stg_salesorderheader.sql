@@ -0,0 +1,14 @@
+{{ config(materialized='table') }}
+
+-- Header attributes used by the marts: one scan of salesorderheader per run,
+-- instead of one per model that needs them (fct_sales, dim_credit_card).
+-- Unlike the other (ephemeral) staging models, it is a table.
+select
+    salesorderid,
+    customerid,
+    creditcardid,
+    shiptoaddressid,
+    status as order_status,
+    cast(orderdate as date) as orderdate,
+    {{ cast_timestamp('modifieddate') }} as modifieddate
+from {{ source('raw', 'salesorderheader') }}
@@ -0,0 +1,6 @@
+-- Credit cards used by at least one order, one row per creditcardid. Read from
+-- the stg_salesorderheader table, which has one row per order.
+select creditcardid
+from {{ ref('stg_salesorderheader') }}
+where creditcardid is not null
+group by creditcardid
\ No newline at end of file
@@ -0,0 +1,6 @@
+select
+    stateprovinceid,
+    countryregioncode,
+    name,
+    {{ cast_timestamp('modifieddate') }} as modifieddate
+from {{ source('raw', 'stateprovince') }}
@@ -0,0 +1,5 @@
+select
+    businessentityid,
+    storename,
+    {{ cast_timestamp('modifieddate') }} as modifieddate
+from {{ source('raw', 'store') }}
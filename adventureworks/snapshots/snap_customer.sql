@@ -0,0 +1,53 @@
+{% snapshot snap_customer %}
+
+{{
+    config(
+        target_schema=target.schema if target.name.endswith('_ci') else 'snapshots',
+        unique_key='customerid',
+        strategy='check',
+        check_cols=['row_hash'],
+        table_type='iceberg' if target.type == 'athena' else none,
+        s3_data_naming='schema_table_unique' if target.type == 'athena' else none
+    )
+}}
+
+with stg_customer as (
+    select * from {{ ref('stg_customer') }}
+),
+
+stg_person as (
+    select
+        businessentityid,
+        concat(coalesce(firstname, ''), ' ', coalesce(middlename, ''), ' ', coalesce(lastname, '')) as fullname,
+        modifieddate
+    from {{ ref('stg_person') }}
+),
+
+stg_store as (
+    select
+        businessentityid as storebusinessentityid,
+        storename,
+        modifieddate
+    from {{ ref('stg_store') }}
+),
+
+customer as (
+    select
+        stg_customer.customerid,
+        stg_person.businessentityid,
+        stg_person.fullname,
+        stg_store.storebusinessentityid,
+        stg_store.storename,
+        {{ latest_timestamp(['stg_person.modifieddate', 'stg_store.modifieddate']) }} as modifieddate
+    from stg_customer
+    left join stg_person on stg_customer.personid = stg_person.businessentityid
+    left join stg_store on stg_customer.storeid = stg_store.storebusinessentityid
+)
+
+-- A new version is recorded when row_hash changes: one column to compare per customer
+select
+    *,
+    {{ dbt_utils.generate_surrogate_key(['businessentityid', 'fullname', 'storebusinessentityid', 'storename']) }} as row_hash
+from customer
+
+{% endsnapshot %}
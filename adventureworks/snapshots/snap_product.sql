@@ -0,0 +1,49 @@
+{% snapshot snap_product %}
+
+{{
+    config(
+        target_schema=target.schema if target.name.endswith('_ci') else 'snapshots',
+        unique_key='productid',
+        strategy='check',
+        check_cols=['row_hash'],
+        table_type='iceberg' if target.type == 'athena' else none,
+        s3_data_naming='schema_table_unique' if target.type == 'athena' else none
+    )
+}}
+
+with stg_product as (
+    select * from {{ ref('stg_product') }}
+),
+
+stg_product_subcategory as (
+    select * from {{ ref('stg_productsubcategory') }}
+),
+
+stg_product_category as (
+    select * from {{ ref('stg_productcategory') }}
+),
+
+product as (
+    select
+        stg_product.productid,
+        stg_product.name as product_name,
+        stg_product.productnumber,
+        stg_product.color,
+        stg_product.class,
+        stg_product_subcategory.name as product_subcategory_name,
+        stg_product_category.name as product_category_name,
+        {{ latest_timestamp(['stg_product.modifieddate', 'stg_product_subcategory.modifieddate', 'stg_product_category.modifieddate']) }} as modifieddate
+    from stg_product
+    left join stg_product_subcategory on stg_product.productsubcategoryid = stg_product_subcategory.productsubcategoryid
+    left join stg_product_category on stg_product_subcategory.productcategoryid = stg_product_category.productcategoryid
+)
+
+-- A new version is recorded when row_hash changes: one column to compare per product
+select
+    *,
+    {{ dbt_utils.generate_surrogate_key([
+        'product_name', 'productnumber', 'color', 'class', 'product_subcategory_name', 'product_category_name'
+    ]) }} as row_hash
+from product
+
+{% endsnapshot %}
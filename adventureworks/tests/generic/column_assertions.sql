@@ -0,0 +1,67 @@
+{#
+    not_null and unique checks on many columns of a model in a single scan,
+    instead of one query (and one full scan) per column test.
+    Returns one row per failing assertion: (assertion, column_name, failures),
+    so `dbt test --store-failures` keeps which checks failed and by how much.
+    unique counts duplicated non-null values, like the built-in unique test.
+
+    For very large tables:
+    - recent_days (or the test_recent_days var) only checks the rows whose
+      partition_column falls in the last N days, so Athena prunes partitions.
+    - sample_percent (or the test_sample_percent var) checks a Bernoulli sample.
+      It still reads the whole table on Athena and only finds duplicates when
+      both rows are sampled: use it for null checks on huge tables.
+#}
+{% test column_assertions(model, not_null=[], unique=[], partition_column=none,
+                          recent_days=var('test_recent_days', none),
+                          sample_percent=var('test_sample_percent', none)) %}
+
+{%- set assertions = [] %}
+{%- for column in not_null %}
+    {%- do assertions.append(('not_null', column)) %}
+{%- endfor %}
+{%- for column in unique %}
+    {%- do assertions.append(('unique', column)) %}
+{%- endfor %}
+
+with stats as (
+    select
+        count(*) as row_count
+        {%- for assertion, column in assertions %},
+        {% if assertion == 'not_null' -%}
+        count(*) - count({{ column }})
+        {%- else -%}
+        count({{ column }}) - count(distinct {{ column }})
+        {%- endif %} as {{ assertion }}__{{ column }}
+        {%- endfor %}
+    from {{ model }} {{ table_sample(sample_percent) if sample_percent }}
+    {%- if partition_column and recent_days %}
+    where {{ partition_column }} >= cast({{ dbt.dateadd('day', -1 * recent_days | int, 'current_date') }} as date)
+    {%- endif %}
+),
+
+-- Unpivot with a cross join (not a union of selects on stats: Athena would scan once per branch)
+checks as (
+    select
+        checks.assertion,
+        checks.column_name,
+        stats.row_count,
+        case
+            {%- for assertion, column in assertions %}
+            when checks.assertion = '{{ assertion }}' and checks.column_name = '{{ column }}' then stats.{{ assertion }}__{{ column }}
+            {%- endfor %}
+        end as failures
+    from stats
+    cross join (
+        values
+            {%- for assertion, column in assertions %}
+            ('{{ assertion }}', '{{ column }}'){{ ',' if not loop.last }}
+            {%- endfor %}
+    ) as checks (assertion, column_name)
+)
+
+select *
+from checks
+where failures > 0
+
+{% endtest %}
@@ -0,0 +1,34 @@
+{#
+    Fails if the totals of a rollup do not match the same totals computed on
+    compare_model (the fact table it aggregates). Only list in measures the ones
+    that add up across the whole rollup: orders only for order-level grains.
+#}
+{% test rollup_reconciles(model, compare_model, measures, tolerance=0.01) %}
+
+{%- set definitions = rollup_measure_definitions() %}
+
+with rollup_totals as (
+    select
+        {%- for measure in measures %}
+        sum({{ measure }}) as {{ measure }}{{ ',' if not loop.last }}
+        {%- endfor %}
+    from {{ model }}
+),
+
+source_totals as (
+    select
+        {%- for measure in measures %}
+        {{ definitions[measure] }} as {{ measure }}{{ ',' if not loop.last }}
+        {%- endfor %}
+    from {{ compare_model }}
+)
+
+select *
+from rollup_totals
+cross join source_totals
+where
+    {%- for measure in measures %}
+    abs(coalesce(rollup_totals.{{ measure }}, 0) - coalesce(source_totals.{{ measure }}, 0)) > {{ tolerance }}{{ ' or' if not loop.last }}
+    {%- endfor %}
+
+{% endtest %}
@@ -0,0 +1,20 @@
+{#
+    Fails for every version of a type 2 dimension whose validity range doesn't
+    end where the next version of the same key starts (gaps or overlaps), or
+    that is empty. A point-in-time join then finds exactly one version.
+#}
+{% test scd_valid_ranges(model, unique_key, valid_from='valid_from', valid_to='valid_to') %}
+
+select *
+from (
+    select
+        {{ unique_key }},
+        {{ valid_from }},
+        {{ valid_to }},
+        lead({{ valid_from }}) over (partition by {{ unique_key }} order by {{ valid_from }}) as next_valid_from
+    from {{ model }}
+) versions
+where {{ valid_to }} <= {{ valid_from }}
+    or next_valid_from <> {{ valid_to }}
+
+{% endtest %}
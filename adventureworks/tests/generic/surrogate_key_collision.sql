@@ -0,0 +1,17 @@
+{#
+    Fails for every surrogate key shared by more than one natural key,
+    i.e. a hash collision (more likely with 64-bit integer keys than with md5).
+#}
+{% test surrogate_key_collision(model, column_name, natural_key) %}
+
+select
+    {{ column_name }},
+    count(*) as natural_keys
+from (
+    select distinct {{ column_name }}, {{ natural_key | join(', ') }}
+    from {{ model }}
+) keys
+group by {{ column_name }}
+having count(*) > 1
+
+{% endtest %}
@@ -6,6 +6,10 @@
 -- NOTA: Ejecuta estas queries en AWS Athena Console
 -- https://console.aws.amazon.com/athena/
 
+-- Las queries sobre obt_sales de las secciones 2 a 4 se pueden responder con
+-- los rollups agg_sales_* (mucho más chicos). Para reescribirlas:
+--   python scripts/rollup_router.py --file docs/EXAMPLE_QUERIES.sql
+
 -- ============================================
 -- 1. EXPLORACIÓN BÁSICA
 -- ============================================
@@ -76,33 +80,33 @@ LIMIT 10;
 
 -- Ventas por año y mes
 SELECT 
-    year_actual as year,
-    month_name,
+    year(date_day) as order_year,
+    month(date_day) as order_month,
     COUNT(DISTINCT salesorderid) as orders,
     SUM(revenue) as revenue
 FROM adventureworks.marts.obt_sales
-GROUP BY year_actual, month_name, month_of_year
-ORDER BY year_actual, month_of_year;
+GROUP BY year(date_day), month(date_day)
+ORDER BY order_year, order_month;
 
 -- Ventas por día de la semana
 SELECT 
-    day_name,
+    day_of_week_name,
     COUNT(DISTINCT salesorderid) as total_orders,
     SUM(revenue) as total_revenue,
     ROUND(AVG(revenue), 2) as avg_order_value
 FROM adventureworks.marts.obt_sales
-GROUP BY day_name, day_of_week
+GROUP BY day_of_week_name, day_of_week
 ORDER BY day_of_week;
 
 -- Ventas por trimestre
 SELECT 
-    year_actual,
-    quarter_of_year,
+    year(date_day) as order_year,
+    quarter(date_day) as order_quarter,
     SUM(revenue) as revenue,
     COUNT(DISTINCT salesorderid) as orders
 FROM adventureworks.marts.obt_sales
-GROUP BY year_actual, quarter_of_year
-ORDER BY year_actual, quarter_of_year;
+GROUP BY year(date_day), quarter(date_day)
+ORDER BY order_year, order_quarter;
 
 -- ============================================
 -- 4. ANÁLISIS DE CLIENTES
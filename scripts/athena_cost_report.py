@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Costo y latencia en Athena de cada nodo de la última corrida de dbt.
+
+Después de `make dbt-run` / `make dbt-test`, lee target/run_results.json y
+busca en Athena las queries que lanzó esa corrida: dbt-athena antepone a cada
+query un comentario con el nodo que la generó
+
+    -- /* {"app": "dbt", ..., "target_name": "athena", "node_id": "model.adventureworks.fct_sales"} */
+
+así que se listan las ejecuciones del workgroup del target dentro de la
+ventana de tiempo de la corrida (list_query_executions) y se piden sus
+estadísticas en lotes de 50 (batch_get_query_execution). Si el adapter
+informa el id de la query en adapter_response (versiones más nuevas de
+dbt-athena), también se usa.
+
+Por nodo se suman las queries, DataScannedInBytes, EngineExecutionTimeInMillis,
+QueryQueueTimeInMillis y QueryPlanningTimeInMillis, y se estima el costo
+(ATHENA_PRICE_PER_TB, mínimo 10 MB por query; los DDL y las queries fallidas
+no se cobran, las canceladas se cobran por lo que llegaron a escanear). El
+reporte se guarda en target/athena_costs.json y se agrega a
+benchmarks/athena_costs.jsonl para seguir la tendencia entre commits.
+
+--save-baseline guarda la corrida como referencia (por comando: run, test...);
+las corridas siguientes marcan los nodos que escanean o tardan más que la
+referencia por encima de --threshold.
+
+--executions lee las ejecuciones de un archivo grabado con --record, sin AWS.
+
+Uso:
+    python scripts/athena_cost_report.py [--run-results adventureworks/target/run_results.json]
+    python scripts/athena_cost_report.py --save-baseline
+    python scripts/athena_cost_report.py --fail-on-regression [--threshold 0.2]
+    python scripts/athena_cost_report.py --record fixtures.json
+    python scripts/athena_cost_report.py --executions fixtures.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import yaml
+
+from athena_runner import BATCH_SIZE
+
+PROJECT_ROOT = Path(__file__).parent.parent
+PROJECT_DIR = PROJECT_ROOT / 'adventureworks'
+RUN_RESULTS_PATH = PROJECT_DIR / 'target' / 'run_results.json'
+PROFILES_PATH = PROJECT_DIR / 'profiles.yml'
+REPORT_PATH = PROJECT_DIR / 'target' / 'athena_costs.json'
+HISTORY_PATH = PROJECT_ROOT / 'benchmarks' / 'athena_costs.jsonl'
+BASELINE_PATH = PROJECT_ROOT / 'benchmarks' / 'athena_cost_baseline.json'
+
+# Precio de Athena por TB escaneado; cada query se cobra como mínimo 10 MB
+PRICE_PER_TB = float(os.environ.get('ATHENA_PRICE_PER_TB', '5.0'))
+MIN_BILLED_BYTES = 10 * 1024 ** 2
+
+# Margen alrededor de la corrida al buscar sus queries (relojes y colas)
+WINDOW_MARGIN = timedelta(seconds=60)
+
+# Una regresión tiene que superar el umbral relativo y también estos mínimos
+# absolutos, para no marcar ruido en nodos chicos
+DEFAULT_THRESHOLD = 0.2
+MIN_BYTES_DELTA = 10 * 1024 ** 2
+MIN_ENGINE_MS_DELTA = 2000
+
+QUERY_COMMENT = re.compile(r'/\*\s*(\{.*?\})\s*\*/', re.DOTALL)
+
+STATISTICS = {
+    'scanned_bytes': 'DataScannedInBytes',
+    'engine_ms': 'EngineExecutionTimeInMillis',
+    'queue_ms': 'QueryQueueTimeInMillis',
+    'planning_ms': 'QueryPlanningTimeInMillis',
+    'total_ms': 'TotalExecutionTimeInMillis',
+}
+
+
+def _parse_time(value):
+    """Fechas de run_results.json (ISO, UTC) o de Athena (datetime o ISO si vienen de un fixture)"""
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"No se puede serializar {type(value).__name__}")
+
+
+def athena_output(target, profiles_path=PROFILES_PATH):
+    """Workgroup y región de un target de Athena de profiles.yml"""
+    profiles = yaml.safe_load(Path(profiles_path).read_text())
+    profile = next(iter(profiles.values()))
+    output = profile['outputs'][target or profile.get('target')]
+    return output.get('work_group') or 'primary', output.get('region_name')
+
+
+def read_run_results(path=RUN_RESULTS_PATH):
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"No existe {path}: ejecutar primero make dbt-run o make dbt-test")
+    return json.loads(path.read_text())
+
+
+def run_window(run_results):
+    """(inicio, fin) de la corrida, según los tiempos de sus nodos"""
+    times = [
+        _parse_time(t[key])
+        for result in run_results.get('results', [])
+        for t in result.get('timing', [])
+        for key in ('started_at', 'completed_at') if t.get(key)
+    ]
+    end = _parse_time(run_results['metadata']['generated_at'])
+    start = min(times) if times else end - timedelta(seconds=run_results.get('elapsed_time', 0))
+    return start - WINDOW_MARGIN, max(times + [end]) + WINDOW_MARGIN
+
+
+def query_comment(query):
+    """Comentario JSON que dbt antepone a la query (None si no lo tiene)"""
+    match = QUERY_COMMENT.search(query[:2000] if query else '')
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except ValueError:
+        return None
+
+
+def fetch_executions(athena, work_group, start, end, known_ids=()):
+    """Ejecuciones del workgroup enviadas entre start y end, más las de known_ids"""
+    executions = {}
+
+    def describe(ids):
+        oldest = None
+        for i in range(0, len(ids), BATCH_SIZE):
+            response = athena.batch_get_query_execution(QueryExecutionIds=ids[i:i + BATCH_SIZE])
+            for execution in response.get('QueryExecutions', []):
+                submitted = _parse_time(execution['Status']['SubmissionDateTime'])
+                oldest = submitted if oldest is None else min(oldest, submitted)
+                if start <= submitted <= end or execution['QueryExecutionId'] in known_ids:
+                    executions[execution['QueryExecutionId']] = execution
+        return oldest
+
+    # list_query_executions devuelve las más nuevas primero: se corta al pasar el inicio
+    kwargs = {'WorkGroup': work_group, 'MaxResults': 50}
+    while True:
+        page = athena.list_query_executions(**kwargs)
+        oldest = describe(page.get('QueryExecutionIds', []))
+        if not page.get('NextToken') or (oldest is not None and oldest < start):
+            break
+        kwargs['NextToken'] = page['NextToken']
+
+    missing = [i for i in known_ids if i not in executions]
+    if missing:
+        describe(missing)
+    return list(executions.values())
+
+
+def billed_usd(execution):
+    """Costo estimado de una ejecución: DDL y queries fallidas no se cobran, las canceladas sí"""
+    if execution.get('StatementType') == 'DDL' or execution['Status']['State'] == 'FAILED':
+        return 0.0
+    scanned = execution.get('Statistics', {}).get('DataScannedInBytes', 0)
+    return max(scanned, MIN_BILLED_BYTES) / 1024 ** 4 * PRICE_PER_TB
+
+
+def node_costs(run_results, executions, target):
+    """unique_id -> métricas sumadas de sus queries; las queries sin nodo van a '(sin nodo)'"""
+    results = {r['unique_id']: r for r in run_results.get('results', [])}
+    query_nodes = {
+        r['adapter_response']['query_id']: r['unique_id']
+        for r in results.values() if (r.get('adapter_response') or {}).get('query_id')
+    }
+
+    nodes = {}
+    for unique_id, result in results.items():
+        nodes[unique_id] = {
+            'status': result.get('status'),
+            'dbt_seconds': round(result.get('execution_time') or 0, 2),
+            'queries': 0,
+            'cost_usd': 0.0,
+            **{name: 0 for name in STATISTICS},
+        }
+
+    for execution in executions:
+        comment = query_comment(execution.get('Query'))
+        unique_id = query_nodes.get(execution['QueryExecutionId'])
+        if unique_id is None and comment and comment.get('target_name') in (None, target):
+            unique_id = comment.get('node_id')
+        if unique_id not in nodes:
+            if not comment or comment.get('target_name') not in (None, target) or unique_id:
+                # Query de otro usuario, de otro target o de otra corrida en el mismo workgroup
+                continue
+            unique_id = '(sin nodo)'
+            nodes.setdefault(unique_id, {'status': None, 'dbt_seconds': 0, 'queries': 0,
+                                         'cost_usd': 0.0, **{name: 0 for name in STATISTICS}})
+        node = nodes[unique_id]
+        statistics = execution.get('Statistics', {})
+        node['queries'] += 1
+        node['cost_usd'] += billed_usd(execution)
+        for name, key in STATISTICS.items():
+            node[name] += statistics.get(key, 0) or 0
+
+    for node in nodes.values():
+        node['cost_usd'] = round(node['cost_usd'], 6)
+    return nodes
+
+
+def git_commit():
+    result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def build_report(run_results, executions, target):
+    nodes = node_costs(run_results, executions, target)
+    metadata = run_results.get('metadata', {})
+    args = run_results.get('args', {})
+    return {
+        'generated_at': metadata.get('generated_at'),
+        'invocation_id': metadata.get('invocation_id'),
+        'command': args.get('which'),
+        'target': target,
+        'commit': git_commit(),
+        'nodes': nodes,
+        'totals': {
+            'queries': sum(n['queries'] for n in nodes.values()),
+            'cost_usd': round(sum(n['cost_usd'] for n in nodes.values()), 6),
+            **{name: sum(n[name] for n in nodes.values()) for name in STATISTICS},
+        },
+    }
+
+
+def regressions(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """(nodo, métrica, antes, después) de los nodos que empeoraron respecto de la referencia"""
+    found = []
+    minimums = {'scanned_bytes': MIN_BYTES_DELTA, 'engine_ms': MIN_ENGINE_MS_DELTA}
+    for unique_id, node in report['nodes'].items():
+        base = baseline.get('nodes', {}).get(unique_id)
+        if not base or not node['queries']:
+            continue
+        for metric, minimum in minimums.items():
+            before, after = base.get(metric, 0), node[metric]
+            if after - before >= minimum and after > before * (1 + threshold):
+                found.append((unique_id, metric, before, after))
+    return found
+
+
+def _mb(value):
+    return f"{value / 1024 ** 2:,.1f}"
+
+
+def print_report(report):
+    nodes = sorted(report['nodes'].items(), key=lambda item: (-item[1]['scanned_bytes'], item[0]))
+    print(f"\n{'Nodo':44} {'Queries':>7} {'MB escan.':>10} {'Motor s':>8} {'Cola s':>7} "
+          f"{'Plan s':>7} {'dbt s':>7} {'USD':>9}")
+    for unique_id, n in nodes:
+        name = unique_id.split('.', 2)[-1] if unique_id.count('.') >= 2 else unique_id
+        print(f"{name[:44]:44} {n['queries']:>7} {_mb(n['scanned_bytes']):>10} {n['engine_ms'] / 1000:>8.1f} "
+              f"{n['queue_ms'] / 1000:>7.1f} {n['planning_ms'] / 1000:>7.1f} {n['dbt_seconds']:>7.1f} "
+              f"{n['cost_usd']:>9.4f}")
+    totals = report['totals']
+    print(f"{'TOTAL':44} {totals['queries']:>7} {_mb(totals['scanned_bytes']):>10} "
+          f"{totals['engine_ms'] / 1000:>8.1f} {totals['queue_ms'] / 1000:>7.1f} "
+          f"{totals['planning_ms'] / 1000:>7.1f} {'':>7} {totals['cost_usd']:>9.4f}")
+
+    without_queries = [u for u, n in report['nodes'].items() if not n['queries'] and n['status'] != 'skipped']
+    if without_queries:
+        print(f"⚠️  {len(without_queries)} nodos sin queries encontradas en Athena "
+              f"(¿otro workgroup o query-comment deshabilitado?)")
+
+
+def print_regressions(found, threshold):
+    if not found:
+        print(f"✅ Sin regresiones mayores a {threshold:.0%} respecto de la referencia")
+        return
+    print(f"\n🔺 {len(found)} regresiones mayores a {threshold:.0%} respecto de la referencia:")
+    for unique_id, metric, before, after in found:
+        if metric == 'scanned_bytes':
+            detail = f"{_mb(before)} MB → {_mb(after)} MB escaneados"
+        else:
+            detail = f"{before / 1000:.1f}s → {after / 1000:.1f}s de motor"
+        change = (after - before) / before if before else float('inf')
+        print(f"  {unique_id}: {detail} ({change:+.0%})")
+
+
+def load_json(path, default):
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else default
+
+
+def write_json(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, default=_encode) + '\n')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Costo y latencia en Athena de cada nodo de la última corrida de dbt')
+    parser.add_argument('--run-results', default=str(RUN_RESULTS_PATH), help='run_results.json de la corrida')
+    parser.add_argument('--target', help='Target de dbt (default: el de la corrida)')
+    parser.add_argument('--executions', help='Leer las ejecuciones de Athena de este archivo (grabado con --record)')
+    parser.add_argument('--record', help='Guardar las ejecuciones de Athena leídas en este archivo')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help=f'Referencia (default: {BASELINE_PATH})')
+    parser.add_argument('--save-baseline', action='store_true', help='Guardar esta corrida como referencia')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Aumento relativo que cuenta como regresión (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Salir con error si hay regresiones')
+    parser.add_argument('--no-history', action='store_true', help=f'No agregar la corrida a {HISTORY_PATH}')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    try:
+        run_results = read_run_results(args.run_results)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+    target = args.target or run_results.get('args', {}).get('target') or 'athena'
+
+    start, end = run_window(run_results)
+    known_ids = [
+        r['adapter_response']['query_id'] for r in run_results.get('results', [])
+        if (r.get('adapter_response') or {}).get('query_id')
+    ]
+    if args.executions:
+        # Mismo filtro que fetch_executions: el fixture puede tener queries de otras corridas
+        executions = [
+            e for e in json.loads(Path(args.executions).read_text())
+            if start <= _parse_time(e['Status']['SubmissionDateTime']) <= end or e['QueryExecutionId'] in known_ids
+        ]
+        print(f"📂 {len(executions)} ejecuciones de la corrida en {args.executions}")
+    else:
+        import aws_session
+
+        work_group, region = athena_output(target)
+        athena = aws_session.client('athena', region)
+        executions = fetch_executions(athena, work_group, start, end, known_ids)
+        print(f"☁️  {len(executions)} ejecuciones de Athena en el workgroup {work_group} "
+              f"entre {start:%H:%M:%S} y {end:%H:%M:%S} UTC")
+    if args.record:
+        write_json(args.record, executions)
+        print(f"💾 Ejecuciones grabadas en {args.record}")
+
+    report = build_report(run_results, executions, target)
+    print_report(report)
+
+    write_json(REPORT_PATH, report)
+    if not args.no_history:
+        HISTORY_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(HISTORY_PATH, 'a') as f:
+            f.write(json.dumps(report) + '\n')
+    print(f"\n📄 Reporte en {REPORT_PATH}" + ('' if args.no_history else f" (historial en {HISTORY_PATH})"))
+
+    baselines = load_json(args.baseline, {})
+    key = f"{target}:{report['command']}"
+    if args.save_baseline:
+        baselines[key] = report
+        write_json(args.baseline, baselines)
+        print(f"📌 Referencia para {key} guardada en {args.baseline}")
+        return 0
+    if key not in baselines:
+        print(f"ℹ️  No hay referencia para {key}: guardar una con --save-baseline")
+        return 0
+
+    found = regressions(report, baselines[key], args.threshold)
+    print_regressions(found, args.threshold)
+    return 1 if found and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
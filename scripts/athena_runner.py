@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Motor compartido para ejecutar queries en Athena desde los scripts.
+
+En lugar de consultar cada query con get_query_execution una vez por segundo,
+el runner lleva la cuenta de todas las ejecuciones pendientes y pregunta por
+ellas en grupos con batch_get_query_execution. La espera entre consultas crece
+de forma adaptativa (rápida al principio, más lenta después) y cada query tiene
+su propio timeout, tras el cual se cancela en Athena.
+"""
+
+import os
+import time
+
+TERMINAL_STATES = ('SUCCEEDED', 'FAILED', 'CANCELLED')
+
+# Límite de IDs por llamada a batch_get_query_execution
+BATCH_SIZE = 50
+
+# Timeout por query en segundos (los DDL largos pueden tardar varios minutos)
+DEFAULT_TIMEOUT = int(os.environ.get('ATHENA_QUERY_TIMEOUT', '600'))
+
+# Backoff adaptativo: primera consulta a los 0.2s, luego x1.5 hasta 5s
+INITIAL_DELAY = 0.2
+MAX_DELAY = 5.0
+BACKOFF_FACTOR = 1.5
+
+
+class QueryResult:
+    """Estado final de una ejecución de Athena"""
+
+    def __init__(self, execution_id, query, label=None):
+        self.execution_id = execution_id
+        self.query = query
+        self.label = label
+        self.state = 'QUEUED'
+        self.reason = None
+        self.statistics = {}
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def succeeded(self):
+        return self.state == 'SUCCEEDED'
+
+    @property
+    def done(self):
+        return self.state in TERMINAL_STATES
+
+    @property
+    def elapsed(self):
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def __repr__(self):
+        return f"QueryResult({self.execution_id!r}, state={self.state!r})"
+
+
+class AthenaQueryRunner:
+    """Ejecuta queries en Athena y espera muchas a la vez con polling por lotes"""
+
+    def __init__(self, athena_client, database, output_location, work_group=None,
+                 timeout=DEFAULT_TIMEOUT, result_reuse_minutes=None, initial_delay=INITIAL_DELAY,
+                 max_delay=MAX_DELAY, backoff_factor=BACKOFF_FACTOR,
+                 sleep=time.sleep, clock=time.monotonic):
+        self.athena = athena_client
+        self.database = database
+        self.output_location = output_location
+        self.work_group = work_group
+        self.timeout = timeout
+        self.result_reuse_minutes = result_reuse_minutes
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self._sleep = sleep
+        self._clock = clock
+        self._delay = initial_delay
+        # execution_id -> (QueryResult, deadline)
+        self.pending = {}
+        self.api_calls = 0
+
+    def start(self, query, label=None, timeout=None):
+        """Lanzar una query sin esperar; retorna su QueryResult (pendiente)"""
+        kwargs = {
+            'QueryString': query,
+            'QueryExecutionContext': {'Database': self.database},
+            'ResultConfiguration': {'OutputLocation': self.output_location},
+        }
+        if self.work_group:
+            kwargs['WorkGroup'] = self.work_group
+        if self.result_reuse_minutes:
+            # Athena devuelve el resultado de una ejecución idéntica reciente sin volver a escanear
+            kwargs['ResultReuseConfiguration'] = {
+                'ResultReuseByAgeConfiguration': {'Enabled': True, 'MaxAgeInMinutes': self.result_reuse_minutes},
+            }
+
+        response = self.athena.start_query_execution(**kwargs)
+        self.api_calls += 1
+
+        result = QueryResult(response['QueryExecutionId'], query, label)
+        result.started_at = self._clock()
+        deadline = result.started_at + (timeout or self.timeout)
+        self.pending[result.execution_id] = (result, deadline)
+
+        # Una query nueva suele terminar pronto (DDL): volver a consultar rápido
+        self._delay = self.initial_delay
+        return result
+
+    def cancel(self, execution_id, reason='Cancelada por el usuario'):
+        """Cancelar una query pendiente en Athena"""
+        entry = self.pending.pop(execution_id, None)
+        if entry is None:
+            return None
+
+        result, _ = entry
+        try:
+            self.athena.stop_query_execution(QueryExecutionId=execution_id)
+            self.api_calls += 1
+        except Exception:
+            # Puede haber terminado entre la última consulta y la cancelación
+            pass
+        result.state = 'CANCELLED'
+        result.reason = reason
+        result.finished_at = self._clock()
+        return result
+
+    def cancel_all(self, reason='Cancelada por el usuario'):
+        """Cancelar todas las queries pendientes"""
+        return [self.cancel(execution_id, reason) for execution_id in list(self.pending)]
+
+    def poll(self):
+        """Consultar una vez el estado de las queries pendientes; retorna las terminadas"""
+        finished = []
+        ids = list(self.pending)
+
+        for i in range(0, len(ids), BATCH_SIZE):
+            response = self.athena.batch_get_query_execution(QueryExecutionIds=ids[i:i + BATCH_SIZE])
+            self.api_calls += 1
+
+            for execution in response.get('QueryExecutions', []):
+                execution_id = execution['QueryExecutionId']
+                status = execution['Status']
+                if execution_id not in self.pending or status['State'] not in TERMINAL_STATES:
+                    continue
+
+                result, _ = self.pending.pop(execution_id)
+                result.state = status['State']
+                result.reason = status.get('StateChangeReason')
+                result.statistics = execution.get('Statistics', {})
+                result.finished_at = self._clock()
+                finished.append(result)
+
+        # Las que siguen corriendo después de su deadline se cancelan
+        now = self._clock()
+        for execution_id, (result, deadline) in list(self.pending.items()):
+            if now >= deadline:
+                timeout = deadline - result.started_at
+                finished.append(self.cancel(execution_id, f"Timeout después de {timeout:.0f}s"))
+
+        return finished
+
+    def wait_any(self):
+        """Esperar hasta que termine al menos una query pendiente"""
+        while self.pending:
+            finished = self.poll()
+            if finished:
+                return finished
+            self._sleep(self._delay)
+            self._delay = min(self._delay * self.backoff_factor, self.max_delay)
+        return []
+
+    def wait(self, results=None):
+        """Esperar a que terminen las queries indicadas (o todas las pendientes)"""
+        if results is None:
+            results = [result for result, _ in self.pending.values()]
+
+        while any(not result.done for result in results):
+            self.wait_any()
+        return results
+
+    def run(self, query, label=None, timeout=None):
+        """Ejecutar una query y esperar su resultado"""
+        result = self.start(query, label=label, timeout=timeout)
+        self.wait([result])
+        return result
+
+    def run_chains(self, chains, max_in_flight=5, on_finish=None):
+        """
+        Ejecutar varias cadenas de queries con un máximo de queries en vuelo.
+
+        Cada cadena es un par (label, [queries]) cuyas queries se ejecutan en
+        orden; si una falla, el resto de su cadena no se ejecuta. Las distintas cadenas
+        avanzan en paralelo. Retorna, por cadena, la lista de QueryResult.
+        """
+        max_in_flight = max(1, max_in_flight)
+        queue = list(enumerate(chains))
+        progress = {}   # índice de cadena -> siguiente query
+        outcome = [[] for _ in chains]
+        running = {}    # execution_id -> índice de cadena
+
+        def submit(index, label):
+            query = chains[index][1][progress[index]]
+            result = self.start(query, label=label)
+            running[result.execution_id] = index
+
+        while queue or running:
+            while queue and len(running) < max_in_flight:
+                index, (label, queries) = queue.pop(0)
+                progress[index] = 0
+                if queries:
+                    submit(index, label)
+
+            for result in self.wait_any():
+                index = running.pop(result.execution_id)
+                outcome[index].append(result)
+                if on_finish:
+                    on_finish(result)
+
+                progress[index] += 1
+                label, queries = chains[index]
+                if result.succeeded and progress[index] < len(queries):
+                    submit(index, label)
+
+        return outcome
+
+    def get_rows(self, result):
+        """Leer las filas de una query terminada (sin la fila de encabezados)"""
+        rows = []
+        paginator = self.athena.get_paginator('get_query_results')
+        for page in paginator.paginate(QueryExecutionId=result.execution_id):
+            self.api_calls += 1
+            for row in page['ResultSet']['Rows']:
+                rows.append([field.get('VarCharValue') for field in row['Data']])
+        return rows[1:]
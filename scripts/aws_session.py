@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Sesión de AWS compartida por los scripts.
+
+Los clientes de boto3 se crean recién cuando se usan, una sola vez por
+proceso y servicio, sobre una misma sesión y con un pool de conexiones
+dimensionado para las subidas y queries en paralelo. Importar este módulo (o
+un script que lo use) no importa boto3 ni hace llamadas a AWS.
+
+El Account ID se guarda en disco (adventureworks/target/aws_identity.json)
+junto con una huella de las credenciales (perfil, access key y fecha de
+~/.aws/credentials y ~/.aws/config): mientras no cambien y no pase el TTL, ni
+los scripts ni el Makefile vuelven a llamar a STS. Con AWS_ACCOUNT_ID en el
+entorno no se consulta nada.
+
+Uso:
+    python scripts/aws_session.py account-id   # solo el Account ID (para el Makefile)
+    python scripts/aws_session.py identity [--refresh]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+IDENTITY_CACHE_PATH = PROJECT_ROOT / 'adventureworks' / 'target' / 'aws_identity.json'
+
+AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+
+# Segundos que vale la identidad cacheada (las credenciales de AWS Academy duran ~4 h)
+IDENTITY_TTL = int(os.environ.get('AWS_IDENTITY_TTL', '3600'))
+
+# Conexiones por cliente: sync_seeds sube 8 archivos a la vez con hasta 8 partes cada uno
+MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '64'))
+
+# Cambiar si cambia el formato del caché, para invalidarlo
+CACHE_VERSION = 1
+
+NOT_CONFIGURED = 'NO_AWS_CONFIGURED'
+
+_lock = threading.RLock()
+_session = None
+# (servicio, región) -> cliente
+_clients = {}
+_identity = None
+
+
+def client_config():
+    """Config de botocore: pool de conexiones, reintentos adaptativos y timeouts"""
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        retries={'mode': 'adaptive', 'max_attempts': 10},
+        connect_timeout=5,
+        read_timeout=60,
+        tcp_keepalive=True,
+    )
+
+
+def session():
+    """Sesión de boto3 del proceso (se crea al primer uso)"""
+    global _session
+    with _lock:
+        if _session is None:
+            import boto3
+
+            _session = boto3.session.Session()
+        return _session
+
+
+def client(service, region=None):
+    """Cliente de boto3 compartido por servicio y región"""
+    key = (service, region or AWS_REGION)
+    with _lock:
+        if key not in _clients:
+            _clients[key] = session().client(service, region_name=key[1], config=client_config())
+        return _clients[key]
+
+
+def _credentials_fingerprint():
+    """Huella de las credenciales activas: si cambia, la identidad cacheada no vale"""
+    parts = [os.environ.get(name, '') for name in (
+        'AWS_PROFILE', 'AWS_DEFAULT_PROFILE', 'AWS_ACCESS_KEY_ID', 'AWS_SESSION_TOKEN',
+    )]
+    aws_dir = Path.home() / '.aws'
+    for path in (
+        Path(os.environ.get('AWS_SHARED_CREDENTIALS_FILE', aws_dir / 'credentials')),
+        Path(os.environ.get('AWS_CONFIG_FILE', aws_dir / 'config')),
+    ):
+        try:
+            stat = path.stat()
+            parts.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}")
+        except OSError:
+            parts.append(f"{path}:-")
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def _read_identity(path, fingerprint, max_age, clock=time.time):
+    try:
+        data = json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return None
+    if (
+        data.get('version') != CACHE_VERSION
+        or data.get('fingerprint') != fingerprint
+        or clock() - data.get('fetched_at', 0) >= max_age
+    ):
+        return None
+    return data.get('identity')
+
+
+def _write_identity(path, fingerprint, identity, clock=time.time):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f'.tmp{os.getpid()}')
+    tmp_path.write_text(json.dumps({
+        'version': CACHE_VERSION,
+        'fingerprint': fingerprint,
+        'fetched_at': clock(),
+        'identity': identity,
+    }))
+    os.replace(tmp_path, path)
+
+
+def caller_identity(max_age=None, cache_path=IDENTITY_CACHE_PATH):
+    """{Account, Arn, UserId} de las credenciales activas: memoria, disco y recién ahí STS"""
+    global _identity
+    max_age = IDENTITY_TTL if max_age is None else max_age
+    with _lock:
+        if _identity is not None and max_age > 0:
+            return _identity
+        fingerprint = _credentials_fingerprint()
+        identity = _read_identity(cache_path, fingerprint, max_age) if max_age > 0 else None
+        if identity is None:
+            response = client('sts').get_caller_identity()
+            identity = {k: response[k] for k in ('Account', 'Arn', 'UserId')}
+            try:
+                _write_identity(cache_path, fingerprint, identity)
+            except OSError:
+                # Sin target/ escribible la identidad solo queda en memoria
+                pass
+        _identity = identity
+        return identity
+
+
+def account_id():
+    """Account ID de AWS (AWS_ACCOUNT_ID del entorno, si está definido)"""
+    return os.environ.get('AWS_ACCOUNT_ID') or caller_identity()['Account']
+
+
+def raw_bucket():
+    return f"dbt-adventureworks-raw-{account_id()}"
+
+
+def silver_bucket():
+    return f"dbt-adventureworks-silver-{account_id()}"
+
+
+def athena_output():
+    """Ubicación de resultados de Athena de los scripts"""
+    return f"s3://{silver_bucket()}/athena-results/"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Identidad de AWS de los scripts (con caché en disco)')
+    parser.add_argument('command', nargs='?', choices=['account-id', 'identity'], default='identity',
+                        help='account-id: solo el Account ID; identity: cuenta y usuario (default)')
+    parser.add_argument('--refresh', action='store_true', help='Ignorar el caché y consultar STS')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        identity = caller_identity(max_age=0 if args.refresh else None)
+    except Exception as e:
+        print(f"❌ No se pudo obtener la identidad de AWS: {e}", file=sys.stderr)
+        return 1
+
+    if args.command == 'account-id':
+        print(identity['Account'])
+    else:
+        print(f"✓ AWS Account ID: {identity['Account']}")
+        print(f"✓ Usuario: {identity['Arn'].split('/')[-1]}")
+        print(f"✓ Región: {AWS_REGION}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Benchmark local (sin AWS) del DAG completo de dbt sobre duckdb.
+
+Copia el proyecto a un directorio temporal, escala los seeds de órdenes
+(salesorderheader, salesorderdetail, salesorderheadersalesreason) por un
+factor (10x, 100x, 1000x...) y ejecuta dbt seed + dbt run con el target duckdb.
+Por cada modelo registra tiempo, filas y pico de memoria en un archivo JSON
+Lines, para comparar entre commits.
+
+Cada copia k de una orden recibe ids desplazados (id + k * offset) de forma
+consistente en las tres tablas, y sigue apuntando a los mismos clientes,
+productos, direcciones y tarjetas, así que todos los joins del DAG resuelven.
+
+dbt seed carga los CSVs fila a fila (unas cientos por segundo), así que los
+seeds escalados se cargan directamente con el lector CSV de duckdb, usando los
+column_types declarados en su YAML. --dbt-seed-all usa dbt seed para todo.
+
+Uso:
+    python scripts/benchmark_dag.py --scale 10 100
+    python scripts/benchmark_dag.py --compare <commit_base> [<commit_nuevo>]
+"""
+
+import argparse
+import csv
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DBT_PROJECT = PROJECT_ROOT / 'adventureworks'
+DEFAULT_OUTPUT = PROJECT_ROOT / 'benchmarks' / 'dag_results.jsonl'
+
+# Archivos del proyecto que se copian al directorio de trabajo
+PROJECT_FILES = ['dbt_project.yml', 'packages.yml', 'profiles.yml', 'macros', 'models',
+                 'seeds', 'snapshots', 'tests', 'analyses', 'dbt_packages']
+
+# Seeds escalados y las columnas de cada "dominio" de ids que se desplazan juntas
+SCALED_SEEDS = {
+    'salesorderheader': 'sales',
+    'salesorderdetail': 'sales',
+    'salesorderheadersalesreason': 'sales',
+}
+KEY_DOMAINS = {
+    'salesorderid': [
+        ('salesorderheader', 'salesorderid'),
+        ('salesorderdetail', 'salesorderid'),
+        ('salesorderheadersalesreason', 'salesorderid'),
+    ],
+    'salesorderdetailid': [
+        ('salesorderdetail', 'salesorderdetailid'),
+    ],
+}
+
+# Cada cuánto se mide la memoria del proceso de dbt
+SAMPLE_INTERVAL = 0.05
+
+
+def read_seed(path):
+    """(encabezados, filas) de un CSV de seeds"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        headers = next(reader)
+        return headers, list(reader)
+
+
+def key_offsets(seeds_dir):
+    """Desplazamiento por dominio: el siguiente múltiplo de 10 por encima del id máximo"""
+    offsets = {}
+    for domain, columns in KEY_DOMAINS.items():
+        top = 0
+        for table, column in columns:
+            headers, rows = read_seed(seeds_dir / SCALED_SEEDS[table] / f"{table}.csv")
+            i = headers.index(column)
+            top = max([top] + [int(row[i]) for row in rows if row[i]])
+        offsets[domain] = 10 ** len(str(top))
+    return offsets
+
+
+def scale_seeds(seeds_dir, factor):
+    """Reescribir los seeds de órdenes con factor copias; retorna filas por tabla"""
+    offsets = key_offsets(seeds_dir)
+    counts = {}
+    for table, folder in SCALED_SEEDS.items():
+        path = seeds_dir / folder / f"{table}.csv"
+        headers, rows = read_seed(path)
+        shifted = [
+            (headers.index(column), offsets[domain])
+            for domain, columns in KEY_DOMAINS.items()
+            for seed, column in columns if seed == table
+        ]
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            for copy in range(factor):
+                for row in rows:
+                    if copy:
+                        row = list(row)
+                        for i, offset in shifted:
+                            if row[i]:
+                                row[i] = str(int(row[i]) + copy * offset)
+                    writer.writerow(row)
+        counts[table] = len(rows) * factor
+    return counts
+
+
+def seed_column_types(seeds_dir, table):
+    """column_types declarados en el YAML del seed"""
+    path = seeds_dir / SCALED_SEEDS[table] / f"{table}.yml"
+    if not path.exists():
+        return {}
+    for seed in yaml.safe_load(path.read_text()).get('seeds', []):
+        if seed.get('name') == table:
+            return seed.get('config', {}).get('column_types', {})
+    return {}
+
+
+def load_scaled_seeds(work_dir, database_path, raw_schema):
+    """Cargar los seeds escalados con el lector CSV de duckdb (mismo schema que dbt seed)"""
+    import duckdb
+
+    seeds_dir = work_dir / 'seeds'
+    # Calificar con el catálogo: el archivo y el schema se llaman igual (adventureworks)
+    schema = f'"{Path(database_path).stem}"."{raw_schema}"'
+    con = duckdb.connect(str(database_path))
+    try:
+        con.execute(f'create schema if not exists {schema}')
+        for table, folder in SCALED_SEEDS.items():
+            types = seed_column_types(seeds_dir, table)
+            types_sql = ', '.join(f"'{col}': '{dtype}'" for col, dtype in types.items())
+            con.execute(f'drop table if exists {schema}."{table}"')
+            con.execute(
+                f'create table {schema}."{table}" as '
+                f"select * from read_csv_auto('{seeds_dir / folder / table}.csv', header=true, types={{{types_sql}}})"
+            )
+    finally:
+        con.close()
+
+
+def rss_kb(pid):
+    """Memoria residente de un proceso en KB (None si ya terminó)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        # Sin /proc (macOS): preguntar a ps
+        result = subprocess.run(['ps', '-o', 'rss=', '-p', str(pid)], capture_output=True, text=True)
+        return int(result.stdout.strip()) if result.stdout.strip() else None
+    return None
+
+
+def run_sampled(cmd, cwd):
+    """
+    Ejecutar un comando midiendo su memoria cada SAMPLE_INTERVAL segundos.
+    Retorna (returncode, segundos, muestras [(epoch, rss_kb)], salida).
+    """
+    started = time.time()
+    process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    samples = []
+    output = []
+
+    def read_output():
+        for line in process.stdout:
+            output.append(line)
+
+    reader = threading.Thread(target=read_output, daemon=True)
+    reader.start()
+    while process.poll() is None:
+        rss = rss_kb(process.pid)
+        if rss is not None:
+            samples.append((time.time(), rss))
+        time.sleep(SAMPLE_INTERVAL)
+    reader.join()
+    return process.returncode, time.time() - started, samples, ''.join(output)
+
+
+def parse_timestamp(value):
+    """Timestamp ISO de run_results.json (UTC) a epoch"""
+    return datetime.strptime(value.rstrip('Z'), '%Y-%m-%dT%H:%M:%S.%f').replace(tzinfo=timezone.utc).timestamp()
+
+
+def peak_mb(samples, start=None, end=None):
+    values = [rss for t, rss in samples if (start is None or t >= start) and (end is None or t <= end)]
+    return round(max(values) / 1024, 1) if values else None
+
+
+def model_stats(work_dir, samples, database_path):
+    """Tiempo, filas y pico de memoria por modelo a partir de run_results.json"""
+    import duckdb
+
+    target = work_dir / 'target'
+    results = json.loads((target / 'run_results.json').read_text())['results']
+    nodes = json.loads((target / 'manifest.json').read_text())['nodes']
+
+    con = duckdb.connect(str(database_path), read_only=True)
+    stats = {}
+    try:
+        for result in results:
+            node = nodes[result['unique_id']]
+            execute = next((t for t in result['timing'] if t['name'] == 'execute'), None)
+            start = parse_timestamp(execute['started_at']) if execute else None
+            end = parse_timestamp(execute['completed_at']) if execute else None
+            rows = None
+            if result['status'] == 'success':
+                rows = con.execute(f"select count(*) from {node['relation_name']}").fetchone()[0]
+            stats[node['name']] = {
+                'status': result['status'],
+                'seconds': round(result['execution_time'], 3),
+                'rows': rows,
+                'peak_rss_mb': peak_mb(samples, start, end),
+            }
+    finally:
+        con.close()
+    return stats
+
+
+def git_commit():
+    """(commit corto, hay cambios sin commitear en el proyecto dbt)"""
+    def git(*args):
+        result = subprocess.run(['git', *args], cwd=PROJECT_ROOT, capture_output=True, text=True)
+        return result.stdout.strip()
+    return git('rev-parse', '--short', 'HEAD') or 'unknown', bool(git('status', '--porcelain', '--', 'adventureworks'))
+
+
+def prepare_project(work_dir):
+    """Copiar el proyecto dbt (sin target ni logs) al directorio de trabajo"""
+    for name in PROJECT_FILES:
+        source = DBT_PROJECT / name
+        if source.is_dir():
+            shutil.copytree(source, work_dir / name, ignore=shutil.ignore_patterns('.sync_manifest.json'))
+        elif source.exists():
+            shutil.copy2(source, work_dir / name)
+
+
+def dbt(*args):
+    return ['dbt', *args, '--target', 'duckdb', '--profiles-dir', '.']
+
+
+def benchmark(factor, args):
+    """Ejecutar el benchmark para un factor; retorna el registro de resultados"""
+    work_dir = Path(tempfile.mkdtemp(prefix=f"dbt_bench_{factor}x_", dir=args.work_dir))
+    print(f"\n📁 Directorio de trabajo: {work_dir}")
+    prepare_project(work_dir)
+
+    if not (work_dir / 'dbt_packages').exists():
+        code, _, _, output = run_sampled(['dbt', 'deps'], work_dir)
+        if code != 0:
+            raise RuntimeError(f"dbt deps falló:\n{output}")
+
+    print(f"📈 Escalando seeds de órdenes x{factor}...")
+    source_rows = scale_seeds(work_dir / 'seeds', factor)
+    for table, rows in source_rows.items():
+        print(f"  {table}: {rows:,} filas")
+
+    raw_schema = yaml.safe_load((work_dir / 'dbt_project.yml').read_text())['vars']['raw_schema']
+    database_path = work_dir / 'target' / 'adventureworks.duckdb'
+    phases = {}
+
+    print("🌱 dbt seed...")
+    seed_cmd = dbt('seed', '--full-refresh')
+    if not args.dbt_seed_all:
+        seed_cmd += ['--exclude', *SCALED_SEEDS]
+    code, seconds, samples, output = run_sampled(seed_cmd, work_dir)
+    if code != 0:
+        raise RuntimeError(f"dbt seed falló:\n{output}")
+    phases['seed'] = {'seconds': round(seconds, 3), 'peak_rss_mb': peak_mb(samples)}
+
+    if not args.dbt_seed_all:
+        print("🦆 Cargando seeds escalados con duckdb...")
+        started = time.time()
+        load_scaled_seeds(work_dir, database_path, raw_schema)
+        phases['load_scaled'] = {'seconds': round(time.time() - started, 3)}
+
+    # Las dimensiones tipo 2 (dim_customer, dim_product) leen de los snapshots
+    print("📸 dbt snapshot...")
+    code, seconds, samples, output = run_sampled(dbt('snapshot'), work_dir)
+    if code != 0:
+        raise RuntimeError(f"dbt snapshot falló:\n{output}")
+    phases['snapshot'] = {'seconds': round(seconds, 3), 'peak_rss_mb': peak_mb(samples)}
+
+    print(f"🏗️  dbt run (threads={args.threads})...")
+    run_cmd = dbt('run', '--full-refresh', '--threads', str(args.threads))
+    if args.select:
+        run_cmd += ['--select', *args.select]
+    code, seconds, samples, output = run_sampled(run_cmd, work_dir)
+    phases['run'] = {'seconds': round(seconds, 3), 'peak_rss_mb': peak_mb(samples)}
+    if not (work_dir / 'target' / 'run_results.json').exists():
+        raise RuntimeError(f"dbt run falló:\n{output}")
+
+    models = model_stats(work_dir, samples, database_path)
+    commit, dirty = git_commit()
+    record = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'scale': factor,
+        'threads': args.threads,
+        'dbt_seed_all': args.dbt_seed_all,
+        'source_rows': source_rows,
+        'phases': phases,
+        'models': models,
+    }
+
+    if args.keep:
+        print(f"📁 Se conserva {work_dir}")
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if code != 0:
+        failed = [name for name, m in models.items() if m['status'] != 'success']
+        print(f"✗ dbt run terminó con errores: {', '.join(failed)}")
+    return record
+
+
+def print_record(record):
+    print(f"\n{'Modelo':24} {'Segundos':>10} {'Filas':>12} {'Pico MB':>9}")
+    for name, m in sorted(record['models'].items(), key=lambda item: -item[1]['seconds']):
+        rows = f"{m['rows']:,}" if m['rows'] is not None else m['status']
+        peak = m['peak_rss_mb'] if m['peak_rss_mb'] is not None else '-'
+        print(f"{name:24} {m['seconds']:>10.2f} {rows:>12} {peak:>9}")
+    for phase, p in record['phases'].items():
+        print(f"  {phase}: {p['seconds']:.1f}s" + (f", pico {p['peak_rss_mb']} MB" if p.get('peak_rss_mb') else ''))
+
+
+def load_results(path):
+    if not Path(path).exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def latest_for(results, commit, scale):
+    """Último registro de un commit (por prefijo) y escala"""
+    matches = [r for r in results if r['scale'] == scale and (r['commit'].startswith(commit) or commit.startswith(r['commit']))]
+    return matches[-1] if matches else None
+
+
+def compare(results, base, head):
+    """Comparar tiempos por modelo entre dos commits, para cada escala en común"""
+    scales = sorted({r['scale'] for r in results})
+    compared = False
+    for scale in scales:
+        old, new = latest_for(results, base, scale), latest_for(results, head, scale)
+        if not old or not new:
+            continue
+        compared = True
+        print(f"\n=== x{scale}: {old['commit']} → {new['commit']} ===")
+        print(f"{'Modelo':24} {'Antes':>9} {'Después':>9} {'Cambio':>8}  Filas")
+        for name in sorted(set(old['models']) | set(new['models'])):
+            a, b = old['models'].get(name), new['models'].get(name)
+            if not a or not b:
+                print(f"{name:24} {'solo en ' + (old['commit'] if a else new['commit']):>28}")
+                continue
+            change = (b['seconds'] - a['seconds']) / a['seconds'] if a['seconds'] else 0
+            rows = 'iguales' if a['rows'] == b['rows'] else f"{a['rows']} → {b['rows']}"
+            print(f"{name:24} {a['seconds']:>9.2f} {b['seconds']:>9.2f} {change:>+8.0%}  {rows}")
+    if not compared:
+        print(f"No hay resultados de {base} y {head} con la misma escala")
+        return 1
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark del DAG de dbt en duckdb con seeds escalados')
+    parser.add_argument('--scale', type=int, nargs='+', default=[10], help='Factores de escala (default: 10)')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='Threads de dbt (default: 1, para medir la memoria de cada modelo por separado)')
+    parser.add_argument('--select', nargs='+', help='Modelos a ejecutar (sintaxis de dbt --select)')
+    parser.add_argument('--dbt-seed-all', action='store_true', help='Cargar también los seeds escalados con dbt seed (lento)')
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT), help=f'Archivo de resultados (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--work-dir', default=None, help='Directorio para las copias temporales del proyecto')
+    parser.add_argument('--keep', action='store_true', help='No borrar la copia del proyecto al terminar')
+    parser.add_argument('--compare', nargs='+', metavar='COMMIT',
+                        help='Comparar resultados guardados: BASE [NUEVO] (default NUEVO: HEAD)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.compare:
+        base = args.compare[0]
+        head = args.compare[1] if len(args.compare) > 1 else git_commit()[0]
+        return compare(load_results(args.output), base, head)
+
+    print("=" * 60)
+    print("Benchmark del DAG de dbt en duckdb")
+    print("=" * 60)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    failed = False
+    for factor in args.scale:
+        try:
+            record = benchmark(factor, args)
+        except RuntimeError as e:
+            print(f"ERROR: {e}")
+            return 1
+        print_record(record)
+        failed = failed or any(m['status'] != 'success' for m in record['models'].values())
+        with open(output, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+    print(f"\n✓ Resultados guardados en {output}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Punto de entrada único de los scripts de AWS.
+
+Varios comandos separados por '+' corren uno detrás de otro en el mismo
+proceso: comparten la sesión de boto3, los clientes, el Account ID y el caché
+del catálogo de Glue, en vez de repetir el arranque en cada script. Cada
+comando recibe las mismas opciones que su script (ver <comando> --help); la
+cadena se corta en el primer comando que falla, salvo con --keep-going.
+
+Uso:
+    python scripts/cli.py setup + verify + report
+    python scripts/cli.py tables adventureworks --refresh + tables marts
+    python scripts/cli.py verify --count-mode query
+    python scripts/cli.py --keep-going verify + report
+"""
+
+import importlib
+import sys
+import time
+
+# comando -> (módulo, descripción)
+COMMANDS = {
+    'setup': ('sync_seeds', 'Subir los seeds cambiados a S3 y recrear sus tablas raw'),
+    'create-tables': ('create_athena_tables', 'Recrear todas las tablas raw en Athena'),
+    'verify': ('verify_deployment', 'Verificar buckets, tablas raw y marts'),
+    'report': ('student_report', 'Generar el reporte de entrega (corre dbt test)'),
+    'tables': ('glue_catalog', 'Listar las tablas de una database de Glue'),
+    'query': ('query_cache', 'Ejecutar queries en Athena con caché de resultados'),
+    'costs': ('athena_cost_report', 'Costo en Athena de cada nodo de la última corrida de dbt'),
+    'whoami': ('aws_session', 'Identidad de AWS (cacheada en disco)'),
+}
+SEPARATOR = '+'
+
+
+def usage():
+    lines = [
+        'uso: cli.py [--keep-going] COMANDO [opciones] [+ COMANDO [opciones] ...]',
+        '',
+        '  --keep-going   seguir con los demás comandos aunque uno falle',
+        '',
+        'Comandos:',
+    ]
+    lines += [f"  {name:14} {description}" for name, (_, description) in COMMANDS.items()]
+    lines += ['', "Opciones de cada comando: cli.py COMANDO --help"]
+    return '\n'.join(lines)
+
+
+def split_steps(argv):
+    """['a', '-x', '+', 'b'] -> [['a', '-x'], ['b']] (sin pasos vacíos)"""
+    steps = [[]]
+    for arg in argv:
+        if arg == SEPARATOR:
+            steps.append([])
+        else:
+            steps[-1].append(arg)
+    return [step for step in steps if step]
+
+
+def run_step(command, args):
+    """Ejecutar el main() de un script con sus argumentos; retorna el código de salida"""
+    module_name = COMMANDS[command][0]
+    module = importlib.import_module(module_name)
+    saved_argv = sys.argv
+    sys.argv = [f"{module_name}.py", *args]
+    try:
+        code = module.main()
+    except SystemExit as e:
+        # argparse sale con SystemExit en --help y en errores de opciones
+        code = e.code
+    finally:
+        sys.argv = saved_argv
+    if code is None:
+        return 0
+    return code if isinstance(code, int) else 1
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    keep_going = bool(argv) and argv[0] == '--keep-going'
+    if keep_going:
+        argv = argv[1:]
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0 if argv else 2
+
+    steps = split_steps(argv)
+    unknown = [step[0] for step in steps if step[0] not in COMMANDS]
+    if unknown:
+        print(f"❌ Comando desconocido: {', '.join(unknown)}\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    exit_code = 0
+    for i, (command, *args) in enumerate(steps, 1):
+        if len(steps) > 1:
+            print(f"\n▶️  [{i}/{len(steps)}] {command} {' '.join(args)}".rstrip(), flush=True)
+        started = time.monotonic()
+        code = run_step(command, args)
+        if len(steps) > 1:
+            print(f"⏱️  {command}: {time.monotonic() - started:.1f}s (código {code})", flush=True)
+        if code != 0:
+            if not keep_going:
+                return code
+            exit_code = exit_code or code
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
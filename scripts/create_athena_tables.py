@@ -1,123 +1,72 @@
 #!/usr/bin/env python3
 """
-Script para crear tablas externas en Athena desde los CSVs en S3.
-Este script lee los CSVs de seeds y crea tablas en Athena.
+Script para crear tablas externas en Athena desde los seeds en S3.
+Por defecto las tablas apuntan a la versión Parquet de los seeds (ver
+seed_parquet.py); con --format csv se usan los CSVs originales.
 """
 
-import boto3
-import csv
+import argparse
 import os
-import time
 from pathlib import Path
 
+import aws_session
+from athena_runner import AthenaQueryRunner
+from schema_inference import get_csv_schema
+import seed_parquet
+
 # Configuración
-AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+AWS_REGION = aws_session.AWS_REGION
 ATHENA_DATABASE = 'adventureworks'
 
-# Obtener Account ID
-sts = boto3.client('sts', region_name=AWS_REGION)
-account_id = sts.get_caller_identity()['Account']
+# Número máximo de queries en vuelo (una por tabla: su DROP → CREATE va en cadena)
+ATHENA_WORKERS = int(os.environ.get('ATHENA_WORKERS', '5'))
 
-RAW_BUCKET = f"dbt-adventureworks-raw-{account_id}"
-SILVER_BUCKET = f"dbt-adventureworks-silver-{account_id}"
-ATHENA_OUTPUT = f"s3://{SILVER_BUCKET}/athena-results/"
+# Formato de los seeds en S3: parquet (make upload-seeds) o csv
+SEED_FORMAT = os.environ.get('SEED_FORMAT', 'parquet')
 
-athena = boto3.client('athena', region_name=AWS_REGION)
+_runner = None
 
-# Mapeo de tipos de datos básico
-def infer_type_from_value(value):
-    """Inferir tipo de dato SQL desde un valor de ejemplo"""
-    if not value or value.strip() == '':
-        return 'string'
-    
-    value = value.strip()
-    
-    # Intentar parsear como número
-    try:
-        if '.' in value:
-            float(value)
-            return 'double'
-        else:
-            int(value)
-            return 'bigint'
-    except ValueError:
-        pass
-    
-    # Fechas comunes (simplificado)
-    if len(value) == 10 and value.count('-') == 2:
-        return 'date'
-    
-    if len(value) == 19 and 'T' in value or ' ' in value:
-        return 'timestamp'
-    
-    # Default
-    return 'string'
 
+def get_runner():
+    """Runner de Athena del proceso (el cliente y el Account ID se piden al primer uso)"""
+    global _runner
+    if _runner is None:
+        _runner = AthenaQueryRunner(aws_session.client('athena'), ATHENA_DATABASE, aws_session.athena_output())
+    return _runner
 
-def get_csv_schema(csv_path):
-    """Leer un CSV y obtener el esquema inferido"""
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        
-        # Obtener headers
-        headers = reader.fieldnames
-        
-        # Leer primera fila para inferir tipos
-        first_row = next(reader, None)
-        
-        if not first_row:
-            # CSV vacío, usar string para todo
-            return [(h, 'string') for h in headers]
-        
-        schema = []
-        for header in headers:
-            value = first_row.get(header, '')
-            col_type = infer_type_from_value(value)
-            # Limpiar nombres de columnas
-            clean_header = header.lower().replace(' ', '_').replace('-', '_')
-            schema.append((clean_header, col_type))
-        
-        return schema
 
-
-def execute_athena_query(query_string):
+def execute_athena_query(query_string, label=None):
     """Ejecutar una query en Athena y esperar el resultado"""
-    print(f"Ejecutando query: {query_string[:100]}...")
-    
-    response = athena.start_query_execution(
-        QueryString=query_string,
-        QueryExecutionContext={'Database': ATHENA_DATABASE},
-        ResultConfiguration={'OutputLocation': ATHENA_OUTPUT}
-    )
-    
-    query_execution_id = response['QueryExecutionId']
-    
-    # Esperar a que termine
-    max_wait = 30
-    waited = 0
-    while waited < max_wait:
-        response = athena.get_query_execution(QueryExecutionId=query_execution_id)
-        status = response['QueryExecution']['Status']['State']
-        
-        if status in ['SUCCEEDED', 'FAILED', 'CANCELLED']:
-            break
-        
-        time.sleep(1)
-        waited += 1
+    prefix = f"[{label}] " if label else ""
+    print(f"{prefix}Ejecutando query: {' '.join(query_string.split())[:100]}...")
     
-    if status == 'SUCCEEDED':
-        print(f"  ✓ Query ejecutada exitosamente")
-        return True
+    result = get_runner().run(query_string, label=label)
+    report_query(result)
+    return result.succeeded
+
+
+def report_query(result):
+    """Imprimir el resultado de una query terminada"""
+    prefix = f"[{result.label}] " if result.label else ""
+    if result.succeeded:
+        print(f"  {prefix}✓ Query ejecutada exitosamente ({result.elapsed:.1f}s)")
     else:
-        reason = response['QueryExecution']['Status'].get('StateChangeReason', 'Unknown error')
-        print(f"  ✗ Query falló: {reason}")
-        return False
+        reason = result.reason or 'Unknown error'
+        print(f"  {prefix}✗ Query falló: {reason}")
 
 
-def create_table_from_csv(csv_path, folder_name, table_name):
-    """Crear tabla externa en Athena desde un CSV"""
-    print(f"\nCreando tabla: {table_name}")
+def build_parquet_table_queries(folder_name, table_name, info):
+    """Construir la cadena DROP → CREATE de una tabla externa sobre los Parquet"""
+    s3_location = f"s3://{aws_session.raw_bucket()}/parquet/{folder_name}/{table_name}/"
     
+    drop_query = f"DROP TABLE IF EXISTS {ATHENA_DATABASE}.{table_name}"
+    create_query = seed_parquet.build_parquet_ddl(ATHENA_DATABASE, table_name, info, s3_location)
+    
+    return [drop_query, create_query], s3_location
+
+
+def build_table_queries(csv_path, folder_name, table_name):
+    """Construir la cadena DROP → CREATE de una tabla externa desde un CSV"""
     # Obtener esquema
     schema = get_csv_schema(csv_path)
     
@@ -126,11 +75,10 @@ def create_table_from_csv(csv_path, folder_name, table_name):
     
     # Location en S3 - cada tabla en su propia carpeta
     # Athena requiere que cada tabla apunte a una carpeta con archivos de la misma estructura
-    s3_location = f"s3://{RAW_BUCKET}/seeds/{folder_name}/{table_name}/"
+    s3_location = f"s3://{aws_session.raw_bucket()}/seeds/{folder_name}/{table_name}/"
     
     # DROP TABLE IF EXISTS
     drop_query = f"DROP TABLE IF EXISTS {ATHENA_DATABASE}.{table_name}"
-    execute_athena_query(drop_query)
     
     # CREATE EXTERNAL TABLE
     create_query = f"""
@@ -146,7 +94,16 @@ def create_table_from_csv(csv_path, folder_name, table_name):
     )
     """
     
-    success = execute_athena_query(create_query)
+    return [drop_query, create_query], s3_location
+
+
+def create_table_from_csv(csv_path, folder_name, table_name):
+    """Crear tabla externa en Athena desde un CSV"""
+    print(f"\nCreando tabla: {table_name}")
+    
+    queries, s3_location = build_table_queries(csv_path, folder_name, table_name)
+    
+    success = all(execute_athena_query(query, label=table_name) for query in queries)
     
     if success:
         print(f"  ✓ Tabla {table_name} creada en {s3_location}")
@@ -154,14 +111,32 @@ def create_table_from_csv(csv_path, folder_name, table_name):
     return success
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Crear tablas RAW en Athena desde los seeds')
+    parser.add_argument(
+        '--format', choices=['parquet', 'csv'], default=SEED_FORMAT,
+        help=f'Formato de los seeds en S3 (default: {SEED_FORMAT})'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=ATHENA_WORKERS,
+        help=f'Queries en vuelo (una por tabla); 1 = secuencial (default: {ATHENA_WORKERS})'
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    workers = max(1, args.workers)
+
     print("=" * 60)
     print("Creando tablas RAW en Athena desde seeds")
     print("=" * 60)
-    print(f"Account ID: {account_id}")
+    print(f"Account ID: {aws_session.account_id()}")
     print(f"Region: {AWS_REGION}")
     print(f"Database: {ATHENA_DATABASE}")
-    print(f"Raw Bucket: {RAW_BUCKET}")
+    print(f"Raw Bucket: {aws_session.raw_bucket()}")
+    print(f"Formato: {args.format}")
+    print(f"Workers: {workers}")
     print("=" * 60)
     
     # Base path para seeds
@@ -174,9 +149,22 @@ def main():
     # Iterar sobre las carpetas de seeds
     folders = ['date', 'person', 'production', 'sales']
     
-    created_tables = []
+    chains = []
+    locations = {}
     failed_tables = []
     
+    parquet_tables = None
+    if args.format == 'parquet':
+        # Esquema final de la conversión hecha por make upload-seeds
+        parquet_tables = seed_parquet.load_schema()
+        if parquet_tables is None:
+            print("⚠️  No se encontró la conversión a Parquet, convirtiendo seeds...")
+            try:
+                parquet_tables = seed_parquet.convert_all()
+            except RuntimeError as e:
+                print(f"ERROR: {e}")
+                return 1
+    
     for folder in folders:
         folder_path = seeds_path / folder
         
@@ -185,21 +173,39 @@ def main():
             continue
         
         # Buscar CSVs en la carpeta
-        csv_files = list(folder_path.glob('*.csv'))
-        
-        for csv_file in csv_files:
+        for csv_file in sorted(folder_path.glob('*.csv')):
             table_name = csv_file.stem  # nombre sin extensión
             
             try:
-                success = create_table_from_csv(csv_file, folder, table_name)
-                if success:
-                    created_tables.append(table_name)
+                if parquet_tables is not None:
+                    queries, locations[table_name] = build_parquet_table_queries(
+                        folder, table_name, parquet_tables[table_name]
+                    )
                 else:
-                    failed_tables.append(table_name)
+                    queries, locations[table_name] = build_table_queries(csv_file, folder, table_name)
+                chains.append((table_name, queries))
             except Exception as e:
                 print(f"  ✗ Error creando tabla {table_name}: {e}")
                 failed_tables.append(table_name)
     
+    # Cada tabla es una cadena DROP → CREATE: el orden se respeta dentro de la
+    # tabla mientras las distintas tablas avanzan en paralelo
+    print(f"\nEjecutando {len(chains)} tablas (máximo {workers} queries en vuelo)...")
+    runner = get_runner()
+    try:
+        outcome = runner.run_chains(chains, max_in_flight=workers, on_finish=report_query)
+    except KeyboardInterrupt:
+        runner.cancel_all()
+        raise
+    
+    created_tables = []
+    for (table_name, queries), results in zip(chains, outcome):
+        if len(results) == len(queries) and all(result.succeeded for result in results):
+            print(f"  ✓ Tabla {table_name} creada en {locations[table_name]}")
+            created_tables.append(table_name)
+        else:
+            failed_tables.append(table_name)
+    
     # Resumen
     print("\n" + "=" * 60)
     print("RESUMEN")
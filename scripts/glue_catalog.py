@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Acceso compartido al catálogo de Glue para descubrir tablas.
+
+get_tables devuelve como mucho una página por llamada (100 tablas): aquí se
+recorren todas las páginas, se filtra del lado de Glue con Expression (patrón
+estilo Hive: * como comodín y | como alternativa, ej: 'dim_*|fct_*') y la
+lista resultante se guarda con un TTL corto, en memoria y en disco, para que
+los scripts que corren uno detrás de otro no vuelvan a leer el catálogo.
+
+Quien necesita el estado exacto (por ejemplo, para decidir si recrear una
+tabla) pide la lista con max_age=0; el resultado igual queda en el caché.
+
+Uso:
+    python scripts/glue_catalog.py adventureworks [--expression 'sales*'] [--refresh]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / 'adventureworks' / 'target' / 'glue_cache'
+
+AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+
+# Segundos que vale una lista de tablas cacheada
+CACHE_TTL = int(os.environ.get('GLUE_CACHE_TTL', '60'))
+
+# Cambiar si cambia el formato del caché, para invalidarlo
+CACHE_VERSION = 1
+
+
+def _encode(value):
+    """Los datetime de Glue (UpdateTime, CreateTime...) se guardan como ISO"""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    raise TypeError(f"No se puede serializar {type(value).__name__}")
+
+
+def _decode(obj):
+    if '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    return obj
+
+
+class GlueCatalog:
+    """Listas de tablas de Glue paginadas, filtradas con Expression y cacheadas con TTL"""
+
+    def __init__(self, glue_client, ttl=CACHE_TTL, cache_dir=CACHE_DIR, clock=time.time):
+        self.glue = glue_client
+        self.ttl = ttl
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._clock = clock
+        # (database, expression) -> (fetched_at, tablas)
+        self._memory = {}
+        self.api_calls = 0
+
+    def _cache_path(self, database, expression):
+        digest = hashlib.sha256(f"{expression or ''}".encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"{database}-{digest}-v{CACHE_VERSION}.json"
+
+    def _read_cache(self, database, expression, max_age):
+        key = (database, expression)
+        entry = self._memory.get(key)
+        if entry is None and self.cache_dir is not None:
+            path = self._cache_path(database, expression)
+            try:
+                data = json.loads(path.read_text(), object_hook=_decode)
+                entry = (data['fetched_at'], data['tables'])
+                self._memory[key] = entry
+            except (OSError, ValueError, KeyError):
+                entry = None
+        if entry is not None and self._clock() - entry[0] < max_age:
+            return entry[1]
+        return None
+
+    def _write_cache(self, database, expression, tables):
+        fetched_at = self._clock()
+        self._memory[(database, expression)] = (fetched_at, tables)
+        if self.cache_dir is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._cache_path(database, expression)
+        tmp_path = path.with_suffix(f'.tmp{os.getpid()}')
+        tmp_path.write_text(json.dumps({
+            'database': database,
+            'expression': expression,
+            'fetched_at': fetched_at,
+            'tables': tables,
+        }, default=_encode))
+        os.replace(tmp_path, path)
+
+    def _fetch(self, database, expression):
+        kwargs = {'DatabaseName': database}
+        if expression:
+            kwargs['Expression'] = expression
+        tables = []
+        try:
+            for page in self.glue.get_paginator('get_tables').paginate(**kwargs):
+                self.api_calls += 1
+                tables.extend(page.get('TableList', []))
+        except self.glue.exceptions.EntityNotFoundException:
+            # La database no existe: lista vacía
+            pass
+        return tables
+
+    def tables(self, database, expression=None, max_age=None):
+        """Tablas (dicts de get_tables) de una database, opcionalmente filtradas por nombre"""
+        max_age = self.ttl if max_age is None else max_age
+        tables = self._read_cache(database, expression, max_age)
+        if tables is None:
+            tables = self._fetch(database, expression)
+            self._write_cache(database, expression, tables)
+        return tables
+
+    def table_names(self, database, expression=None, max_age=None):
+        return [t['Name'] for t in self.tables(database, expression, max_age)]
+
+    def table(self, database, name, max_age=None):
+        """Una tabla, buscada en la lista completa de la database (None si no existe)"""
+        for table in self.tables(database, max_age=max_age):
+            if table['Name'] == name:
+                return table
+        return None
+
+    def invalidate(self, database=None):
+        """Olvidar las listas cacheadas (de una database o de todas), p. ej. tras crear tablas"""
+        for key in [k for k in self._memory if database is None or k[0] == database]:
+            del self._memory[key]
+        if self.cache_dir is not None and self.cache_dir.exists():
+            pattern = f"{database}-*.json" if database else '*.json'
+            for path in self.cache_dir.glob(pattern):
+                path.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Listar las tablas de una database de Glue')
+    parser.add_argument('database', help='Database de Glue')
+    parser.add_argument('--expression', help="Filtro por nombre estilo Hive (ej: 'dim_*|fct_*')")
+    parser.add_argument('--refresh', action='store_true', help='Ignorar el caché')
+    args = parser.parse_args()
+
+    import aws_session
+
+    catalog = GlueCatalog(aws_session.client('glue', AWS_REGION))
+    tables = catalog.tables(args.database, args.expression, max_age=0 if args.refresh else None)
+    for table in sorted(tables, key=lambda t: t['Name']):
+        table_type = table.get('Parameters', {}).get('table_type') or table.get('TableType', '')
+        print(f"  {table['Name']:40} {table_type}")
+    source = f"{catalog.api_calls} llamadas a Glue" if catalog.api_calls else 'caché'
+    print(f"📋 {len(tables)} tablas en {args.database} ({source})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
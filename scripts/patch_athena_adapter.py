@@ -1,104 +1,407 @@
 #!/usr/bin/env python3
 """
-Script para aplicar parche a dbt-athena adapter 1.4.2
-Resuelve el bug: DataCatalog {schema_name} was not found
+Parche de dbt-athena (impl.py) para las versiones listadas en PATCHES.
+
+1. list_relations_without_caching: no consulta el data catalog de cada schema
+   (bug de 1.4.2: "DataCatalog {schema_name} was not found", schema_relation.database
+   trae el nombre del schema) y usa siempre AwsDataCatalog.
+2. Caché de relaciones de la corrida: al inicio dbt lista las tablas de cada
+   schema que usa (adventureworks, marts, staging, snapshots) con get_tables
+   paginado; esa misma lista, que ya trae la definición completa de cada tabla,
+   queda en memoria, y get_table_type / get_columns_in_relation la usan en
+   lugar de un get_table a Glue por relación. Una entrada se descarta cuando
+   dbt crea, borra o renombra la relación, y después de leerla una vez (dbt
+   consulta una relación justo antes de modificarla): las consultas siguientes
+   van a Glue.
+
+Los métodos se ubican con ast (no por coincidencia exacta de texto) y se
+reemplazan solo si su AST coincide con el de la versión conocida, sin parche
+o con el parche anterior (v1, que solo comentaba el bloque del data catalog).
+Antes de escribir se guarda impl.py.orig.
+
+Uso:
+    python scripts/patch_athena_adapter.py             # aplicar
+    python scripts/patch_athena_adapter.py --dry-run   # mostrar el diff sin escribir
+    python scripts/patch_athena_adapter.py --verify    # error si no está aplicado
+    python scripts/patch_athena_adapter.py --revert    # restaurar impl.py.orig
 """
-import os
+import argparse
+import ast
+import difflib
+import hashlib
+import re
+import shutil
 import sys
+import textwrap
 from pathlib import Path
 
+PATCH_VERSION = 2
+MARKER = f"# adventureworks-patch v{PATCH_VERSION}"
+
+RELATION_CACHE = f'''
+{MARKER}: caché de tablas de Glue de la corrida (scripts/patch_athena_adapter.py)
+class _RunRelationCache:
+    """Tablas de Glue leídas al listar cada schema, para no pedirlas de nuevo con get_table"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._tables = {{}}
+
+    def store(self, schema, tables):
+        with self._lock:
+            for table in tables:
+                self._tables[(schema.lower(), table["Name"].lower())] = table
+
+    def take(self, schema, name):
+        """La tabla cacheada (una sola vez: dbt consulta una relación justo antes de modificarla)"""
+        with self._lock:
+            return self._tables.pop((str(schema).lower(), str(name).lower()), None)
+
+    def evict(self, relation):
+        if relation is not None and relation.schema and relation.identifier:
+            self.take(relation.schema, relation.identifier)
+
+
+_relation_cache = _RunRelationCache()
+'''
+
+LIST_RELATIONS = f'''
+def list_relations_without_caching(
+    self,
+    schema_relation: AthenaRelation,
+) -> List[BaseRelation]:
+    {MARKER}: se usa siempre AwsDataCatalog (en 1.4.2 schema_relation.database trae
+    # el nombre del schema y _get_data_catalog falla) y las tablas quedan en _relation_cache
+    conn = self.connections.get_thread_connection()
+    client = conn.handle
+    with boto3_client_lock:
+        glue_client = client.session.client("glue", region_name=client.region_name, config=get_boto3_config())
+    paginator = glue_client.get_paginator("get_tables")
+    page_iterator = paginator.paginate(DatabaseName=schema_relation.schema)
+
+    relations = []
+    quote_policy = {{"database": True, "schema": True, "identifier": True}}
+
+    try:
+        for page in page_iterator:
+            tables = page["TableList"]
+            _relation_cache.store(schema_relation.schema, tables)
+            for table in tables:
+                if "TableType" not in table:
+                    logger.debug(f"Table '{{table['Name']}}' has no TableType attribute - Ignoring")
+                    continue
+                _type = table["TableType"]
+                if _type == "VIRTUAL_VIEW":
+                    _type = self.Relation.View
+                else:
+                    _type = self.Relation.Table
+
+                relations.append(
+                    self.Relation.create(
+                        schema=schema_relation.schema,
+                        database=schema_relation.database,
+                        identifier=table["Name"],
+                        quote_policy=quote_policy,
+                        type=_type,
+                    )
+                )
+    except ClientError as e:
+        # don't error out when schema doesn't exist
+        # this allows dbt to create and manage schemas/databases
+        logger.debug(f"Schema '{{schema_relation.schema}}' does not exist - Ignoring: {{e}}")
+
+    return relations
+'''
+
+GET_TABLE_TYPE = f'''
+@available
+def get_table_type(self, db_name, table_name):
+    {MARKER}: primero la tabla listada al inicio de la corrida
+    table = _relation_cache.take(db_name, table_name)
+    if table is None:
+        conn = self.connections.get_thread_connection()
+        client = conn.handle
+
+        with boto3_client_lock:
+            glue_client = client.session.client("glue", region_name=client.region_name, config=get_boto3_config())
+
+        try:
+            table = glue_client.get_table(DatabaseName=db_name, Name=table_name).get("Table", {{}})
+        except glue_client.exceptions.EntityNotFoundException as e:
+            logger.debug(f"Error calling Glue get_table: {{e}}")
+            return None
+
+    _type = self.relation_type_map.get(table.get("TableType", "Table"))
+    _specific_type = table.get("Parameters", {{}}).get("table_type", "")
+
+    if _specific_type.lower() == "iceberg":
+        _type = "iceberg_table"
+
+    if _type is None:
+        raise ValueError("Table type cannot be None")
+
+    logger.debug("table_name : " + table_name)
+    logger.debug("table type : " + _type)
+
+    return _type
+'''
+
+GET_COLUMNS = f'''
+@available
+def get_columns_in_relation(self, relation: AthenaRelation) -> List[Column]:
+    {MARKER}: primero la tabla listada al inicio de la corrida
+    table = _relation_cache.take(relation.schema, relation.identifier)
+    if table is None:
+        conn = self.connections.get_thread_connection()
+        client = conn.handle
+
+        with boto3_client_lock:
+            glue_client = client.session.client("glue", region_name=client.region_name, config=get_boto3_config())
+
+        table = glue_client.get_table(DatabaseName=relation.schema, Name=relation.identifier)["Table"]
+
+    columns = [c for c in table["StorageDescriptor"]["Columns"] if self._is_current_column(c)]
+    partition_keys = table.get("PartitionKeys", [])
+
+    logger.debug(f"Columns in relation {{relation.identifier}}: {{columns + partition_keys}}")
+
+    return [Column(c["Name"], c["Type"]) for c in columns + partition_keys]
+'''
+
+CACHE_HOOKS = f'''
+{MARKER}: la tabla cacheada de una relación que dbt crea, borra o renombra ya no vale
+@available
+def cache_added(self, relation: Optional[BaseRelation]) -> str:
+    _relation_cache.evict(relation)
+    return super().cache_added(relation)
+
+@available
+def cache_dropped(self, relation: Optional[BaseRelation]) -> str:
+    _relation_cache.evict(relation)
+    return super().cache_dropped(relation)
+
+@available
+def cache_renamed(self, from_relation: Optional[BaseRelation], to_relation: Optional[BaseRelation]) -> str:
+    _relation_cache.evict(from_relation)
+    _relation_cache.evict(to_relation)
+    return super().cache_renamed(from_relation, to_relation)
+'''
+
+# Por versión de dbt-athena: huella del AST de cada método que se reemplaza
+# (original y con el parche v1) y su versión parcheada
+PATCHES = {
+    '1.4.2': {
+        'anchor': 'boto3_client_lock',
+        'methods': {
+            'list_relations_without_caching': {
+                'fingerprints': {'e51414ab8ff253f6', 'effa1dcadd67f2b6'},
+                'source': LIST_RELATIONS,
+            },
+            'get_table_type': {
+                'fingerprints': {'e049f16a1bd7be43'},
+                'source': GET_TABLE_TYPE,
+            },
+            'get_columns_in_relation': {
+                'fingerprints': {'a71793c0c5a6139e'},
+                'source': GET_COLUMNS,
+            },
+        },
+        # Se agregan a AthenaAdapter después de este método
+        'insert_after': 'get_columns_in_relation',
+        'new_methods': CACHE_HOOKS,
+    },
+}
+
+CLASS_NAME = 'AthenaAdapter'
+
+
 def find_impl_file():
     """Encuentra el archivo impl.py del adapter de athena"""
     # Buscar desde el directorio del proyecto (parent del script)
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
     venv_path = project_root / '.venv'
-    
+
     if not venv_path.exists():
         print(f"❌ No se encontró .venv/ en {project_root}. Ejecuta 'make install' primero.")
         return None
-    
+
     # Buscar impl.py en site-packages
     site_packages = list(venv_path.glob('**/site-packages/dbt/adapters/athena/impl.py'))
-    
+
     if not site_packages:
         print("❌ No se encontró dbt/adapters/athena/impl.py")
         return None
-    
+
     return site_packages[0]
 
-def check_if_patched(impl_file):
-    """Verifica si el archivo ya está parcheado"""
-    content = impl_file.read_text()
-    return "Skip data catalog check" in content or "# This is a workaround for dbt-athena" in content
 
-def apply_patch(impl_file):
-    """Aplica el parche al archivo impl.py"""
-    content = impl_file.read_text()
-    
-    # Buscar la sección a parchear
-    original_code = """    def list_relations_without_caching(
-        self,
-        schema_relation: AthenaRelation,
-    ) -> List[BaseRelation]:
-        catalog_id = None
-        if schema_relation.database is not None and schema_relation.database.lower() != "awsdatacatalog":
-            data_catalog = self._get_data_catalog(schema_relation.database.lower())
-            # For non-Glue Data Catalogs, use the original Athena query against INFORMATION_SCHEMA approach
-            if data_catalog["Type"] != "GLUE":
-                return super().list_relations_without_caching(schema_relation)
-            else:
-                catalog_id = data_catalog["Parameters"]["catalog-id"]"""
-    
-    patched_code = """    def list_relations_without_caching(
-        self,
-        schema_relation: AthenaRelation,
-    ) -> List[BaseRelation]:
-        catalog_id = None
-        # Skip data catalog check - just use default AwsDataCatalog
-        # This is a workaround for dbt-athena 1.4.2 bug where schema_relation.database
-        # is set to the schema name instead of the actual database/catalog name
-        # if schema_relation.database is not None and schema_relation.database.lower() != "awsdatacatalog":
-        #     data_catalog = self._get_data_catalog(schema_relation.database.lower())
-        #     # For non-Glue Data Catalogs, use the original Athena query against INFORMATION_SCHEMA approach
-        #     if data_catalog["Type"] != "GLUE":
-        #         return super().list_relations_without_caching(schema_relation)
-        #     else:
-        #         catalog_id = data_catalog["Parameters"]["catalog-id"]"""
-    
-    if original_code in content:
-        # Aplicar parche
-        new_content = content.replace(original_code, patched_code)
-        impl_file.write_text(new_content)
-        return True
-    
-    return False
+def adapter_version(impl_file):
+    """Versión de dbt-athena instalada (de __version__.py, junto a impl.py)"""
+    version_file = Path(impl_file).parent / '__version__.py'
+    match = re.search(r'version\s*=\s*["\']([^"\']+)', version_file.read_text()) if version_file.exists() else None
+    return match.group(1) if match else None
+
+
+def fingerprint(node):
+    """Huella del AST de una función: ignora formato y comentarios"""
+    return hashlib.sha256(ast.dump(node, include_attributes=False).encode()).hexdigest()[:16]
+
+
+def adapter_class(tree):
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == CLASS_NAME:
+            return node
+    raise ValueError(f"No se encontró la clase {CLASS_NAME}")
+
+
+def class_methods(class_node):
+    return {node.name: node for node in class_node.body if isinstance(node, ast.FunctionDef)}
+
+
+def node_span(node):
+    """(primera línea, última línea) de un nodo, contando sus decoradores (base 1)"""
+    first = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', [])])
+    return first, node.end_lineno
+
+
+def indent_block(source, indent):
+    return textwrap.indent(textwrap.dedent(source).strip('\n'), indent) + '\n'
+
+
+def is_patched(content):
+    return MARKER in content
+
+
+def build_patch(content, patch):
+    """Contenido parcheado de impl.py; ValueError si el código no es el esperado"""
+    tree = ast.parse(content)
+    methods = class_methods(adapter_class(tree))
+    lines = content.splitlines(keepends=True)
+
+    # (inicio, fin, texto nuevo) de cada reemplazo, en números de línea base 1
+    edits = []
+    for name, spec in patch['methods'].items():
+        node = methods.get(name)
+        if node is None:
+            raise ValueError(f"No se encontró {CLASS_NAME}.{name}")
+        found = fingerprint(node)
+        if found not in spec['fingerprints']:
+            raise ValueError(f"{CLASS_NAME}.{name} no es el esperado (huella {found})")
+        start, end = node_span(node)
+        indent = re.match(r'\s*', lines[start - 1]).group(0)
+        edits.append((start, end, indent_block(spec['source'], indent)))
+
+    anchor_method = methods[patch['insert_after']]
+    _, end = node_span(anchor_method)
+    indent = re.match(r'\s*', lines[anchor_method.lineno - 1]).group(0)
+    edits.append((end + 1, end, '\n' + indent_block(patch['new_methods'], indent)))
+
+    anchor = next(
+        (node for node in tree.body if isinstance(node, ast.Assign)
+         and any(isinstance(t, ast.Name) and t.id == patch['anchor'] for t in node.targets)),
+        None,
+    )
+    if anchor is None:
+        raise ValueError(f"No se encontró {patch['anchor']} a nivel de módulo")
+    edits.append((anchor.end_lineno + 1, anchor.end_lineno, '\n\n' + indent_block(RELATION_CACHE, '')))
+
+    # De abajo hacia arriba, para que los números de línea sigan valiendo
+    for start, end, text in sorted(edits, key=lambda e: e[0], reverse=True):
+        lines[start - 1:end] = [text]
+    patched = ''.join(lines)
+    ast.parse(patched)
+    return patched
+
+
+def verify(content, patch):
+    """Errores de un impl.py que debería estar parcheado (lista vacía si está bien)"""
+    errors = []
+    if not is_patched(content):
+        return ["No tiene el parche v%d" % PATCH_VERSION]
+    tree = ast.parse(content)
+    methods = class_methods(adapter_class(tree))
+    for name in list(patch['methods']) + ['cache_added', 'cache_dropped', 'cache_renamed']:
+        if name not in methods:
+            errors.append(f"Falta {CLASS_NAME}.{name}")
+    expected = ast.parse(textwrap.dedent(patch['methods']['list_relations_without_caching']['source']))
+    listing = methods.get('list_relations_without_caching')
+    if listing is not None and fingerprint(listing) != fingerprint(expected.body[0]):
+        errors.append(f"{CLASS_NAME}.list_relations_without_caching fue modificado después del parche")
+    if not any(isinstance(n, ast.ClassDef) and n.name == '_RunRelationCache' for n in tree.body):
+        errors.append("Falta _RunRelationCache")
+    return errors
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Parchear dbt-athena: data catalog y caché de relaciones de la corrida')
+    parser.add_argument('--impl', help='Ruta a dbt/adapters/athena/impl.py (default: la de .venv)')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--dry-run', action='store_true', help='Mostrar el diff sin escribir')
+    mode.add_argument('--verify', action='store_true', help='Verificar que el parche está aplicado')
+    mode.add_argument('--revert', action='store_true', help='Restaurar impl.py.orig')
+    return parser.parse_args()
+
 
 def main():
     """Función principal"""
+    args = parse_args()
     print("🔧 Parcheando dbt-athena adapter...")
-    
+
     # Encontrar archivo
-    impl_file = find_impl_file()
-    if not impl_file:
-        sys.exit(1)
-    
+    impl_file = Path(args.impl) if args.impl else find_impl_file()
+    if not impl_file or not impl_file.exists():
+        return 1
+    backup = impl_file.with_name(impl_file.name + '.orig')
     print(f"📁 Encontrado: {impl_file}")
-    
+
+    if args.revert:
+        if not backup.exists():
+            print(f"❌ No existe {backup}")
+            return 1
+        shutil.copy2(backup, impl_file)
+        print("↩️  impl.py restaurado")
+        return 0
+
+    version = adapter_version(impl_file)
+    patch = PATCHES.get(version)
+    if patch is None:
+        print(f"⚠️  dbt-athena {version} no está soportado (versiones: {', '.join(PATCHES)})")
+        return 1
+
+    content = impl_file.read_text()
+    if args.verify:
+        errors = verify(content, patch)
+        for error in errors:
+            print(f"❌ {error}")
+        if not errors:
+            print(f"✅ Parche v{PATCH_VERSION} aplicado (dbt-athena {version})")
+        return 1 if errors else 0
+
     # Verificar si ya está parcheado
-    if check_if_patched(impl_file):
+    if is_patched(content):
         print("✅ El parche ya está aplicado")
         return 0
-    
-    # Aplicar parche
-    if apply_patch(impl_file):
-        print("✅ Parche aplicado exitosamente")
-        print("📝 Ver ATHENA_ADAPTER_PATCH.md para más detalles")
-        return 0
-    else:
-        print("⚠️  No se pudo aplicar el parche (estructura del código diferente)")
-        print("   El archivo puede ya estar modificado o tener una versión diferente")
+
+    try:
+        patched = build_patch(content, patch)
+    except ValueError as e:
+        print(f"⚠️  No se pudo aplicar el parche: {e}")
+        print("   El archivo puede tener cambios locales: probar con --revert o reinstalar dbt-athena")
         return 1
 
+    if args.dry_run:
+        sys.stdout.writelines(difflib.unified_diff(
+            content.splitlines(keepends=True), patched.splitlines(keepends=True),
+            fromfile=str(impl_file), tofile=f"{impl_file} (parcheado)"))
+        return 0
+
+    if not backup.exists():
+        shutil.copy2(impl_file, backup)
+    impl_file.write_text(patched)
+    print(f"✅ Parche v{PATCH_VERSION} aplicado (dbt-athena {version}, original en {backup.name})")
+    return 0
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Caché local de resultados de Athena para los scripts y las queries de ejemplo.
+
+Cada resultado se guarda en disco con una clave que combina el SQL
+normalizado con la versión de las tablas que lee:
+  - metadata de Glue (UpdateTime y, en Iceberg, metadata_location, que cambia
+    con cada commit),
+  - para las tablas raw, el hash de los seeds en .sync_manifest.json (sync_seeds
+    puede subir datos nuevos sin tocar la tabla en Glue),
+  - sin Glue, el timestamp del modelo en la última corrida de dbt
+    (target/run_results.json).
+Si nada cambió, repetir una verificación o un reporte no ejecuta ninguna query
+(ni escanea datos). Si no se puede saber la versión de alguna tabla, o la query
+no es determinística (now(), rand()...), la query no se cachea.
+
+El caché tiene un tamaño máximo y desaloja primero las entradas usadas hace
+más tiempo (LRU según la fecha de modificación de cada archivo).
+
+Opcionalmente se activa el result reuse de Athena (ResultReuseConfiguration)
+para las queries que no están en el caché. Athena no detecta cambios en los
+datos de tablas Hive, así que viene desactivado.
+
+Uso:
+    python scripts/query_cache.py "SELECT COUNT(*) FROM adventureworks.marts.fct_sales"
+    python scripts/query_cache.py --file docs/EXAMPLE_QUERIES.sql [--route]
+    python scripts/query_cache.py --stats | --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / 'adventureworks' / 'target' / 'query_cache'
+RUN_RESULTS_PATH = PROJECT_ROOT / 'adventureworks' / 'target' / 'run_results.json'
+SEEDS_MANIFEST_PATH = PROJECT_ROOT / 'adventureworks' / 'seeds' / '.sync_manifest.json'
+
+AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+ATHENA_DATABASE = 'adventureworks'
+
+# Tamaño máximo del caché en disco
+MAX_BYTES = int(os.environ.get('QUERY_CACHE_MAX_MB', '64')) * 1024 * 1024
+
+# Minutos de result reuse de Athena (0 = desactivado)
+RESULT_REUSE_MINUTES = int(os.environ.get('ATHENA_RESULT_REUSE_MINUTES', '0'))
+
+# Cambiar si cambia el formato de las entradas, para invalidar el caché
+CACHE_VERSION = 1
+
+CACHEABLE_RE = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+NON_DETERMINISTIC_RE = re.compile(
+    r"\b(now|rand|random|uuid|current_date|current_time|current_timestamp|localtime|localtimestamp)\b",
+    re.IGNORECASE,
+)
+TABLE_NAME = r'[\w"]+(?:\s*\.\s*[\w"]+)*'
+TABLE_NAME_RE = re.compile(TABLE_NAME)
+TABLE_RE = re.compile(rf"\b(?:from|join)\s+({TABLE_NAME})", re.IGNORECASE)
+# FROM a x, b AS y, c: TABLE_RE solo ve la primera tabla de la lista
+FROM_RE = re.compile(r"\bfrom\b", re.IGNORECASE)
+FROM_LIST_END_RE = re.compile(
+    r"\b(?:where|group|having|order|limit|offset|union|intersect|except|window|on|using"
+    r"|join|inner|left|right|full|cross)\b",
+    re.IGNORECASE,
+)
+CTE_RE = re.compile(r"(?:\bwith|,)\s*(\w+)\s+as\s*\(", re.IGNORECASE)
+# FROM dentro de funciones (extract(year from x), trim(both from x)) no es una tabla
+FUNCTION_FROM_RE = re.compile(r"\b(?:extract|trim|substring)\s*\([^)]*\)", re.IGNORECASE)
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+
+
+def normalize_sql(sql):
+    """SQL sin comentarios, sin ; final, con espacios colapsados y en minúsculas fuera de los strings"""
+    sql = '\n'.join(line.split('--', 1)[0] for line in sql.splitlines())
+    sql = ' '.join(sql.split()).rstrip(';').strip()
+    parts = []
+    last = 0
+    for match in STRING_RE.finditer(sql):
+        parts.append(sql[last:match.start()].lower())
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(sql[last:].lower())
+    return ''.join(parts)
+
+
+def from_list(sql, start):
+    """Items de la lista de un FROM que empieza en start (separados por comas fuera de paréntesis)"""
+    items, depth, current = [], 0, ''
+    for position in range(start, len(sql)):
+        char = sql[position]
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            if depth == 0:
+                break
+            depth -= 1
+        elif depth == 0 and char == ',':
+            items.append(current.strip())
+            current = ''
+            continue
+        elif depth == 0 and FROM_LIST_END_RE.match(sql, position):
+            break
+        current += char
+    items.append(current.strip())
+    return items
+
+
+def referenced_tables(sql, default_database=ATHENA_DATABASE):
+    """
+    (database, tabla) de cada tabla leída por la query (sin los CTEs), o None si
+    no se pueden saber: una lista FROM a, (SELECT ...) b no se interpreta.
+    """
+    sql = FUNCTION_FROM_RE.sub('', STRING_RE.sub("''", normalize_sql(sql)))
+    ctes = set(CTE_RE.findall(sql))
+    names = TABLE_RE.findall(sql)
+    for match in FROM_RE.finditer(sql):
+        items = from_list(sql, match.end())
+        if len(items) == 1:
+            continue
+        for item in items:
+            table = TABLE_NAME_RE.match(item)
+            if not table:
+                return None
+            names.append(table.group(0))
+    tables = set()
+    for name in names:
+        parts = [part.strip().strip('"') for part in name.split('.')]
+        if len(parts) == 1 and parts[0] in ctes:
+            continue
+        database = parts[-2] if len(parts) >= 2 else default_database
+        tables.add((database, parts[-1]))
+    return sorted(tables)
+
+
+def is_cacheable(sql):
+    sql = normalize_sql(sql)
+    return bool(CACHEABLE_RE.match(sql)) and not NON_DETERMINISTIC_RE.search(STRING_RE.sub("''", sql))
+
+
+class TableVersions:
+    """Versión de cada tabla según Glue, el manifiesto de seeds o la última corrida de dbt"""
+
+    def __init__(self, catalog=None, run_results_path=RUN_RESULTS_PATH, manifest_path=SEEDS_MANIFEST_PATH):
+        self.catalog = catalog
+        self.run_results_path = Path(run_results_path)
+        self.manifest_path = Path(manifest_path)
+        self._glue_tables = {}
+        self._dbt_versions = None
+        self._seed_versions = None
+
+    def version(self, database, table):
+        """Versión como string, o None si no se puede determinar"""
+        parts = []
+        glue_version = self._glue_version(database, table) if self.catalog is not None else None
+        if glue_version:
+            parts.append(glue_version)
+        else:
+            dbt_version = self._dbt_run_versions().get(table)
+            if dbt_version:
+                parts.append(f"dbt:{dbt_version}")
+        if not parts:
+            return None
+
+        seed_version = self._seed_manifest_versions().get(table)
+        if seed_version:
+            parts.append(f"seed:{seed_version}")
+        return '|'.join(parts)
+
+    def _glue_version(self, database, table):
+        # Una lista fresca por database (sin el TTL del catálogo: la versión tiene que ser la actual)
+        if database not in self._glue_tables:
+            try:
+                tables = self.catalog.tables(database, max_age=0)
+            except Exception:
+                tables = []
+            self._glue_tables[database] = {t['Name']: t for t in tables}
+
+        info = self._glue_tables[database].get(table)
+        if info is None:
+            return None
+        parameters = info.get('Parameters', {})
+        update_time = info.get('UpdateTime') or info.get('CreateTime')
+        return '|'.join(str(value) for value in (
+            update_time.isoformat() if hasattr(update_time, 'isoformat') else update_time,
+            parameters.get('metadata_location'),
+            parameters.get('transient_lastDdlTime'),
+        ))
+
+    def _dbt_run_versions(self):
+        """Tabla → completed_at de su última ejecución en run_results.json"""
+        if self._dbt_versions is None:
+            self._dbt_versions = {}
+            if self.run_results_path.exists():
+                run_results = json.loads(self.run_results_path.read_text())
+                for result in run_results.get('results', []):
+                    unique_id = result.get('unique_id', '')
+                    if not unique_id.startswith(('model.', 'seed.', 'snapshot.')) or result.get('status') != 'success':
+                        continue
+                    completed = [t.get('completed_at') for t in result.get('timing', []) if t.get('name') == 'execute']
+                    if completed and completed[0]:
+                        self._dbt_versions[unique_id.split('.')[-1]] = completed[0]
+        return self._dbt_versions
+
+    def _seed_manifest_versions(self):
+        """Tabla raw → hashes de su seed en cada destino sincronizado"""
+        if self._seed_versions is None:
+            self._seed_versions = {}
+            if self.manifest_path.exists():
+                manifest = json.loads(self.manifest_path.read_text())
+                for target, tables in sorted(manifest.get('targets', {}).items()):
+                    for table, record in tables.items():
+                        previous = self._seed_versions.get(table)
+                        entry = f"{target}={record.get('source_sha256')}"
+                        self._seed_versions[table] = f"{previous},{entry}" if previous else entry
+        return self._seed_versions
+
+
+class QueryCache:
+    """Resultados en disco (un JSON por clave) con desalojo LRU por tamaño total"""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        # Marcar como usada recién: la fecha de modificación ordena el LRU
+        os.utime(path)
+        return entry
+
+    def put(self, key, entry):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_suffix(f'.tmp{os.getpid()}')
+        tmp_path.write_text(json.dumps(entry))
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self):
+        """(ruta, tamaño, última vez usada) de cada entrada, de la más vieja a la más nueva"""
+        if not self.cache_dir.exists():
+            return []
+        entries = []
+        for path in self.cache_dir.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda e: e[2])
+
+    def evict(self):
+        """Borrar las entradas menos usadas hasta quedar bajo max_bytes; retorna cuántas"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        return evicted
+
+    def clear(self):
+        entries = self.entries()
+        for path, _, _ in entries:
+            path.unlink(missing_ok=True)
+        return len(entries)
+
+
+class CachedQueryRunner:
+    """Ejecuta queries con un AthenaQueryRunner pasando primero por el caché"""
+
+    def __init__(self, runner, cache=None, versions=None):
+        self.runner = runner
+        self.cache = cache if cache is not None else QueryCache()
+        self.versions = versions if versions is not None else TableVersions()
+        self.stats = {'hits': 0, 'misses': 0, 'uncached': 0, 'athena_reused': 0,
+                      'bytes_scanned': 0, 'bytes_saved': 0}
+
+    def cache_key(self, sql):
+        """Clave del resultado, o None si la query no se puede cachear"""
+        if not is_cacheable(sql):
+            return None
+        tables = referenced_tables(sql, self.runner.database)
+        if tables is None:
+            return None
+        versions = {}
+        for database, table in tables:
+            version = self.versions.version(database, table)
+            if version is None:
+                return None
+            versions[f"{database}.{table}"] = version
+        payload = json.dumps({
+            'version': CACHE_VERSION,
+            'sql': normalize_sql(sql),
+            'database': self.runner.database,
+            'work_group': self.runner.work_group,
+            'tables': versions,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def query(self, sql, label=None):
+        """Filas del resultado (sin encabezado); RuntimeError si la query falla"""
+        key = self.cache_key(sql)
+        if key is not None:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.stats['hits'] += 1
+                self.stats['bytes_saved'] += entry.get('bytes_scanned', 0)
+                return entry['rows']
+            self.stats['misses'] += 1
+        else:
+            self.stats['uncached'] += 1
+
+        result = self.runner.run(sql, label=label)
+        if not result.succeeded:
+            raise RuntimeError(f"{result.state}: {result.reason}")
+
+        scanned = result.statistics.get('DataScannedInBytes', 0)
+        self.stats['bytes_scanned'] += scanned
+        if result.statistics.get('ResultReuseInformation', {}).get('ReusedPreviousResult'):
+            self.stats['athena_reused'] += 1
+
+        rows = self.runner.get_rows(result)
+        if key is not None:
+            self.cache.put(key, {
+                'sql': normalize_sql(sql),
+                'rows': rows,
+                'execution_id': result.execution_id,
+                'bytes_scanned': scanned,
+                'cached_at': time.time(),
+            })
+        return rows
+
+    def summary(self):
+        """Línea de resumen con los contadores"""
+        stats = self.stats
+        return (f"caché: {stats['hits']} hits, {stats['misses']} misses, {stats['uncached']} sin caché"
+                f" | escaneado: {stats['bytes_scanned'] / 1024 ** 2:.1f} MB,"
+                f" ahorrado: {stats['bytes_saved'] / 1024 ** 2:.1f} MB")
+
+
+def split_statements(text):
+    """Queries de un archivo .sql separadas por ; (sin las que son solo comentarios)"""
+    statements = []
+    for statement in text.split(';'):
+        if normalize_sql(statement):
+            statements.append(statement.strip())
+    return statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ejecutar queries en Athena con caché local de resultados')
+    parser.add_argument('sql', nargs='?', help='Query a ejecutar')
+    parser.add_argument('--file', help='Archivo .sql con varias queries (solo se ejecutan los SELECT)')
+    parser.add_argument('--route', action='store_true', help='Reescribir las queries para usar los rollups')
+    parser.add_argument('--reuse-minutes', type=int, default=RESULT_REUSE_MINUTES,
+                        help='Minutos de result reuse de Athena en los misses (default: 0, desactivado)')
+    parser.add_argument('--stats', action='store_true', help='Mostrar el tamaño del caché')
+    parser.add_argument('--clear', action='store_true', help='Vaciar el caché')
+    args = parser.parse_args()
+
+    cache = QueryCache()
+    if args.clear:
+        print(f"🗑️  {cache.clear()} entradas eliminadas de {cache.cache_dir}")
+        return 0
+    if args.stats:
+        entries = cache.entries()
+        total = sum(size for _, size, _ in entries)
+        print(f"📦 {len(entries)} entradas, {total / 1024 ** 2:.1f} de {cache.max_bytes / 1024 ** 2:.0f} MB")
+        return 0
+    if not args.sql and not args.file:
+        parser.error('indica una query, --file, --stats o --clear')
+
+    import aws_session
+    from athena_runner import AthenaQueryRunner
+    from glue_catalog import GlueCatalog
+
+    runner = AthenaQueryRunner(aws_session.client('athena', AWS_REGION), ATHENA_DATABASE,
+                               aws_session.athena_output(), result_reuse_minutes=args.reuse_minutes)
+    cached = CachedQueryRunner(runner, cache, TableVersions(GlueCatalog(aws_session.client('glue', AWS_REGION))))
+
+    if args.file:
+        statements = [s for s in split_statements(Path(args.file).read_text(encoding='utf-8')) if CACHEABLE_RE.match(normalize_sql(s))]
+    else:
+        statements = [args.sql]
+
+    failed = 0
+    for statement in statements:
+        if args.route:
+            import rollup_router
+            statement = rollup_router.route(statement)['sql']
+        hits = cached.stats['hits']
+        start = time.monotonic()
+        try:
+            rows = cached.query(statement)
+        except RuntimeError as e:
+            failed += 1
+            print(f"✗ {e}\n{statement}\n")
+            continue
+        source = 'caché' if cached.stats['hits'] > hits else 'Athena'
+        print(f"✓ {len(rows)} filas ({source}, {time.monotonic() - start:.2f}s)")
+        for row in rows[:10]:
+            print("   " + " | ".join('' if value is None else value for value in row))
+
+    print(f"\n📊 {cached.summary()}")
+    return 0 if not failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Regenera adventureworks/macros/column_cache.sql: las columnas de cada modelo,
+en el orden de la tabla, para que cached_star no las consulte al warehouse
+en cada compilación (en Athena, una llamada a Glue por relación).
+
+Las columnas se leen de target/catalog.json (dbt docs generate) y el checksum
+de cada modelo de target/manifest.json: si después se edita un modelo, su
+entrada deja de valer y cached_star vuelve a consultar sus columnas en vivo
+(con un aviso) hasta que se regenere el caché.
+
+Los nombres de columnas son los mismos en athena, duckdb y postgres, así que
+el caché puede generarse con cualquier target donde los modelos ya existan.
+
+Uso:
+    python scripts/refresh_column_cache.py [--target athena]
+    python scripts/refresh_column_cache.py --no-generate   # usar el catalog.json existente
+    python scripts/refresh_column_cache.py --check         # error si el caché está desactualizado
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent.parent / 'adventureworks'
+CATALOG_PATH = PROJECT_DIR / 'target' / 'catalog.json'
+MANIFEST_PATH = PROJECT_DIR / 'target' / 'manifest.json'
+CACHE_PATH = PROJECT_DIR / 'macros' / 'column_cache.sql'
+VENV_DBT = Path(__file__).parent.parent / '.venv' / 'bin' / 'dbt'
+
+HEADER = """{#
+    Generated by scripts/refresh_column_cache.py from target/catalog.json: do not edit.
+    Columns of each model (in table order) and the checksum of the model file they
+    were read from, for cached_star.
+#}
+"""
+
+
+def dbt_command(*args):
+    dbt = str(VENV_DBT) if VENV_DBT.exists() else 'dbt'
+    return [dbt, *args]
+
+
+def generate_catalog(target):
+    cmd = dbt_command('docs', 'generate', '--target', target)
+    print(f"▶️  dbt {' '.join(cmd[1:])}", flush=True)
+    return subprocess.run(cmd, cwd=PROJECT_DIR).returncode
+
+
+def model_columns(catalog, manifest):
+    """nombre del modelo -> {checksum, columns} de los modelos que existen en el warehouse"""
+    cache = {}
+    for unique_id, node in manifest['nodes'].items():
+        if node['resource_type'] != 'model' or unique_id not in catalog['nodes']:
+            continue
+        columns = sorted(catalog['nodes'][unique_id]['columns'].values(), key=lambda c: c['index'])
+        cache[node['alias']] = {
+            'checksum': node['checksum']['checksum'],
+            'columns': [c['name'].lower() for c in columns],
+        }
+    return dict(sorted(cache.items()))
+
+
+def render_cache(cache):
+    lines = [HEADER, '{% macro column_cache() %}', '{{ return({']
+    for i, (name, entry) in enumerate(cache.items()):
+        columns = ', '.join(json.dumps(c) for c in entry['columns'])
+        comma = ',' if i < len(cache) - 1 else ''
+        lines.append(f'    "{name}": {{')
+        lines.append(f'        "checksum": "{entry["checksum"]}",')
+        lines.append(f'        "columns": [{columns}]')
+        lines.append(f'    }}{comma}')
+    lines += ['}) }}', '{% endmacro %}', '']
+    return '\n'.join(lines)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Regenerar el caché de columnas de los modelos (macros/column_cache.sql)')
+    parser.add_argument('--target', default='athena', help='Target de dbt para dbt docs generate (default: athena)')
+    parser.add_argument('--no-generate', action='store_true', help='Usar el target/catalog.json existente')
+    parser.add_argument('--check', action='store_true',
+                        help='No escribir: salir con error si el caché no coincide con el catálogo')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if not args.no_generate and generate_catalog(args.target) != 0:
+        print("❌ dbt docs generate falló")
+        return 1
+    for path in (CATALOG_PATH, MANIFEST_PATH):
+        if not path.exists():
+            print(f"❌ No existe {path}: ejecutar dbt docs generate")
+            return 1
+
+    cache = model_columns(json.loads(CATALOG_PATH.read_text()), json.loads(MANIFEST_PATH.read_text()))
+    content = render_cache(cache)
+    current = CACHE_PATH.read_text() if CACHE_PATH.exists() else ''
+
+    if args.check:
+        if content != current:
+            print(f"❌ {CACHE_PATH.name} está desactualizado: ejecutar scripts/refresh_column_cache.py")
+            return 1
+        print(f"✅ {CACHE_PATH.name} al día ({len(cache)} modelos)")
+        return 0
+
+    if content == current:
+        print(f"✅ {CACHE_PATH.name} ya estaba al día ({len(cache)} modelos)")
+        return 0
+    CACHE_PATH.write_text(content)
+    print(f"💾 {CACHE_PATH.name} regenerado: {len(cache)} modelos")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
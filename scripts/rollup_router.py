@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Reescribe queries de agregación sobre obt_sales para que lean el rollup
+agg_sales_* más chico que pueda responderlas.
+
+El grano de cada rollup se declara en el meta de
+adventureworks/models/marts/rollups/rollups.yml (grain, attributes y las
+expresiones de obt_sales que responde con una de sus columnas, como
+year(date_day) → order_year). Los rollups se prueban en el orden del archivo
+(del más chico al más grande) y se usa el primero que sirve.
+
+Se soporta una forma acotada de query, sin joins ni subqueries:
+
+    SELECT <columnas y agregados> FROM [db.]obt_sales
+    [WHERE ...] [GROUP BY ...] [HAVING ...] [ORDER BY ...] [LIMIT n]
+
+con agregados SUM/AVG de revenue, orderqty y unitprice, COUNT(*),
+COUNT(DISTINCT salesorderid) y COUNT(DISTINCT)/MIN/MAX de columnas del
+rollup. COUNT(DISTINCT salesorderid) se responde sumando la columna orders,
+lo que solo es correcto si las columnas que se agregan son de nivel orden
+(fecha, dirección, cliente, estado): una orden tiene varios productos.
+La query tiene que agregar: con GROUP BY, o con un SELECT de solo agregados y
+constantes (sin *); si no, devuelve filas de obt_sales. Cualquier otra query se deja tal cual.
+
+Uso:
+    python scripts/rollup_router.py "SELECT country_name, SUM(revenue) FROM obt_sales GROUP BY country_name"
+    python scripts/rollup_router.py --file docs/EXAMPLE_QUERIES.sql
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ROLLUPS_FILE = PROJECT_ROOT / 'adventureworks' / 'models' / 'marts' / 'rollups' / 'rollups.yml'
+SOURCE_TABLE = 'obt_sales'
+
+# Columnas de nivel línea: agregarlas hace que una orden caiga en varias filas
+LINE_LEVEL_COLUMNS = {
+    'sales_key', 'salesorderdetailid', 'productid', 'product_name', 'productnumber',
+    'color', 'class', 'product_subcategory_name', 'product_category_name',
+}
+
+# Agregados de obt_sales → expresión sobre las medidas del rollup
+# (macros/rollup_measures.sql define las mismas medidas)
+MEASURES = {
+    ('sum', 'revenue'): 'SUM(revenue)',
+    ('sum', 'orderqty'): 'SUM(orderqty)',
+    ('sum', 'unitprice'): 'SUM(unitprice_sum)',
+    ('count', '*'): 'SUM(items)',
+    ('count', 'sales_key'): 'SUM(items)',
+    ('count', 'salesorderdetailid'): 'SUM(items)',
+    ('avg', 'revenue'): '(SUM(revenue) / SUM(items))',
+    ('avg', 'unitprice'): '(SUM(unitprice_sum) / SUM(items))',
+    ('avg', 'orderqty'): '(CAST(SUM(orderqty) AS DOUBLE) / SUM(items))',
+}
+ORDERS_MEASURE = 'SUM(orders)'
+
+KEYWORDS = {
+    'and', 'or', 'not', 'is', 'null', 'in', 'as', 'asc', 'desc', 'distinct', 'over',
+    'partition', 'by', 'case', 'when', 'then', 'else', 'end', 'like', 'between',
+    'true', 'false', 'double', 'integer', 'bigint', 'varchar', 'decimal', 'date',
+    'timestamp', 'nulls', 'first', 'last', 'interval',
+}
+
+QUERY_RE = re.compile(
+    r"^\s*select\s+(?P<select>.+?)\s+from\s+(?P<table>[\w.\"]+)"
+    r"(?:\s+where\s+(?P<where>.+?))?"
+    r"(?:\s+group\s+by\s+(?P<group>.+?))?"
+    r"(?:\s+having\s+(?P<having>.+?))?"
+    r"(?:\s+order\s+by\s+(?P<order>.+?))?"
+    r"(?:\s+limit\s+(?P<limit>\d+))?\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+# Agregado sin paréntesis adentro: los anidados (SUM(COUNT(*)) OVER ()) se
+# reescriben de adentro hacia afuera y el externo queda tal cual
+AGGREGATE_RE = re.compile(r"\b(sum|avg|count|min|max)\s*\(\s*(distinct\s+)?([\w*]+)\s*\)", re.IGNORECASE)
+IDENTIFIER_RE = re.compile(r"\b([a-z_][a-z0-9_]*)\b(?!\s*\()", re.IGNORECASE)
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+ALIAS_RE = re.compile(r"^(?P<expr>.+?[\w)\"])\s+(?:as\s+)?(?P<alias>\"?\w+\"?)\s*$", re.IGNORECASE | re.DOTALL)
+PLACEHOLDER_RE = re.compile(r"\x00(\d+)\x00")
+
+
+class Unroutable(Exception):
+    """La query no se puede responder con un rollup"""
+
+
+def load_rollups(path=ROLLUPS_FILE):
+    """Rollups declarados en el YAML, en orden: [{name, grain, columns, derived}]"""
+    models = yaml.safe_load(Path(path).read_text()).get('models') or []
+    rollups = []
+    for model in models:
+        meta = (model.get('meta') or {}).get('rollup')
+        if not meta:
+            continue
+        grain = list(meta['grain'])
+        columns = grain + list(meta.get('attributes') or [])
+        rollups.append({
+            'name': model['name'],
+            'grain': grain,
+            'columns': set(columns),
+            'derived': {normalize(expr): column for expr, column in (meta.get('derived') or {}).items()},
+        })
+    return rollups
+
+
+def normalize(expression):
+    """Expresión en minúsculas y sin espacios, para comparar"""
+    return re.sub(r'\s+', '', expression).lower()
+
+
+def strip_comments(sql):
+    return '\n'.join(line.split('--', 1)[0] for line in sql.splitlines()).strip()
+
+
+def split_top_level(text):
+    """Separar por comas que no están entre paréntesis"""
+    parts, depth, current = [], 0, ''
+    for char in text:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+        else:
+            current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def parse_query(sql):
+    """Partes de la query, o Unroutable si no tiene la forma soportada"""
+    sql = strip_comments(sql)
+    if re.search(r"\b(join|union|with)\b|\(\s*select\b", sql, re.IGNORECASE):
+        raise Unroutable("joins, CTEs y subqueries no están soportados")
+    match = QUERY_RE.match(sql)
+    if not match:
+        raise Unroutable("no es un SELECT ... FROM ... [GROUP BY ...]")
+
+    table = match.group('table')
+    if table.replace('"', '').split('.')[-1].lower() != SOURCE_TABLE:
+        raise Unroutable(f"no lee de {SOURCE_TABLE}")
+
+    select = []
+    for item in split_top_level(match.group('select')):
+        alias_match = ALIAS_RE.match(item)
+        if (
+            alias_match
+            and alias_match.group('alias').lower() not in KEYWORDS
+            and alias_match.group('expr').count('(') == alias_match.group('expr').count(')')
+        ):
+            select.append((alias_match.group('expr'), alias_match.group('alias')))
+        else:
+            select.append((item, None))
+
+    return {
+        'select': select,
+        'table': table,
+        'where': match.group('where'),
+        'group': split_top_level(match.group('group')) if match.group('group') else [],
+        'having': match.group('having'),
+        'order': split_top_level(match.group('order')) if match.group('order') else [],
+        'limit': match.group('limit'),
+    }
+
+
+class ExpressionRewriter:
+    """Reescribe expresiones de obt_sales para un rollup y junta las columnas usadas"""
+
+    def __init__(self, rollup, aliases=()):
+        self.rollup = rollup
+        self.aliases = {a.strip('"').lower() for a in aliases}
+        self.used_columns = set()
+        self.counts_orders = False
+
+    def rewrite(self, expression):
+        pieces = []
+
+        def hold(text):
+            pieces.append(text)
+            return f"\x00{len(pieces) - 1}\x00"
+
+        text = STRING_RE.sub(lambda m: hold(m.group(0)), expression)
+        if re.search(r"\w+\s*\.\s*[a-z_]", text, re.IGNORECASE):
+            raise Unroutable("columnas calificadas no soportadas")
+
+        text = AGGREGATE_RE.sub(lambda m: hold(self._aggregate(m)), text)
+        for derived, column in self.rollup['derived'].items():
+            name, _, argument = derived.partition('(')
+            pattern = rf"\b{re.escape(name)}\s*\(\s*{re.escape(argument[:-1])}\s*\)"
+            text = re.sub(pattern, lambda m, c=column: hold(self._column(c)), text, flags=re.IGNORECASE)
+
+        for match in IDENTIFIER_RE.finditer(text):
+            name = match.group(1).lower()
+            if name in KEYWORDS or name in self.aliases:
+                continue
+            self._column(name)
+
+        while PLACEHOLDER_RE.search(text):
+            text = PLACEHOLDER_RE.sub(lambda m: pieces[int(m.group(1))], text)
+        return text
+
+    def _column(self, name):
+        if name not in self.rollup['columns']:
+            raise Unroutable(f"{self.rollup['name']} no tiene la columna {name}")
+        self.used_columns.add(name)
+        return name
+
+    def _aggregate(self, match):
+        function, distinct, argument = match.group(1).lower(), match.group(2), match.group(3).lower()
+        if function == 'count' and distinct and argument == 'salesorderid':
+            self.counts_orders = True
+            return ORDERS_MEASURE
+        if (function in ('min', 'max') or (function == 'count' and distinct)) and argument in self.rollup['columns']:
+            self.used_columns.add(argument)
+            return match.group(0)
+        if not distinct and (function, argument) in MEASURES:
+            return MEASURES[(function, argument)]
+        raise Unroutable(f"{self.rollup['name']} no puede calcular {match.group(0)}")
+
+
+def aggregates_only(expression):
+    """¿La expresión usa solo agregados y constantes (sin columnas sueltas)?"""
+    text = STRING_RE.sub("''", expression)
+    # De adentro hacia afuera, como en ExpressionRewriter: SUM(COUNT(*)) → SUM(0) → 0
+    while AGGREGATE_RE.search(text):
+        text = AGGREGATE_RE.sub('0', text)
+    return not any(match.group(1).lower() not in KEYWORDS for match in IDENTIFIER_RE.finditer(text))
+
+
+def rewrite_for(query, rollup):
+    """SQL de la query sobre el rollup (Unroutable si no sirve)"""
+    if any(expr.strip() == '*' or expr.strip().endswith('.*') for expr, _ in query['select']):
+        raise Unroutable("SELECT * no se puede responder con un rollup")
+    # Sin GROUP BY la query devuelve filas de obt_sales, salvo que el SELECT sean solo agregados
+    if not query['group'] and not all(aggregates_only(expr) for expr, _ in query['select']):
+        raise Unroutable("la query no agrega (sin GROUP BY ni solo agregados en el SELECT)")
+    aliases = [alias for _, alias in query['select'] if alias]
+    rewriter = ExpressionRewriter(rollup)
+    select = []
+    for expr, alias in query['select']:
+        rewritten = rewriter.rewrite(expr)
+        select.append(rewritten if alias in (None, rewritten) else f"{rewritten} AS {alias}")
+    where = rewriter.rewrite(query['where']) if query['where'] else None
+    group = [rewriter.rewrite(expr) for expr in query['group']]
+    having = rewriter.rewrite(query['having']) if query['having'] else None
+    # ORDER BY puede usar los alias del SELECT
+    order_rewriter = ExpressionRewriter(rollup, aliases)
+    order = [order_rewriter.rewrite(expr) for expr in query['order']]
+
+    counts_orders = rewriter.counts_orders or order_rewriter.counts_orders
+    rolled_up = rollup['columns'] - rewriter.used_columns - order_rewriter.used_columns
+    if counts_orders and rolled_up & LINE_LEVEL_COLUMNS:
+        raise Unroutable(
+            f"{rollup['name']}: COUNT(DISTINCT salesorderid) no se puede sumar sobre "
+            f"{', '.join(sorted(rolled_up & LINE_LEVEL_COLUMNS))}"
+        )
+
+    qualifier = query['table'].rsplit('.', 1)[0] + '.' if '.' in query['table'] else ''
+    lines = ["SELECT", ",\n".join(f"    {item}" for item in select), f"FROM {qualifier}{rollup['name']}"]
+    if where:
+        lines.append(f"WHERE {where}")
+    if group:
+        lines.append(f"GROUP BY {', '.join(group)}")
+    if having:
+        lines.append(f"HAVING {having}")
+    if order:
+        lines.append(f"ORDER BY {', '.join(order)}")
+    if query['limit']:
+        lines.append(f"LIMIT {query['limit']}")
+    return '\n'.join(lines)
+
+
+def route(sql, rollups=None):
+    """
+    Elegir el primer rollup que responde la query.
+    Retorna {'rollup', 'sql', 'reason'}; sin rollup, 'sql' es la query original.
+    """
+    rollups = load_rollups() if rollups is None else rollups
+    try:
+        query = parse_query(sql)
+    except Unroutable as e:
+        return {'rollup': None, 'sql': sql, 'reason': str(e)}
+
+    reasons = []
+    for rollup in rollups:
+        try:
+            return {'rollup': rollup['name'], 'sql': rewrite_for(query, rollup), 'reason': None}
+        except Unroutable as e:
+            reasons.append(str(e))
+    # Los motivos que no dependen del rollup (SELECT *, sin agregar) se repiten en todos
+    return {'rollup': None, 'sql': sql, 'reason': '; '.join(dict.fromkeys(reasons)) or 'no hay rollups declarados'}
+
+
+def split_statements(text):
+    """Queries de un archivo .sql (separadas por ;), sin las que son solo comentarios"""
+    statements = []
+    for statement in strip_comments(text).split(';'):
+        if statement.strip():
+            statements.append(statement.strip())
+    return statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reescribir queries sobre obt_sales para usar los rollups')
+    parser.add_argument('sql', nargs='?', help='Query a reescribir')
+    parser.add_argument('--file', help='Archivo .sql con varias queries')
+    parser.add_argument('--rollups', default=str(ROLLUPS_FILE), help='YAML con el meta de los rollups')
+    args = parser.parse_args()
+
+    if not args.sql and not args.file:
+        parser.error('indica una query o --file')
+
+    rollups = load_rollups(args.rollups)
+    statements = split_statements(Path(args.file).read_text(encoding='utf-8')) if args.file else [args.sql]
+
+    routed = 0
+    for statement in statements:
+        if args.file and not re.search(rf"\b{SOURCE_TABLE}\b", statement, re.IGNORECASE):
+            continue
+        result = route(statement, rollups)
+        print("-" * 60)
+        if result['rollup']:
+            routed += 1
+            print(f"✓ {result['rollup']}\n{result['sql']};")
+        else:
+            print(f"✗ sin rollup: {result['reason']}\n{statement};")
+
+    if args.file:
+        print("-" * 60)
+        print(f"📊 {routed} queries reescritas")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
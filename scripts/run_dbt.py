@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Ejecuta dbt eligiendo los threads según el target y el ancho del DAG.
+
+- threads: no tiene sentido usar más que el máximo de nodos que pueden correr
+  a la vez (el nivel más ancho del DAG, leído de target/manifest.json). En
+  duckdb/postgres además se limita a los cores de la máquina; en Athena a una
+  fracción (ATHENA_QUOTA_SHARE) de la cuota de queries DML activas de la
+  cuenta, que comparten todos los workgroups.
+- Athena: si algún nodo falla por throttling (TooManyRequestsException), se
+  vuelven a ejecutar ese nodo y los hijos que dbt saltó por él, con backoff
+  exponencial con jitter y la mitad de threads. Los nodos que fallaron por
+  otro motivo no se reintentan y el código de salida sigue siendo de error.
+- Al final se muestra la línea de tiempo de cada nodo y el camino crítico
+  (la cadena de dependencias más larga, ej: stg_salesorderheader → fct_sales →
+  obt_sales), con el tiempo que cada nodo esperó un thread libre.
+
+Uso:
+    python scripts/run_dbt.py run [--target athena] [--threads N] [-- <args de dbt>]
+    python scripts/run_dbt.py test --target duckdb -- --select fct_sales+
+    python scripts/run_dbt.py run --show-threads
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+PROJECT_DIR = Path(__file__).parent.parent / 'adventureworks'
+MANIFEST_PATH = PROJECT_DIR / 'target' / 'manifest.json'
+RUN_RESULTS_PATH = PROJECT_DIR / 'target' / 'run_results.json'
+PROFILES_PATH = PROJECT_DIR / 'profiles.yml'
+VENV_DBT = Path(__file__).parent.parent / '.venv' / 'bin' / 'dbt'
+
+AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+
+# Cuota de queries DML activas si no se puede leer de Service Quotas
+DEFAULT_ATHENA_DML_LIMIT = 20
+# Fracción de la cuota que usa dbt: el resto queda para otros usuarios y para
+# las queries de metadata que dbt-athena lanza entre modelos
+ATHENA_QUOTA_SHARE = float(os.environ.get('ATHENA_QUOTA_SHARE', '0.5'))
+
+# Reintentos de los nodos que fallaron por throttling
+MAX_RETRIES = 3
+BACKOFF_BASE = 5
+BACKOFF_CAP = 120
+THROTTLING_ERRORS = ('TooManyRequestsException', 'ThrottlingException', 'Rate exceeded')
+
+# Tipos de nodo que ejecuta cada comando de dbt
+COMMAND_RESOURCES = {
+    'run': {'model'},
+    'test': {'test'},
+    'seed': {'seed'},
+    'snapshot': {'snapshot'},
+    'build': {'model', 'test', 'seed', 'snapshot'},
+}
+
+TIMELINE_WIDTH = 40
+
+
+def dbt_command(*args):
+    dbt = str(VENV_DBT) if VENV_DBT.exists() else 'dbt'
+    return [dbt, *args]
+
+
+def target_type(target, profiles_path=PROFILES_PATH):
+    """Tipo de adapter (athena, duckdb, postgres) de un target de profiles.yml"""
+    profiles = yaml.safe_load(Path(profiles_path).read_text())
+    profile = next(iter(profiles.values()))
+    target = target or profile.get('target')
+    return profile['outputs'][target]['type']
+
+
+def dag_width(manifest, resource_types):
+    """
+    Máximo de nodos (de los tipos dados) que pueden correr a la vez: el nivel
+    más poblado del DAG. Los modelos ephemeral no ocupan un thread ni un nivel.
+    """
+    nodes = manifest['nodes']
+    levels = {}
+
+    def level(unique_id):
+        if unique_id not in levels:
+            node = nodes[unique_id]
+            parents = [p for p in node.get('depends_on', {}).get('nodes', []) if p in nodes]
+            base = max((level(p) for p in parents), default=-1)
+            ephemeral = node.get('config', {}).get('materialized') == 'ephemeral'
+            levels[unique_id] = base if ephemeral else base + 1
+        return levels[unique_id]
+
+    counts = {}
+    for unique_id, node in nodes.items():
+        if node['resource_type'] not in resource_types:
+            continue
+        if node.get('config', {}).get('materialized') == 'ephemeral':
+            continue
+        depth = level(unique_id)
+        counts[depth] = counts.get(depth, 0) + 1
+    return max(counts.values(), default=1)
+
+
+def athena_dml_limit(region=AWS_REGION):
+    """(cuota de queries DML activas, origen del dato)"""
+    try:
+        import aws_session
+
+        quotas = aws_session.client('service-quotas', region)
+        for page in quotas.get_paginator('list_service_quotas').paginate(ServiceCode='athena'):
+            for quota in page.get('Quotas', []):
+                if 'DML' in quota['QuotaName'] and 'active' in quota['QuotaName'].lower():
+                    return int(quota['Value']), 'Service Quotas'
+    except Exception as e:
+        print(f"⚠️  No se pudo leer la cuota de Athena ({type(e).__name__}), se asume {DEFAULT_ATHENA_DML_LIMIT}")
+    return DEFAULT_ATHENA_DML_LIMIT, 'default'
+
+
+def choose_threads(adapter, width, dml_limit=None):
+    """(threads, motivo) para un adapter y un ancho de DAG"""
+    if adapter == 'athena':
+        limit = max(1, int(dml_limit * ATHENA_QUOTA_SHARE))
+        return max(1, min(width, limit)), f"ancho del DAG {width}, {ATHENA_QUOTA_SHARE:.0%} de {dml_limit} queries DML"
+    cores = os.cpu_count() or 1
+    return max(1, min(width, cores)), f"ancho del DAG {width}, {cores} cores"
+
+
+def ensure_manifest(target, manifest_path=MANIFEST_PATH):
+    """Manifest del proyecto actual (dbt parse lo regenera, con parseo parcial es rápido)"""
+    result = subprocess.run(dbt_command('parse', '--target', target), cwd=PROJECT_DIR,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError((result.stdout + result.stderr).strip()[-2000:])
+    return json.loads(Path(manifest_path).read_text())
+
+
+def read_run_results(since, path=RUN_RESULTS_PATH):
+    """Resultados de la última invocación de dbt (None si no llegó a escribirlos)"""
+    path = Path(path)
+    if not path.exists() or path.stat().st_mtime < since:
+        return None
+    return json.loads(path.read_text()).get('results', [])
+
+
+def throttled_nodes(results):
+    """Nodos que fallaron por throttling de Athena"""
+    return [
+        r['unique_id'] for r in results
+        if r.get('status') in ('error', 'fail')
+        and any(error in (r.get('message') or '') for error in THROTTLING_ERRORS)
+    ]
+
+
+def backoff_seconds(attempt):
+    """Backoff exponencial con jitter completo: entre 0 y min(CAP, BASE * 2^intento)"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def node_spans(results):
+    """unique_id -> (inicio, fin, thread): desde que el nodo toma un thread hasta que termina"""
+    spans = {}
+    for result in results:
+        timing = [t for t in result.get('timing', []) if t.get('started_at') and t.get('completed_at')]
+        if not timing:
+            continue
+        started = min(_parse_time(t['started_at']) for t in timing)
+        completed = max(_parse_time(t['completed_at']) for t in timing)
+        spans[result['unique_id']] = (started, completed, result.get('thread_id') or '')
+    return spans
+
+
+def critical_path(spans, manifest):
+    """
+    Cadena de dependencias que terminó última: desde el último nodo en terminar,
+    se sigue hacia atrás el padre (ejecutado) que terminó más tarde.
+    Retorna [(unique_id, espera, duración)]: espera = tiempo entre que terminó ese
+    padre y el nodo empezó, o sea esperando un thread libre.
+    """
+    if not spans:
+        return []
+    nodes = manifest['nodes']
+
+    def executed_parents(unique_id, seen):
+        # Los ephemeral no se ejecutan: se atraviesan hasta sus padres
+        parents = []
+        for parent in nodes.get(unique_id, {}).get('depends_on', {}).get('nodes', []):
+            if parent in spans:
+                parents.append(parent)
+            elif parent in nodes and parent not in seen:
+                seen.add(parent)
+                parents.extend(executed_parents(parent, seen))
+        return parents
+
+    current = max(spans, key=lambda u: spans[u][1])
+    path = []
+    while current:
+        started, completed, _ = spans[current]
+        parents = executed_parents(current, set())
+        previous = max(parents, key=lambda u: spans[u][1]) if parents else None
+        ready_at = spans[previous][1] if previous else started
+        wait = max(0.0, (started - ready_at).total_seconds())
+        path.append((current, wait, (completed - started).total_seconds()))
+        current = previous
+    return list(reversed(path))
+
+
+def print_timeline(spans, manifest, threads):
+    if not spans:
+        return
+    origin = min(s[0] for s in spans.values())
+    end = max(s[1] for s in spans.values())
+    wall = max((end - origin).total_seconds(), 0.001)
+    names = {u: manifest['nodes'].get(u, {}).get('name', u.split('.')[-1]) for u in spans}
+
+    print(f"\n⏱️  Línea de tiempo ({len(spans)} nodos, {wall:.1f}s, {threads} threads)")
+    for unique_id, (started, completed, thread) in sorted(spans.items(), key=lambda item: item[1][0]):
+        offset = (started - origin).total_seconds()
+        duration = (completed - started).total_seconds()
+        first = int(offset / wall * TIMELINE_WIDTH)
+        length = max(1, int(round(duration / wall * TIMELINE_WIDTH)))
+        bar = ' ' * first + '█' * min(length, TIMELINE_WIDTH - first)
+        print(f"  {names[unique_id][:32]:32} {thread.split(' ')[0]:10} "
+              f"{offset:7.1f}s {duration:7.1f}s |{bar:{TIMELINE_WIDTH}}|")
+
+    path = critical_path(spans, manifest)
+    total = sum(duration for _, _, duration in path)
+    waited = sum(wait for _, wait, _ in path)
+    print(f"\n🛤️  Camino crítico: {total:.1f}s ejecutando, {waited:.1f}s esperando un thread libre")
+    for unique_id, wait, duration in path:
+        suffix = f" (esperó {wait:.1f}s)" if wait >= 0.1 else ''
+        print(f"   → {names[unique_id]} {duration:.1f}s{suffix}")
+
+
+def failed_nodes(results):
+    """Nodos cuyo último estado es error o fail"""
+    return [r['unique_id'] for r in results if r.get('status') in ('error', 'fail')]
+
+
+def descendants(manifest, unique_ids):
+    """Todos los nodos que dependen (directa o indirectamente) de los dados"""
+    children = {}
+    for unique_id, node in manifest['nodes'].items():
+        for parent in node.get('depends_on', {}).get('nodes', []):
+            children.setdefault(parent, []).append(unique_id)
+    found, pending = set(), list(unique_ids)
+    while pending:
+        for child in children.get(pending.pop(), []):
+            if child not in found:
+                found.add(child)
+                pending.append(child)
+    return found
+
+
+def retry_selection(attempt_results, throttled, manifest):
+    """
+    Nodos a reintentar: los que tuvieron throttling y los que dbt saltó por
+    ellos. No se usa nombre+: traería hijos fuera de la selección original, y
+    los que dependen de un nodo que falló por otro motivo se saltarían igual.
+    """
+    skipped = {r['unique_id'] for r in attempt_results if r.get('status') == 'skipped'}
+    other_failures = set(failed_nodes(attempt_results)) - set(throttled)
+    blocked = descendants(manifest, other_failures)
+    retry = set(throttled) | (descendants(manifest, throttled) & skipped - blocked)
+    return sorted(retry)
+
+
+def run_with_retries(command, target, threads, extra_args, adapter, manifest, max_retries=MAX_RETRIES):
+    """
+    Ejecuta dbt; en Athena reintenta los nodos con throttling (y los que se
+    saltaron por ellos). Retorna (código de salida, resultados por unique_id con
+    el último estado de cada nodo): el código no es 0 si algún nodo termina en
+    error, aunque el último reintento haya salido bien.
+    """
+    results = {}
+    selection = None
+    for attempt in range(max_retries + 1):
+        args = list(extra_args)
+        if selection:
+            # El reintento reemplaza la selección original por los nodos a reintentar
+            args = _strip_selection(extra_args) + ['--select', *selection]
+        cmd = dbt_command(command, '--target', target, '--threads', str(threads), *args)
+        print(f"\n▶️  dbt {' '.join(cmd[1:])}", flush=True)
+        started_at = time.time()
+        returncode = subprocess.run(cmd, cwd=PROJECT_DIR).returncode
+
+        attempt_results = read_run_results(started_at)
+        if attempt_results is None:
+            return returncode, results
+        results.update({r['unique_id']: r for r in attempt_results})
+        if returncode == 0 or adapter != 'athena':
+            break
+
+        throttled = throttled_nodes(attempt_results)
+        if not throttled or attempt == max_retries:
+            break
+        wait = backoff_seconds(attempt)
+        threads = max(1, threads // 2)
+        retry = retry_selection(attempt_results, throttled, manifest)
+        selection = [manifest['nodes'][unique_id]['name'] for unique_id in retry]
+        print(f"🐢 {len(throttled)} nodos con throttling de Athena: reintento {attempt + 1}/{max_retries} "
+              f"de {len(retry)} nodos en {wait:.1f}s con {threads} threads")
+        time.sleep(wait)
+
+    # Un reintento exitoso no borra los nodos que fallaron por otro motivo antes
+    if returncode == 0 and failed_nodes(results.values()):
+        returncode = 1
+    return returncode, results
+
+
+def _strip_selection(args):
+    """Args de dbt sin --select/-s/--models/-m y sus valores"""
+    stripped = []
+    skipping = False
+    for arg in args:
+        if arg in ('--select', '-s', '--models', '-m'):
+            skipping = True
+            continue
+        if skipping and not arg.startswith('-'):
+            continue
+        skipping = False
+        stripped.append(arg)
+    return stripped
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Ejecutar dbt con threads elegidos según el target y el DAG')
+    parser.add_argument('command', choices=sorted(COMMAND_RESOURCES), help='Comando de dbt')
+    parser.add_argument('--target', default='athena', help='Target de profiles.yml (default: athena)')
+    parser.add_argument('--threads', type=int, help='Threads fijos (sin calcular)')
+    parser.add_argument('--max-retries', type=int, default=MAX_RETRIES,
+                        help=f'Reintentos por throttling en Athena (default: {MAX_RETRIES})')
+    parser.add_argument('--show-threads', action='store_true', help='Solo mostrar los threads elegidos')
+    parser.add_argument('--no-timeline', action='store_true', help='No mostrar la línea de tiempo')
+    # Lo que no es de este script (después de --) se pasa tal cual a dbt
+    args, dbt_args = parser.parse_known_args()
+    args.dbt_args = [a for a in dbt_args if a != '--']
+    return args
+
+
+def main():
+    args = parse_args()
+    extra_args = args.dbt_args
+    adapter = target_type(args.target)
+
+    try:
+        manifest = ensure_manifest(args.target)
+    except RuntimeError as e:
+        print(f"❌ dbt parse falló:\n{e}")
+        return 1
+
+    if args.threads:
+        threads, reason = args.threads, 'fijado con --threads'
+    else:
+        width = dag_width(manifest, COMMAND_RESOURCES[args.command])
+        dml_limit = None
+        if adapter == 'athena':
+            dml_limit, source = athena_dml_limit()
+            print(f"☁️  Cuota de queries DML activas en Athena: {dml_limit} ({source})")
+        threads, reason = choose_threads(adapter, width, dml_limit)
+    print(f"🧵 {args.target} ({adapter}): {threads} threads ({reason})")
+    if args.show_threads:
+        return 0
+
+    returncode, results = run_with_retries(args.command, args.target, threads, extra_args,
+                                           adapter, manifest, args.max_retries)
+    if not args.no_timeline:
+        print_timeline(node_spans(results.values()), manifest, threads)
+    return returncode
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Inferencia de esquemas para los CSVs de seeds.
+Compartido por create_athena_tables.py y seed_parquet.py.
+
+El tipo de cada columna se infiere recorriendo el archivo completo (o una
+muestra configurable) en streaming, con memoria constante, y se va ampliando
+por columna: bigint → double → string y date → timestamp → string. Así un
+valor vacío o raro en la primera fila ya no decide el tipo de toda la columna.
+
+Los archivos grandes se procesan en trozos con un pool de procesos, y el
+esquema resultante se guarda en un caché indexado por el hash del archivo
+para no volver a inferirlo si el CSV no cambió.
+
+Uso:
+    python scripts/schema_inference.py adventureworks/seeds/production/product.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / 'adventureworks' / 'target' / 'schema_cache'
+
+# Cambiar si cambian las reglas de inferencia, para invalidar el caché
+INFERENCE_VERSION = 3
+
+# Filas a leer por archivo (None = archivo completo)
+SAMPLE_ROWS = int(os.environ['SCHEMA_SAMPLE_ROWS']) if os.environ.get('SCHEMA_SAMPLE_ROWS') else None
+
+# A partir de este tamaño el archivo se reparte entre varios procesos
+PARALLEL_THRESHOLD_BYTES = 64 * 1024 * 1024
+CHUNK_BYTES = 16 * 1024 * 1024
+
+INT_RE = re.compile(r'^[+-]?(0|[1-9]\d*)$')
+ZERO_PADDED_RE = re.compile(r'^[+-]?0\d+$')
+DOUBLE_RE = re.compile(r'^[+-]?(\d+\.\d*|\.\d+|\d+)([eE][+-]?\d+)?$')
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+TIMESTAMP_RE = re.compile(r'^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d+)?$')
+
+BIGINT_MAX = 2 ** 63 - 1
+
+# Cómo se combinan dos tipos observados en la misma columna
+NUMERIC_TYPES = ('bigint', 'double')
+TEMPORAL_TYPES = ('date', 'timestamp')
+
+
+# Mapeo de tipos de datos básico
+def infer_type_from_value(value):
+    """Inferir tipo de dato SQL desde un valor de ejemplo"""
+    if not value or value.strip() == '':
+        return 'string'
+
+    value = value.strip()
+
+    # Enteros (sin ceros a la izquierda, que suelen ser códigos: postalcode, etc.)
+    if INT_RE.match(value):
+        return 'bigint' if abs(int(value)) <= BIGINT_MAX else 'string'
+    if ZERO_PADDED_RE.match(value):
+        return 'string'
+
+    if DOUBLE_RE.match(value):
+        return 'double'
+
+    # Fechas y timestamps en formato ISO
+    if DATE_RE.match(value):
+        return 'date'
+
+    if TIMESTAMP_RE.match(value):
+        return 'timestamp'
+
+    # Default
+    return 'string'
+
+
+def widen_type(current, observed):
+    """Tipo más estrecho que admite ambos valores (None = sin valores aún)"""
+    if current is None or current == observed:
+        return observed
+    if current in NUMERIC_TYPES and observed in NUMERIC_TYPES:
+        return 'double'
+    if current in TEMPORAL_TYPES and observed in TEMPORAL_TYPES:
+        return 'timestamp'
+    return 'string'
+
+
+class ColumnProfile:
+    """Tipo ampliado y conteo de nulos de una columna"""
+
+    def __init__(self, name, col_type=None, values=0, nulls=0):
+        self.name = name
+        self.col_type = col_type
+        self.values = values
+        self.nulls = nulls
+
+    def observe(self, value):
+        self.values += 1
+        if value is None or value.strip() == '':
+            self.nulls += 1
+            return
+        if self.col_type != 'string':
+            self.col_type = widen_type(self.col_type, infer_type_from_value(value))
+
+    def merge(self, other):
+        self.values += other.values
+        self.nulls += other.nulls
+        if other.col_type is not None:
+            self.col_type = widen_type(self.col_type, other.col_type)
+
+    @property
+    def sql_type(self):
+        # Una columna siempre vacía no aporta información: string
+        return self.col_type or 'string'
+
+    @property
+    def null_ratio(self):
+        return self.nulls / self.values if self.values else 1.0
+
+    def to_dict(self):
+        return {'name': self.name, 'type': self.col_type, 'values': self.values, 'nulls': self.nulls}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], data['type'], data['values'], data['nulls'])
+
+
+def clean_column_name(header):
+    """Limpiar nombres de columnas"""
+    return header.lower().replace(' ', '_').replace('-', '_')
+
+
+def profile_rows(rows, headers, limit=None):
+    """Perfilar un iterable de filas del CSV (listas) sin guardarlas en memoria"""
+    profiles = [ColumnProfile(clean_column_name(h)) for h in headers]
+    for n, row in enumerate(rows):
+        if limit is not None and n >= limit:
+            break
+        for i, profile in enumerate(profiles):
+            profile.observe(row[i] if i < len(row) else None)
+    return profiles
+
+
+def _profile_chunk(csv_path, start, end, headers):
+    """Perfilar las filas que empiezan entre los bytes start y end (para el pool)"""
+    with open(csv_path, 'rb') as f:
+        # Retroceder un byte y descartar hasta el salto de línea: si start cae
+        # a mitad de una línea, esa línea pertenece al trozo anterior
+        f.seek(start - 1)
+        f.readline()
+
+        def lines():
+            while f.tell() < end:
+                line = f.readline()
+                if not line:
+                    return
+                yield line.decode('utf-8')
+
+        profiles = profile_rows(csv.reader(lines()), headers)
+    return [p.to_dict() for p in profiles]
+
+
+def _chunk_offsets(csv_path, header_end):
+    """Dividir el cuerpo del archivo en rangos de bytes de CHUNK_BYTES"""
+    size = os.path.getsize(csv_path)
+    offsets = list(range(header_end, size, CHUNK_BYTES))
+    return [(start, min(start + CHUNK_BYTES, size)) for start in offsets]
+
+
+def file_hash(csv_path):
+    """SHA-256 del contenido del archivo, leído en bloques"""
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_path(digest, sample_rows, cache_dir):
+    sample = 'full' if sample_rows is None else f"sample{sample_rows}"
+    return Path(cache_dir) / f"{digest}-{sample}-v{INFERENCE_VERSION}.json"
+
+
+def profile_csv(csv_path, sample_rows=SAMPLE_ROWS, workers=None, use_cache=True, cache_dir=CACHE_DIR):
+    """
+    Perfilar un CSV completo (o sus primeras sample_rows filas).
+
+    Los archivos mayores a PARALLEL_THRESHOLD_BYTES se reparten en trozos
+    entre un pool de procesos (solo sin muestra: la muestra es secuencial).
+    Los trozos se cortan en saltos de línea, así que se asume que los campos
+    no contienen saltos de línea entre comillas, como en los seeds.
+    """
+    csv_path = Path(csv_path)
+    cache_file = None
+    if use_cache:
+        cache_file = _cache_path(file_hash(csv_path), sample_rows, cache_dir)
+        if cache_file.exists():
+            return [ColumnProfile.from_dict(c) for c in json.loads(cache_file.read_text())['columns']]
+
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        headers = next(reader, None) or []
+        parallel = (
+            sample_rows is None
+            and workers != 1
+            and os.path.getsize(csv_path) > PARALLEL_THRESHOLD_BYTES
+        )
+        if not parallel:
+            profiles = profile_rows(reader, headers, limit=sample_rows)
+
+    if parallel:
+        with open(csv_path, 'rb') as f:
+            f.readline()
+            header_end = f.tell()
+        profiles = [ColumnProfile(clean_column_name(h)) for h in headers]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_profile_chunk, str(csv_path), start, end, headers)
+                for start, end in _chunk_offsets(csv_path, header_end)
+            ]
+            for future in futures:
+                for profile, data in zip(profiles, future.result()):
+                    profile.merge(ColumnProfile.from_dict(data))
+
+    if cache_file is not None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps({
+            'file': csv_path.name,
+            'sample_rows': sample_rows,
+            'columns': [p.to_dict() for p in profiles],
+        }, indent=2))
+
+    return profiles
+
+
+def get_csv_schema(csv_path, sample_rows=SAMPLE_ROWS):
+    """Leer un CSV y obtener el esquema inferido"""
+    return [(p.name, p.sql_type) for p in profile_csv(csv_path, sample_rows=sample_rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inferir el esquema de uno o más CSVs')
+    parser.add_argument('files', nargs='+', help='Archivos CSV')
+    parser.add_argument('--sample', type=int, default=SAMPLE_ROWS, help='Filas a leer (default: todas)')
+    parser.add_argument('--workers', type=int, default=None, help='Procesos para archivos grandes')
+    parser.add_argument('--no-cache', action='store_true', help='Ignorar el caché de esquemas')
+    args = parser.parse_args()
+
+    for csv_file in args.files:
+        profiles = profile_csv(csv_file, sample_rows=args.sample, workers=args.workers,
+                               use_cache=not args.no_cache)
+        print(f"\n{csv_file}")
+        for p in profiles:
+            print(f"  {p.name:30} {p.sql_type:10} nulos: {p.null_ratio:6.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Convierte los CSVs de seeds a Parquet (comprimido con ZSTD) antes de subirlos a S3.
+
+Athena lee Parquet por columnas, así que una query que usa 3 columnas de
+salesorderdetail ya no escanea ni re-parsea todo el texto del CSV.
+salesorderheader y salesorderdetail se particionan por año/mes de la orden
+(order_year=YYYY/order_month=MM) y sus tablas usan partition projection, de
+modo que Athena no necesita MSCK REPAIR ni consultar particiones en Glue.
+
+Uso:
+    python scripts/seed_parquet.py [--output DIR]
+"""
+
+import argparse
+import csv
+import json
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+from schema_inference import get_csv_schema
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SEEDS_PATH = PROJECT_ROOT / 'adventureworks' / 'seeds'
+DEFAULT_OUTPUT = PROJECT_ROOT / 'adventureworks' / 'target' / 'seeds_parquet'
+SEED_FOLDERS = ['date', 'person', 'production', 'sales']
+
+# Archivo con el esquema final de cada tabla convertida (lo usa create_athena_tables.py)
+SCHEMA_FILE = 'schema.json'
+
+COMPRESSION = 'zstd'
+
+# Tablas particionadas por año/mes de la orden.
+# salesorderdetail no tiene orderdate: se toma del header vía salesorderid y,
+# para líneas sin header, de su propia modifieddate (igual a la fecha de la orden).
+PARTITION_COLUMNS = [('order_year', 'int'), ('order_month', 'int')]
+PARTITIONED_SEEDS = {
+    'salesorderheader': {'date_column': 'orderdate'},
+    'salesorderdetail': {
+        'lookup': ('salesorderheader', 'salesorderid', 'orderdate'),
+        'date_column': 'modifieddate',
+    },
+}
+
+
+def lookup_parents(tables):
+    """Tablas padre que necesitan las tablas dadas para calcular sus particiones"""
+    return {PARTITIONED_SEEDS[t]['lookup'][0] for t in tables if 'lookup' in PARTITIONED_SEEDS.get(t, {})}
+
+
+def lookup_children(tables):
+    """Tablas particionadas con las fechas de alguna de las tablas dadas (hay que reparticionarlas)"""
+    tables = set(tables)
+    return {name for name, spec in PARTITIONED_SEEDS.items() if 'lookup' in spec and spec['lookup'][0] in tables}
+
+
+def parse_value(value, col_type):
+    """Convertir un valor del CSV al tipo de la columna (None si está vacío)"""
+    if value is None or value.strip() == '':
+        return None
+    value = value.strip()
+
+    if col_type == 'bigint':
+        return int(value)
+    if col_type == 'double':
+        return float(value)
+    if col_type == 'date':
+        return date.fromisoformat(value[:10])
+    if col_type == 'timestamp':
+        return datetime.fromisoformat(value.replace('T', ' '))
+    return value
+
+
+def arrow_type(col_type):
+    """Tipo de Arrow equivalente al tipo de Athena"""
+    return {
+        'bigint': pa.int64(),
+        'double': pa.float64(),
+        'date': pa.date32(),
+        'timestamp': pa.timestamp('ms'),
+    }.get(col_type, pa.string())
+
+
+def read_columns(csv_path, schema):
+    """
+    Leer el CSV como columnas tipadas.
+
+    Si algún valor no encaja con el tipo inferido, la columna completa se deja
+    como string para no perder datos (y se avisa).
+    """
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        raw_rows = list(reader)
+
+    columns = {}
+    final_schema = []
+    for i, (name, col_type) in enumerate(schema):
+        raw = [row[i] if i < len(row) else '' for row in raw_rows]
+        try:
+            values = [parse_value(v, col_type) for v in raw]
+        except ValueError:
+            print(f"  ⚠️  {csv_path.stem}.{name}: valores no compatibles con {col_type}, se usa string")
+            col_type = 'string'
+            values = [parse_value(v, col_type) for v in raw]
+        columns[name] = values
+        final_schema.append((name, col_type))
+
+    return columns, final_schema
+
+
+def partition_keys(table_name, columns, output_columns):
+    """Calcular (order_year, order_month) por fila para una tabla particionada"""
+    spec = PARTITIONED_SEEDS[table_name]
+
+    dates = columns[spec['date_column']]
+    if 'lookup' in spec:
+        parent, key, date_column = spec['lookup']
+        parent_dates = dict(zip(output_columns[parent][key], output_columns[parent][date_column]))
+        dates = [parent_dates.get(value) or own for value, own in zip(columns[key], dates)]
+
+    return [(d.year, d.month) if d is not None else (None, None) for d in dates]
+
+
+def write_table(columns, schema, path):
+    """Escribir un archivo Parquet con el esquema indicado"""
+    arrow_schema = pa.schema([(name, arrow_type(col_type)) for name, col_type in schema])
+    table = pa.Table.from_pydict(columns, schema=arrow_schema)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, path, compression=COMPRESSION)
+
+
+def convert_seed(csv_path, folder_name, output_dir, output_columns):
+    """
+    Convertir un seed a Parquet bajo output_dir/<folder>/<tabla>/.
+    Retorna la descripción de la tabla para generar su DDL.
+    """
+    table_name = csv_path.stem
+    columns, schema = read_columns(csv_path, get_csv_schema(csv_path))
+    output_columns[table_name] = columns
+
+    table_dir = output_dir / folder_name / table_name
+    for old_file in table_dir.glob('**/*.parquet'):
+        old_file.unlink()
+
+    info = {'folder': folder_name, 'columns': schema, 'rows': len(next(iter(columns.values()), []))}
+
+    if table_name not in PARTITIONED_SEEDS:
+        write_table(columns, schema, table_dir / f"{table_name}.parquet")
+        return info
+
+    keys = partition_keys(table_name, columns, output_columns)
+    groups = {}
+    for i, key in enumerate(keys):
+        groups.setdefault(key, []).append(i)
+
+    for (year, month), indexes in groups.items():
+        if year is None:
+            print(f"  ⚠️  {table_name}: {len(indexes)} filas sin fecha de orden, se omiten")
+            continue
+        part = {name: [values[i] for i in indexes] for name, values in columns.items()}
+        path = table_dir / f"order_year={year}" / f"order_month={month:02d}" / f"{table_name}.parquet"
+        write_table(part, schema, path)
+
+    years = [year for year, _ in groups if year is not None]
+    info['partition'] = {
+        'columns': PARTITION_COLUMNS,
+        'year_range': [min(years), max(years)] if years else None,
+    }
+    return info
+
+
+def convert_all(seeds_path=SEEDS_PATH, output_dir=DEFAULT_OUTPUT, only=None):
+    """
+    Convertir los seeds y guardar el esquema resultante en schema.json.
+
+    Con only (nombres de tabla) solo se convierten esas tablas, las tablas
+    particionadas con sus fechas (hijas de un lookup) y las tablas padre que
+    necesitan para particionar; el resto de schema.json se conserva.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow no está instalado. Ejecuta: make install")
+
+    output_dir = Path(output_dir)
+    csv_files = []
+    for folder in SEED_FOLDERS:
+        csv_files.extend((folder, f) for f in sorted((Path(seeds_path) / folder).glob('*.csv')))
+
+    if only is not None:
+        needed = set(only) | lookup_children(only)
+        needed |= lookup_parents(needed)
+        csv_files = [item for item in csv_files if item[1].stem in needed]
+
+    # Las tablas padre de un lookup se convierten primero
+    parents = {spec['lookup'][0] for spec in PARTITIONED_SEEDS.values() if 'lookup' in spec}
+    csv_files.sort(key=lambda item: item[1].stem not in parents)
+
+    tables = (load_schema(output_dir) or {}) if only is not None else {}
+    output_columns = {}
+    for folder, csv_path in csv_files:
+        info = convert_seed(csv_path, folder, output_dir, output_columns)
+        tables[csv_path.stem] = info
+        partitioned = ' (particionada por año/mes)' if 'partition' in info else ''
+        print(f"  ✓ {folder}/{csv_path.stem}: {info['rows']:,} filas{partitioned}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / SCHEMA_FILE).write_text(json.dumps(tables, indent=2))
+    return tables
+
+
+def load_schema(output_dir=DEFAULT_OUTPUT):
+    """Leer schema.json de una conversión previa (None si no existe)"""
+    path = Path(output_dir) / SCHEMA_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def build_parquet_ddl(database, table_name, info, s3_location):
+    """Generar el CREATE EXTERNAL TABLE en Parquet (con partition projection si aplica)"""
+    columns = ',\n        '.join(f"`{col}` {dtype}" for col, dtype in info['columns'])
+    properties = [("parquet.compression", COMPRESSION.upper())]
+    partitioned_by = ''
+
+    partition = info.get('partition')
+    if partition:
+        partition_columns = ', '.join(f"`{col}` {dtype}" for col, dtype in partition['columns'])
+        partitioned_by = f"\n    PARTITIONED BY ({partition_columns})"
+        first_year, last_year = partition['year_range'] or [date.today().year] * 2
+        properties += [
+            ("projection.enabled", "true"),
+            ("projection.order_year.type", "integer"),
+            ("projection.order_year.range", f"{first_year},{last_year}"),
+            ("projection.order_month.type", "integer"),
+            ("projection.order_month.range", "1,12"),
+            ("projection.order_month.digits", "2"),
+            ("storage.location.template",
+             f"{s3_location}order_year=${{order_year}}/order_month=${{order_month}}/"),
+        ]
+
+    tblproperties = ',\n        '.join(f"'{key}'='{value}'" for key, value in properties)
+
+    return f"""
+    CREATE EXTERNAL TABLE {database}.{table_name} (
+        {columns}
+    ){partitioned_by}
+    STORED AS PARQUET
+    LOCATION '{s3_location}'
+    TBLPROPERTIES (
+        {tblproperties}
+    )
+    """
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convertir seeds CSV a Parquet')
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT), help='Directorio de salida')
+    args = parser.parse_args()
+
+    print("Convirtiendo seeds a Parquet...")
+    try:
+        tables = convert_all(output_dir=args.output)
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    print(f"✓ {len(tables)} tablas convertidas en {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Slim CI: construir y testear solo lo que cambió respecto de producción.
+
+Después de cada deploy (make dbt-run) se guarda el manifest.json de esa corrida
+en adventureworks/prod-state/<target>/ (y en S3, para que otra máquina lo use).
+En CI se compara el proyecto contra ese manifest:
+
+    dbt snapshot --select state:modified+ --defer --state prod-state/<target>
+    dbt run      --select state:modified+ --defer --state prod-state/<target>
+    dbt test     --select state:modified+ --defer --state prod-state/<target>
+
+Solo se construyen los modelos modificados y sus hijos, en el schema del target
+de CI (athena_ci / duckdb_ci); los refs a modelos sin cambios se resuelven con
+--defer contra las tablas de producción. Por ejemplo, un cambio en
+dim_order_status.sql reconstruye dim_order_status, obt_sales y
+agg_sales_daily_status, pero lee fct_sales y el resto de las dims de producción.
+
+El target de CI se llama como el de producción más "_ci" (athena -> athena_ci).
+
+Uso:
+    python scripts/slim_ci.py save [--target athena] [--s3-uri s3://bucket/dbt-state/]
+    python scripts/slim_ci.py plan [--target athena_ci]
+    python scripts/slim_ci.py run [--target athena_ci] [--s3-uri s3://bucket/dbt-state/] [--skip-tests]
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent.parent / 'adventureworks'
+MANIFEST_PATH = PROJECT_DIR / 'target' / 'manifest.json'
+STATE_DIR = PROJECT_DIR / 'prod-state'
+VENV_DBT = Path(__file__).parent.parent / '.venv' / 'bin' / 'dbt'
+
+CI_SUFFIX = '_ci'
+SELECTOR = 'state:modified+'
+
+
+def dbt_command(*args):
+    dbt = str(VENV_DBT) if VENV_DBT.exists() else 'dbt'
+    return [dbt, *args]
+
+
+def prod_target(target):
+    """Target de producción de un target de CI (athena_ci -> athena)"""
+    return target[:-len(CI_SUFFIX)] if target.endswith(CI_SUFFIX) else target
+
+
+def state_dir(target, base_dir=STATE_DIR):
+    return Path(base_dir) / prod_target(target)
+
+
+def split_s3_uri(s3_uri, target):
+    """s3://bucket/prefijo/ -> (bucket, prefijo/<target>/manifest.json)"""
+    bucket, _, prefix = s3_uri.replace('s3://', '', 1).partition('/')
+    prefix = prefix.strip('/')
+    key = f"{prefix}/{prod_target(target)}/manifest.json" if prefix else f"{prod_target(target)}/manifest.json"
+    return bucket, key
+
+
+def save_state(target, s3_uri=None, manifest_path=MANIFEST_PATH, base_dir=STATE_DIR):
+    """Guarda el manifest de la última corrida de producción como estado para CI"""
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        print(f"❌ No existe {manifest_path}: ejecutar primero dbt run --target {target}")
+        return False
+
+    metadata = json.loads(manifest_path.read_text()).get('metadata', {})
+    destination = state_dir(target, base_dir)
+    destination.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(manifest_path, destination / 'manifest.json')
+    print(f"💾 Estado de producción guardado en {destination} "
+          f"(dbt {metadata.get('dbt_version', '?')}, {metadata.get('generated_at', '?')})")
+
+    if s3_uri:
+        import aws_session
+
+        bucket, key = split_s3_uri(s3_uri, target)
+        aws_session.client('s3').upload_file(str(destination / 'manifest.json'), bucket, key)
+        print(f"☁️  Subido a s3://{bucket}/{key}")
+    return True
+
+
+def fetch_state(target, s3_uri, base_dir=STATE_DIR):
+    """Descarga de S3 el manifest de producción (si no hay, se usa el local)"""
+    import aws_session
+    from botocore.exceptions import ClientError
+
+    bucket, key = split_s3_uri(s3_uri, target)
+    destination = state_dir(target, base_dir)
+    destination.mkdir(parents=True, exist_ok=True)
+    try:
+        aws_session.client('s3').download_file(bucket, key, str(destination / 'manifest.json'))
+        print(f"☁️  Estado de producción descargado de s3://{bucket}/{key}")
+    except ClientError as e:
+        print(f"⚠️  No se pudo descargar s3://{bucket}/{key}: {e}")
+
+
+def modified_models(target, base_dir=STATE_DIR):
+    """Modelos que CI va a construir (modificados respecto de producción y sus hijos)"""
+    cmd = dbt_command('--quiet', 'ls', '--resource-type', 'model', '--output', 'name',
+                      '--select', SELECTOR, '--state', str(state_dir(target, base_dir)),
+                      '--target', target)
+    result = subprocess.run(cmd, cwd=PROJECT_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError((result.stdout + result.stderr).strip()[-2000:])
+    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+
+
+def run_dbt(command, target, base_dir=STATE_DIR):
+    """dbt snapshot/run/test de los nodos modificados, difiriendo el resto a producción"""
+    cmd = dbt_command(command, '--select', SELECTOR, '--defer',
+                      '--state', str(state_dir(target, base_dir)), '--target', target)
+    print(f"\n▶️  dbt {' '.join(cmd[1:])}", flush=True)
+    return subprocess.run(cmd, cwd=PROJECT_DIR).returncode
+
+
+def slim_build(target, s3_uri=None, skip_tests=False, base_dir=STATE_DIR):
+    if not target.endswith(CI_SUFFIX):
+        print(f"❌ {target} no es un target de CI (*{CI_SUFFIX}): --defer construiría en producción")
+        return 1
+    if s3_uri:
+        fetch_state(target, s3_uri, base_dir)
+    if not (state_dir(target, base_dir) / 'manifest.json').exists():
+        print(f"❌ No hay estado de producción en {state_dir(target, base_dir)}: "
+              f"ejecutar 'slim_ci.py save --target {prod_target(target)}' tras un deploy")
+        return 1
+
+    try:
+        models = modified_models(target, base_dir)
+    except RuntimeError as e:
+        print(f"❌ dbt ls falló:\n{e}")
+        return 1
+    if not models:
+        print("✅ Ningún modelo cambió respecto de producción: nada que construir")
+        return 0
+    print(f"🔧 {len(models)} modelos a construir en {target}: {', '.join(models)}")
+
+    # Los snapshots modificados se recrean en el schema de CI antes que sus modelos
+    returncode = run_dbt('snapshot', target, base_dir)
+    if returncode == 0:
+        returncode = run_dbt('run', target, base_dir)
+    if returncode != 0 or skip_tests:
+        return returncode
+    return run_dbt('test', target, base_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Slim CI: solo los modelos modificados respecto de producción')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    save = subparsers.add_parser('save', help='Guardar el manifest de la última corrida de producción')
+    save.add_argument('--target', default='athena', help='Target de producción (default: athena)')
+    save.add_argument('--s3-uri', help='Subir también a este prefijo de S3')
+
+    plan = subparsers.add_parser('plan', help='Listar los modelos que CI construiría')
+    plan.add_argument('--target', default='athena_ci', help='Target de CI (default: athena_ci)')
+
+    run = subparsers.add_parser('run', help='dbt run + dbt test de state:modified+ con --defer')
+    run.add_argument('--target', default='athena_ci', help='Target de CI (default: athena_ci)')
+    run.add_argument('--s3-uri', help='Descargar antes el estado de producción de este prefijo de S3')
+    run.add_argument('--skip-tests', action='store_true', help='Solo dbt run')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == 'save':
+        return 0 if save_state(args.target, args.s3_uri) else 1
+    if args.command == 'plan':
+        try:
+            models = modified_models(args.target)
+        except RuntimeError as e:
+            print(f"❌ dbt ls falló:\n{e}")
+            return 1
+        for name in models:
+            print(f"  {name}")
+        print(f"📋 {len(models)} modelos modificados (o hijos de modificados) respecto de producción")
+        return 0
+    return slim_build(args.target, args.s3_uri, args.skip_tests)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,26 +2,40 @@
 """
 Script simple para generar reporte de entrega del estudiante.
 El estudiante ejecuta esto y copia/pega la salida.
+
+dbt test corre sin timeout y con logs en JSON: el progreso se muestra test por
+test mientras corre, sin guardar toda la salida, y los resultados (con el
+tiempo de cada test) se leen de target/run_results.json.
+
+Uso:
+    python scripts/student_report.py [--select SELECTOR] [--state DIR]
+
+Con --state (el target/ de una corrida anterior) solo se ejecutan los tests
+afectados por los modelos modificados (state:modified+).
 """
 
-import boto3
+import argparse
+import json
 import subprocess
 import sys
+from collections import deque
 from datetime import datetime
+from pathlib import Path
 
-def run_command(cmd):
-    """Ejecuta un comando y retorna output."""
-    try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=120)
-        return result.returncode, result.stdout, result.stderr
-    except Exception as e:
-        return -1, "", str(e)
+import aws_session
+from glue_catalog import GlueCatalog
+
+PROJECT_DIR = Path(__file__).parent.parent / 'adventureworks'
+RUN_RESULTS_PATH = PROJECT_DIR / 'target' / 'run_results.json'
+VENV_DBT = Path(__file__).parent.parent / '.venv' / 'bin' / 'dbt'
+
+# Estados de dbt test y cómo se muestran
+STATUS_ICONS = {'pass': '✅', 'warn': '⚠️ ', 'fail': '❌', 'error': '💥', 'skipped': '⏭️ '}
 
 def get_aws_info():
     """Obtiene info de AWS."""
     try:
-        sts = boto3.client('sts')
-        identity = sts.get_caller_identity()
+        identity = aws_session.caller_identity()
         return identity['Account'], identity['Arn'].split('/')[-1]
     except:
         return "NO_CONFIGURADO", "NO_CONFIGURADO"
@@ -31,7 +45,7 @@ def check_buckets(account_id):
     if account_id == "NO_CONFIGURADO":
         return 0, 0
     
-    s3 = boto3.client('s3')
+    s3 = aws_session.client('s3')
     raw = f"dbt-adventureworks-raw-{account_id}"
     silver = f"dbt-adventureworks-silver-{account_id}"
     
@@ -56,9 +70,8 @@ def check_athena_tables(account_id):
         return 0, 0
     
     try:
-        glue = boto3.client('glue')
-        response = glue.get_tables(DatabaseName='adventureworks')
-        tables = [t['Name'] for t in response.get('TableList', [])]
+        catalog = GlueCatalog(aws_session.client('glue'))
+        tables = catalog.table_names('adventureworks')
         
         # Todas las tablas en la database principal (seeds/raw)
         raw_count = len(tables)
@@ -69,33 +82,81 @@ def check_athena_tables(account_id):
     except:
         return 0, 0
 
-def run_dbt_test():
-    """Ejecuta dbt test y captura resultado."""
-    print("   Ejecutando dbt test (puede tardar 30-60 segundos)...", flush=True)
+def dbt_test_command(select=None, state=None):
+    """Comando de dbt test (logs en JSON para seguir el progreso)"""
+    dbt = str(VENV_DBT) if VENV_DBT.exists() else 'dbt'
+    cmd = [dbt, '--log-format', 'json', 'test', '--target', 'athena']
+    if state:
+        cmd += ['--state', state]
+        select = select or 'state:modified+'
+    if select:
+        cmd += ['--select', select]
+    return cmd
+
+def read_test_results(since=None, path=RUN_RESULTS_PATH):
+    """
+    Tests de target/run_results.json: [{name, status, execution_time, failures, message}].
+    None si el archivo no existe o es anterior a since (dbt falló antes de correr los tests).
+    """
+    path = Path(path)
+    if not path.exists() or (since is not None and path.stat().st_mtime < since):
+        return None
     
-    # Usar el python del venv directamente
-    cmd = "cd adventureworks && ../.venv/bin/dbt test --target athena 2>&1"
-    code, out, err = run_command(cmd)
+    tests = []
+    for result in json.loads(path.read_text()).get('results', []):
+        if not result.get('unique_id', '').startswith('test.'):
+            continue
+        tests.append({
+            'name': result['unique_id'].split('.')[2],
+            'status': result.get('status'),
+            'execution_time': result.get('execution_time') or 0.0,
+            'failures': result.get('failures'),
+            'message': result.get('message'),
+        })
+    return tests
+
+def run_dbt_test(select=None, state=None):
+    """Ejecuta dbt test mostrando cada resultado a medida que termina."""
+    cmd = dbt_test_command(select, state)
+    print(f"   Ejecutando: dbt {' '.join(cmd[1:])}", flush=True)
     
-    # Parsear resultados - buscar líneas con PASS y FAIL
-    passed = 0
-    failed = 0
-    errors = []
+    started_at = datetime.now().timestamp()
+    # Solo se guardan los últimos mensajes de error, no toda la salida
+    log_errors = deque(maxlen=10)
+    try:
+        process = subprocess.Popen(cmd, cwd=PROJECT_DIR, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, text=True, bufsize=1)
+    except OSError as e:
+        return None, [f"No se pudo ejecutar dbt: {e}"]
     
-    for line in out.split('\n'):
-        # Detectar tests que pasaron
-        if ' PASS ' in line or line.strip().endswith('PASS'):
-            passed += 1
-        # Detectar tests que fallaron
-        elif ' FAIL ' in line or ' ERROR ' in line:
-            failed += 1
-            # Capturar el nombre del test fallido
-            if 'FAIL' in line or 'ERROR' in line:
-                errors.append(line.strip())
+    for line in process.stdout:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            if line.strip():
+                log_errors.append(line.strip())
+            continue
+        
+        info = event.get('info', {})
+        data = event.get('data', {})
+        if info.get('name') == 'LogTestResult':
+            icon = STATUS_ICONS.get(data.get('status'), '•')
+            print(f"   {icon} {data.get('index')}/{data.get('num_models')} {data.get('name')} "
+                  f"({data.get('execution_time', 0):.2f}s)", flush=True)
+        elif info.get('level') == 'error' and info.get('msg'):
+            log_errors.append(info['msg'].strip())
+    process.wait()
     
-    return passed, failed, errors, out
+    return read_test_results(since=started_at), list(log_errors)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generar el reporte de entrega')
+    parser.add_argument('--select', help='Selector de dbt para los tests (ej: dim_product+)')
+    parser.add_argument('--state', help='target/ de una corrida anterior: solo tests de modelos modificados')
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
     print("\n" + "="*70)
     print("📊 REPORTE DE ENTREGA - DBT DIMENSIONAL MODELLING")
     print("="*70)
@@ -119,16 +180,31 @@ def main():
     
     # Ejecutar dbt test
     print(f"\n🧪 DBT TESTS:")
-    passed, failed, errors, test_output = run_dbt_test()
+    tests, log_errors = run_dbt_test(select=args.select, state=args.state)
+    tests = tests or []
+    passed = sum(1 for t in tests if t['status'] == 'pass')
+    failed_tests = [t for t in tests if t['status'] in ('fail', 'error')]
+    failed = len(failed_tests)
+    errors = [f"{t['name']}: {t['message'] or t['status']}" for t in failed_tests] or log_errors[-3:]
     total = passed + failed
     
     print(f"   Tests ejecutados: {total}")
     print(f"   ✅ Pasaron: {passed}")
     print(f"   ❌ Fallaron: {failed}")
+    if tests:
+        print(f"   ⏱️  Tiempo total en tests: {sum(t['execution_time'] for t in tests):.1f}s")
+        print(f"   Tests más lentos:")
+        for test in sorted(tests, key=lambda t: t['execution_time'], reverse=True)[:5]:
+            print(f"      {test['execution_time']:6.2f}s  {test['name']}")
+    elif log_errors:
+        print(f"\n   dbt no llegó a ejecutar los tests:")
+        for error in log_errors[-3:]:
+            print(f"      • {error}")
     
     if failed > 0:
-        print(f"\n   💡 Nota: Es normal que falle 1 test (not_null_dim_product_product_name)")
-        print(f"      Este es un bug conocido de Athena con inferencia de tipos.")
+        print(f"\n   💡 Nota: Si falla not_null_dim_product_product_name, las tablas raw se")
+        print(f"      crearon infiriendo tipos solo con la primera fila. Recréalas con:")
+        print(f"      make create-raw-tables")
         print(f"\n   Tests fallidos:")
         for error in errors[:3]:  # Solo mostrar los primeros 3
             print(f"      • {error}")
@@ -179,8 +255,8 @@ def main():
     
     # Info adicional para el profesor
     if failed == 1 and 'not_null_dim_product_product_name' in str(errors):
-        print(f"\n   ℹ️  Para el profesor: El test que falla es el bug conocido de Athena.")
-        print(f"      El estudiante no puede solucionarlo. Evaluar como: {passed}/41 tests OK.")
+        print(f"\n   ℹ️  Para el profesor: El test que falla es el de inferencia de tipos de las")
+        print(f"      tablas raw (se corrige con make create-raw-tables). Evaluar como: {passed}/41 tests OK.")
     
     # Eliminar sección de detalle de tests que ya no necesitamos
     
@@ -192,4 +268,4 @@ def main():
     print("="*70 + "\n")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Sincronización incremental de seeds con S3 y Athena.
+
+Guarda un manifiesto local con el hash de cada seed, los archivos subidos
+(con su hash), el esquema inferido y el hash del DDL de su tabla. En cada
+ejecución solo se suben los archivos cuyo contenido cambió (en paralelo y con
+multipart para los grandes) y solo se recrean las tablas cuyo DDL cambió o
+que ya no existen en el catálogo.
+
+Uso:
+    python scripts/sync_seeds.py [--format parquet|csv] [--force] [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import aws_session
+import seed_parquet
+from glue_catalog import GlueCatalog
+from create_athena_tables import (
+    ATHENA_DATABASE, ATHENA_WORKERS, SEED_FORMAT,
+    build_parquet_table_queries, build_table_queries, get_runner, report_query,
+)
+from schema_inference import file_hash, get_csv_schema
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SEEDS_PATH = PROJECT_ROOT / 'adventureworks' / 'seeds'
+MANIFEST_PATH = SEEDS_PATH / '.sync_manifest.json'
+MANIFEST_VERSION = 1
+
+# Transferencias: multipart a partir de 8 MB y varios archivos a la vez
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CONCURRENCY = 8
+UPLOAD_WORKERS = 8
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Leer el manifiesto local (vacío si no existe o es de otra versión)"""
+    if Path(path).exists():
+        manifest = json.loads(Path(path).read_text())
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    return {'version': MANIFEST_VERSION, 'targets': {}}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    Path(path).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def target_key(bucket, fmt):
+    """Cada combinación bucket/formato lleva su propio estado"""
+    return f"{bucket}/{fmt}"
+
+
+def ddl_hash(queries):
+    """Hash del DDL normalizado (sin diferencias de espacios)"""
+    return hashlib.sha256(' '.join(' '.join(queries).split()).encode('utf-8')).hexdigest()
+
+
+def find_seeds(seeds_path=SEEDS_PATH):
+    """(folder, tabla, ruta) de todos los CSVs de seeds"""
+    seeds = []
+    for folder in seed_parquet.SEED_FOLDERS:
+        for csv_path in sorted((Path(seeds_path) / folder).glob('*.csv')):
+            seeds.append((folder, csv_path.stem, csv_path))
+    return seeds
+
+
+def local_state(seeds, previous, fmt, force=False):
+    """
+    Estado local de cada tabla: hash del seed, archivos a subir y DDL.
+
+    Solo se convierten (en Parquet) los seeds que cambiaron respecto del
+    manifiesto; para el resto se reutiliza lo registrado.
+    """
+    hashes = {table: file_hash(path) for _, table, path in seeds}
+    changed = {
+        table for _, table, _ in seeds
+        if force or previous.get(table, {}).get('source_sha256') != hashes[table]
+    }
+    # Si cambia una tabla padre de un lookup (ej: orderdate del header), sus
+    # hijas se reparticionan aunque su CSV no haya cambiado
+    changed |= seed_parquet.lookup_children(changed) & set(hashes)
+
+    converted = {}
+    output_dir = seed_parquet.DEFAULT_OUTPUT
+    if fmt == 'parquet' and changed:
+        converted = seed_parquet.convert_all(output_dir=output_dir, only=changed)
+
+    state = {}
+    for folder, table, csv_path in seeds:
+        entry = {'folder': folder, 'source_sha256': hashes[table]}
+
+        if table not in changed:
+            entry.update({k: previous[table][k] for k in ('files', 'info')})
+            entry['local_files'] = {}
+        elif fmt == 'parquet':
+            table_dir = output_dir / folder / table
+            local_files = {p.relative_to(table_dir).as_posix(): p for p in sorted(table_dir.glob('**/*.parquet'))}
+            entry['info'] = converted[table]
+            entry['local_files'] = local_files
+            entry['files'] = {rel: file_hash(p) for rel, p in local_files.items()}
+        else:
+            entry['info'] = {'folder': folder, 'columns': get_csv_schema(csv_path)}
+            entry['local_files'] = {f"{table}.csv": csv_path}
+            entry['files'] = {f"{table}.csv": hashes[table]}
+
+        if fmt == 'parquet':
+            queries, location = build_parquet_table_queries(folder, table, entry['info'])
+        else:
+            queries, location = build_table_queries(csv_path, folder, table)
+        entry['queries'] = queries
+        entry['location'] = location
+        entry['ddl_sha256'] = ddl_hash(queries)
+        state[table] = entry
+
+    return state
+
+
+def plan_sync(previous, state, existing_tables, force=False):
+    """
+    Comparar el manifiesto con el estado local.
+
+    Retorna, por tabla: archivos a subir, archivos remotos a borrar y si hay
+    que recrear la tabla en Athena.
+    """
+    plan = {}
+    for table, entry in state.items():
+        old = previous.get(table, {})
+        old_files = old.get('files', {})
+
+        uploads = [rel for rel, digest in entry['files'].items() if force or old_files.get(rel) != digest]
+        deletes = [rel for rel in old_files if rel not in entry['files']]
+        recreate = (
+            force
+            or old.get('ddl_sha256') != entry['ddl_sha256']
+            or table not in existing_tables
+        )
+
+        if uploads or deletes or recreate:
+            plan[table] = {'uploads': uploads, 'deletes': deletes, 'recreate': recreate}
+    return plan
+
+
+def s3_prefix(entry, bucket):
+    """Prefijo S3 de la tabla a partir de su LOCATION"""
+    return entry['location'].split(f"s3://{bucket}/", 1)[1]
+
+
+def transfer_config():
+    """TransferConfig de boto3 (se importa al subir, no al cargar el módulo)"""
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(multipart_threshold=MULTIPART_THRESHOLD, max_concurrency=MULTIPART_CONCURRENCY)
+
+
+def upload_files(s3, bucket, plan, state):
+    """Subir y borrar archivos en paralelo; retorna las tablas con errores"""
+    config = transfer_config()
+    jobs = []
+    for table, actions in plan.items():
+        prefix = s3_prefix(state[table], bucket)
+        for rel in actions['uploads']:
+            jobs.append((table, state[table]['local_files'][rel], prefix + rel))
+
+    def upload(job):
+        table, path, key = job
+        s3.upload_file(str(path), bucket, key, Config=config)
+        # Una sola escritura por línea para que no se mezclen entre hilos
+        sys.stdout.write(f"  📄 {table}: s3://{bucket}/{key}\n")
+
+    failed = set()
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        futures = {executor.submit(upload, job): job[0] for job in jobs}
+        for future, table in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"  ✗ Error subiendo {table}: {e}")
+                failed.add(table)
+
+    for table, actions in plan.items():
+        if not actions['deletes'] or table in failed:
+            continue
+        prefix = s3_prefix(state[table], bucket)
+        keys = [{'Key': prefix + rel} for rel in actions['deletes']]
+        for i in range(0, len(keys), 1000):
+            s3.delete_objects(Bucket=bucket, Delete={'Objects': keys[i:i + 1000]})
+        print(f"  🗑️  {table}: {len(keys)} archivos obsoletos eliminados")
+
+    return failed
+
+
+def catalog_tables(catalog):
+    """Nombres de las tablas que existen hoy en la database de Athena (sin caché: decide qué recrear)"""
+    return set(catalog.table_names(ATHENA_DATABASE, max_age=0))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Sincronizar seeds cambiados con S3 y Athena')
+    parser.add_argument('--format', choices=['parquet', 'csv'], default=SEED_FORMAT,
+                        help=f'Formato de los seeds en S3 (default: {SEED_FORMAT})')
+    parser.add_argument('--workers', type=int, default=ATHENA_WORKERS,
+                        help=f'Queries DDL en vuelo (default: {ATHENA_WORKERS})')
+    parser.add_argument('--force', action='store_true', help='Subir y recrear todo')
+    parser.add_argument('--dry-run', action='store_true', help='Mostrar el plan sin ejecutarlo')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    raw_bucket = aws_session.raw_bucket()
+
+    print("=" * 60)
+    print("Sincronizando seeds con S3 y Athena")
+    print("=" * 60)
+    print(f"Raw Bucket: {raw_bucket}")
+    print(f"Formato: {args.format}")
+    print("=" * 60)
+
+    manifest = load_manifest()
+    key = target_key(raw_bucket, args.format)
+    previous = manifest['targets'].get(key, {})
+
+    try:
+        state = local_state(find_seeds(), previous, args.format, force=args.force)
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    catalog = GlueCatalog(aws_session.client('glue'))
+    existing_tables = catalog_tables(catalog)
+    plan = plan_sync(previous, state, existing_tables, force=args.force)
+
+    if not plan:
+        print("\n✓ Todo al día: ningún seed cambió")
+        return 0
+
+    print(f"\nCambios detectados en {len(plan)} tablas:")
+    for table, actions in plan.items():
+        ddl = ', recrear tabla' if actions['recreate'] else ''
+        print(f"  - {table}: {len(actions['uploads'])} archivos a subir, "
+              f"{len(actions['deletes'])} a borrar{ddl}")
+
+    if args.dry_run:
+        return 0
+
+    print("\nSubiendo archivos...")
+    failed = upload_files(aws_session.client('s3'), raw_bucket, plan, state)
+
+    chains = [
+        (table, state[table]['queries'])
+        for table, actions in plan.items()
+        if actions['recreate'] and table not in failed
+    ]
+    if chains:
+        print(f"\nRecreando {len(chains)} tablas en Athena...")
+        runner = get_runner()
+        try:
+            outcome = runner.run_chains(chains, max_in_flight=args.workers, on_finish=report_query)
+        except KeyboardInterrupt:
+            runner.cancel_all()
+            raise
+        for (table, queries), results in zip(chains, outcome):
+            if len(results) != len(queries) or not all(r.succeeded for r in results):
+                failed.add(table)
+        catalog.invalidate(ATHENA_DATABASE)
+
+    # Solo se registran las tablas sincronizadas por completo
+    synced_at = datetime.now().isoformat(timespec='seconds')
+    targets = manifest['targets'].setdefault(key, {})
+    for table, entry in state.items():
+        if table in failed:
+            continue
+        record = {k: entry[k] for k in ('folder', 'source_sha256', 'files', 'info', 'ddl_sha256')}
+        record['synced_at'] = synced_at if table in plan else previous.get(table, {}).get('synced_at', synced_at)
+        targets[table] = record
+    save_manifest(manifest)
+
+    print("\n" + "=" * 60)
+    print(f"✓ Tablas sincronizadas: {len(plan) - len(failed & set(plan))}")
+    if failed:
+        print(f"✗ Tablas con errores: {', '.join(sorted(failed))}")
+    print("=" * 60)
+
+    return 0 if not failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Fixtures compartidas; los tests importan los scripts como lo hacen entre ellos: desde scripts/"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class FakeClock:
+    """Reloj controlado por el test: sleep avanza el tiempo en vez de esperar"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def stubbed_client():
+    """Cliente de botocore sin credenciales reales con un Stubber activo: stubbed_client('athena')"""
+    botocore_session = pytest.importorskip('botocore.session')
+    from botocore.stub import Stubber
+
+    stubbers = []
+
+    def make(service):
+        client = botocore_session.get_session().create_client(
+            service, region_name='us-east-1', aws_access_key_id='test', aws_secret_access_key='test',
+        )
+        stubber = Stubber(client)
+        stubber.activate()
+        stubbers.append(stubber)
+        return client, stubber
+
+    yield make
+    for stubber in stubbers:
+        stubber.assert_no_pending_responses()
+        stubber.deactivate()
@@ -0,0 +1,121 @@
+"""Reporte de costo por nodo contra respuestas grabadas de Athena"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import athena_cost_report
+from athena_cost_report import build_report, fetch_executions, read_run_results, regressions, run_window
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'athena_cost_report'
+MB = 1024 ** 2
+
+EXPECTED = {
+    # 3 queries (el DDL no se cobra): 800 + 200 MB a 5 USD/TB
+    'model.adventureworks.fct_sales': {
+        'queries': 3, 'scanned_bytes': 1000 * MB, 'cost_usd': 0.004768,
+        'engine_ms': 60500, 'queue_ms': 300, 'planning_ms': 900, 'total_ms': 61700,
+    },
+    # La query fallida suma escaneo y tiempos, pero no costo
+    'model.adventureworks.obt_sales': {
+        'queries': 2, 'scanned_bytes': 1250 * MB, 'cost_usd': 0.005722,
+        'engine_ms': 53000, 'queue_ms': 200, 'planning_ms': 600, 'total_ms': 53800,
+    },
+    # 1 MB escaneado se cobra como el mínimo de 10 MB; la query cancelada paga sus 20 MB
+    'model.adventureworks.dim_date': {
+        'queries': 2, 'scanned_bytes': 21 * MB, 'cost_usd': 0.000143,
+        'engine_ms': 2900, 'queue_ms': 200, 'planning_ms': 600, 'total_ms': 3700,
+    },
+    # DDL de dbt sin node_id (ej: CREATE SCHEMA)
+    '(sin nodo)': {
+        'queries': 1, 'scanned_bytes': 0, 'cost_usd': 0.0,
+        'engine_ms': 200, 'queue_ms': 100, 'planning_ms': 300, 'total_ms': 600,
+    },
+}
+
+
+def recorded_responses():
+    responses = json.loads((FIXTURES / 'athena_responses.json').read_text())
+    # boto3 devuelve las fechas como datetime
+    for response in responses['batch_get_query_execution']:
+        for execution in response['QueryExecutions']:
+            status = execution['Status']
+            for key in ('SubmissionDateTime', 'CompletionDateTime'):
+                status[key] = athena_cost_report._parse_time(status[key])
+    return responses
+
+
+def node_metrics(report):
+    return {
+        unique_id: {key: node[key] for key in EXPECTED[unique_id]}
+        for unique_id, node in report['nodes'].items()
+    }
+
+
+@pytest.fixture
+def run_results():
+    return read_run_results(FIXTURES / 'run_results.json')
+
+
+@pytest.fixture
+def executions(stubbed_client, run_results):
+    """Ejecuciones de la corrida leídas de un cliente de Athena con las respuestas grabadas"""
+    athena, stubber = stubbed_client('athena')
+    responses = recorded_responses()
+    tokens = [None, 'page-2']
+    for token, page, batch in zip(tokens, responses['list_query_executions'], responses['batch_get_query_execution']):
+        params = {'WorkGroup': 'primary', 'MaxResults': 50}
+        if token:
+            params['NextToken'] = token
+        stubber.add_response('list_query_executions', page, params)
+        stubber.add_response('batch_get_query_execution', batch,
+                             {'QueryExecutionIds': page['QueryExecutionIds']})
+
+    start, end = run_window(run_results)
+    # La segunda página ya llega a antes de la corrida: no se pide la tercera
+    return fetch_executions(athena, 'primary', start, end)
+
+
+def test_fetch_keeps_only_the_run_window(executions):
+    ids = sorted(e['QueryExecutionId'][:8] for e in executions)
+    # q10 es de una corrida anterior (09:00)
+    assert ids == [f"0000000{i}" for i in range(1, 10)] + ['00000011']
+
+
+def test_per_node_scan_cost_and_latency(run_results, executions):
+    report = build_report(run_results, executions, 'athena')
+
+    # Quedan afuera la query de athena_ci y la que no viene de dbt
+    assert node_metrics(report) == EXPECTED
+    assert report['nodes']['model.adventureworks.fct_sales']['dbt_seconds'] == 120.4
+    assert report['totals']['queries'] == 8
+    assert report['totals']['scanned_bytes'] == 2271 * MB
+    assert report['totals']['cost_usd'] == pytest.approx(0.004768 + 0.005722 + 0.000143, abs=2e-6)
+    assert (report['command'], report['target']) == ('run', 'athena')
+
+
+def test_regression_against_baseline(run_results, executions):
+    report = build_report(run_results, executions, 'athena')
+    baseline = json.loads(json.dumps(report))
+    baseline['nodes']['model.adventureworks.fct_sales']['scanned_bytes'] = 500 * MB
+    # +25% pero menos de 2 s: ruido, no regresión
+    baseline['nodes']['model.adventureworks.dim_date']['engine_ms'] = 2320
+
+    assert regressions(report, baseline) == [
+        ('model.adventureworks.fct_sales', 'scanned_bytes', 500 * MB, 1000 * MB),
+    ]
+
+
+def test_main_with_recorded_executions(tmp_path, monkeypatch, run_results, executions):
+    recorded = tmp_path / 'executions.json'
+    athena_cost_report.write_json(recorded, executions)
+    monkeypatch.setattr(athena_cost_report, 'REPORT_PATH', tmp_path / 'athena_costs.json')
+    monkeypatch.setattr('sys.argv', [
+        'athena_cost_report.py', '--run-results', str(FIXTURES / 'run_results.json'),
+        '--executions', str(recorded), '--baseline', str(tmp_path / 'baseline.json'), '--no-history',
+    ])
+
+    assert athena_cost_report.main() == 0
+    report = json.loads((tmp_path / 'athena_costs.json').read_text())
+    assert node_metrics(report) == EXPECTED
@@ -0,0 +1,118 @@
+"""AthenaQueryRunner contra un cliente de Athena con botocore Stubber"""
+
+from botocore.stub import ANY
+
+from athena_runner import BATCH_SIZE, AthenaQueryRunner
+
+
+def execution(execution_id, state, reason=None, scanned=0):
+    status = {'State': state}
+    if reason:
+        status['StateChangeReason'] = reason
+    return {'QueryExecutionId': execution_id, 'Status': status, 'Statistics': {'DataScannedInBytes': scanned}}
+
+
+def expect_start(stubber, execution_id, query):
+    stubber.add_response(
+        'start_query_execution', {'QueryExecutionId': execution_id},
+        {'QueryString': query, 'QueryExecutionContext': {'Database': 'adventureworks'},
+         'ResultConfiguration': {'OutputLocation': ANY}},
+    )
+
+
+def expect_batch(stubber, ids, executions):
+    stubber.add_response('batch_get_query_execution', {'QueryExecutions': executions},
+                         {'QueryExecutionIds': ids})
+
+
+def make_runner(client, clock, **kwargs):
+    return AthenaQueryRunner(client, 'adventureworks', 's3://bucket/athena-results/',
+                             sleep=clock.sleep, clock=clock, **kwargs)
+
+
+def test_polls_more_than_one_batch(stubbed_client, clock):
+    athena, stubber = stubbed_client('athena')
+    ids = [f"q{i:03d}" for i in range(BATCH_SIZE + 10)]
+    for execution_id in ids:
+        expect_start(stubber, execution_id, f"SELECT {execution_id}")
+    expect_batch(stubber, ids[:BATCH_SIZE], [execution(i, 'SUCCEEDED', scanned=10) for i in ids[:BATCH_SIZE]])
+    expect_batch(stubber, ids[BATCH_SIZE:], [execution(i, 'SUCCEEDED', scanned=10) for i in ids[BATCH_SIZE:]])
+
+    runner = make_runner(athena, clock)
+    results = [runner.start(f"SELECT {execution_id}") for execution_id in ids]
+    runner.wait(results)
+
+    assert all(result.succeeded for result in results)
+    assert results[-1].statistics == {'DataScannedInBytes': 10}
+    assert runner.pending == {}
+    # Un start por query y dos lotes de consulta, sin esperas
+    assert runner.api_calls == len(ids) + 2
+    assert clock.sleeps == []
+
+
+def test_failed_and_cancelled_queries(stubbed_client, clock):
+    athena, stubber = stubbed_client('athena')
+    expect_start(stubber, 'bad', 'SELECT * FROM missing')
+    expect_start(stubber, 'stopped', 'SELECT 1')
+    expect_start(stubber, 'slow', 'SELECT 2')
+    expect_batch(stubber, ['bad', 'stopped', 'slow'], [
+        execution('bad', 'FAILED', "TABLE_NOT_FOUND: Table 'missing' does not exist"),
+        execution('stopped', 'CANCELLED'),
+        execution('slow', 'RUNNING'),
+    ])
+    expect_batch(stubber, ['slow'], [execution('slow', 'SUCCEEDED')])
+
+    runner = make_runner(athena, clock)
+    bad, stopped, slow = (runner.start(q) for q in ('SELECT * FROM missing', 'SELECT 1', 'SELECT 2'))
+
+    assert runner.wait_any() == [bad, stopped]
+    assert (bad.state, bad.succeeded, bad.reason) == ('FAILED', False, "TABLE_NOT_FOUND: Table 'missing' does not exist")
+    assert (stopped.state, stopped.succeeded) == ('CANCELLED', False)
+
+    assert runner.wait_any() == [slow]
+    assert slow.succeeded
+    assert clock.sleeps == []
+
+
+def test_timeout_cancels_query(stubbed_client, clock):
+    athena, stubber = stubbed_client('athena')
+    expect_start(stubber, 'q1', 'SELECT sleep')
+    for _ in range(3):
+        expect_batch(stubber, ['q1'], [execution('q1', 'RUNNING')])
+    stubber.add_response('stop_query_execution', {}, {'QueryExecutionId': 'q1'})
+
+    runner = make_runner(athena, clock, initial_delay=0.5, backoff_factor=1.5)
+    result = runner.run('SELECT sleep', timeout=1)
+
+    # Consultas en t=0, 0.5 y 1.25: la última ya pasó el deadline y se cancela
+    assert clock.sleeps == [0.5, 0.75]
+    assert result.state == 'CANCELLED'
+    assert result.reason == 'Timeout después de 1s'
+    assert runner.pending == {}
+
+
+def test_run_chains_keeps_order_and_stops_failed_chain(stubbed_client, clock):
+    athena, stubber = stubbed_client('athena')
+    # Dos queries en vuelo: la cadena A avanza query por query, la B falla en su
+    # primera query y la C arranca en cuanto se libera su lugar
+    expect_start(stubber, 'a1', 'DROP a')
+    expect_start(stubber, 'b1', 'DROP b')
+    expect_batch(stubber, ['a1', 'b1'], [execution('a1', 'SUCCEEDED'), execution('b1', 'RUNNING')])
+    expect_start(stubber, 'a2', 'CREATE a')
+    expect_batch(stubber, ['b1', 'a2'], [execution('b1', 'FAILED', 'AccessDenied'), execution('a2', 'SUCCEEDED')])
+    expect_start(stubber, 'a3', 'INSERT a')
+    expect_start(stubber, 'c1', 'DROP c')
+    expect_batch(stubber, ['a3', 'c1'], [execution('c1', 'SUCCEEDED'), execution('a3', 'RUNNING')])
+    expect_batch(stubber, ['a3'], [execution('a3', 'SUCCEEDED')])
+
+    finished = []
+    runner = make_runner(athena, clock)
+    outcome = runner.run_chains(
+        [('a', ['DROP a', 'CREATE a', 'INSERT a']), ('b', ['DROP b', 'CREATE b']), ('c', ['DROP c'])],
+        max_in_flight=2, on_finish=finished.append,
+    )
+
+    assert [[r.execution_id for r in results] for results in outcome] == [['a1', 'a2', 'a3'], ['b1'], ['c1']]
+    assert [r.label for r in outcome[0]] == ['a', 'a', 'a']
+    assert outcome[1][0].reason == 'AccessDenied'
+    assert [r.execution_id for r in finished] == ['a1', 'b1', 'a2', 'c1', 'a3']
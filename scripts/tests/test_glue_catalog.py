@@ -0,0 +1,120 @@
+"""Catálogo de Glue: paginación, Expression y caché con TTL en memoria y en disco"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from glue_catalog import GlueCatalog
+
+UPDATED = datetime(2024, 5, 31, 12, 30, tzinfo=timezone.utc)
+
+
+def table(name):
+    return {'Name': name, 'DatabaseName': 'adventureworks', 'UpdateTime': UPDATED,
+            'Parameters': {'table_type': 'ICEBERG'}}
+
+
+def expect_tables(stubber, names, database='adventureworks', expression=None):
+    """Una llamada a get_tables sin paginar"""
+    params = {'DatabaseName': database}
+    if expression:
+        params['Expression'] = expression
+    stubber.add_response('get_tables', {'TableList': [table(name) for name in names]}, params)
+
+
+@pytest.fixture
+def glue(stubbed_client):
+    return stubbed_client('glue')
+
+
+@pytest.fixture
+def catalog(glue, clock, tmp_path):
+    client, _ = glue
+    return GlueCatalog(client, ttl=60, cache_dir=tmp_path, clock=clock)
+
+
+def test_reads_every_page(glue, catalog):
+    _, stubber = glue
+    pages = [['customer', 'product'], ['salesorderheader'], ['salesorderdetail']]
+    for i, names in enumerate(pages):
+        response = {'TableList': [table(name) for name in names]}
+        params = {'DatabaseName': 'adventureworks'}
+        if i:
+            params['NextToken'] = f"page-{i + 1}"
+        if i < len(pages) - 1:
+            response['NextToken'] = f"page-{i + 2}"
+        stubber.add_response('get_tables', response, params)
+
+    assert catalog.table_names('adventureworks') == ['customer', 'product', 'salesorderheader', 'salesorderdetail']
+    assert catalog.api_calls == 3
+
+
+def test_expression_is_sent_to_glue_and_cached_apart(glue, catalog):
+    _, stubber = glue
+    expect_tables(stubber, ['dim_date', 'fct_sales'], 'marts', expression='dim_*|fct_*')
+    expect_tables(stubber, ['dim_date', 'fct_sales', 'obt_sales'], 'marts')
+
+    assert catalog.table_names('marts', 'dim_*|fct_*') == ['dim_date', 'fct_sales']
+    assert catalog.table_names('marts') == ['dim_date', 'fct_sales', 'obt_sales']
+    assert catalog.table_names('marts', 'dim_*|fct_*') == ['dim_date', 'fct_sales']
+    assert catalog.api_calls == 2
+
+
+def test_list_is_cached_for_ttl(glue, catalog, clock):
+    _, stubber = glue
+    expect_tables(stubber, ['customer'])
+    expect_tables(stubber, ['customer', 'product'])
+
+    assert catalog.table_names('adventureworks') == ['customer']
+    clock.now += 59
+    assert catalog.table_names('adventureworks') == ['customer']
+    assert catalog.api_calls == 1
+    clock.now += 1
+    assert catalog.table_names('adventureworks') == ['customer', 'product']
+    assert catalog.api_calls == 2
+
+
+def test_max_age_zero_reads_glue_and_refreshes_cache(glue, catalog):
+    _, stubber = glue
+    expect_tables(stubber, ['customer'])
+    expect_tables(stubber, ['customer', 'product'])
+
+    assert catalog.table_names('adventureworks') == ['customer']
+    assert catalog.table_names('adventureworks', max_age=0) == ['customer', 'product']
+    # La lista leída con max_age=0 queda para los que aceptan el TTL
+    assert catalog.table_names('adventureworks') == ['customer', 'product']
+    assert catalog.api_calls == 2
+
+
+def test_invalidate_forgets_memory_and_disk_of_one_database(glue, catalog, clock, tmp_path):
+    client, stubber = glue
+    expect_tables(stubber, ['customer'])
+    expect_tables(stubber, ['fct_sales'], 'marts')
+    expect_tables(stubber, ['customer', 'product'])
+
+    catalog.tables('adventureworks')
+    catalog.tables('marts')
+    catalog.invalidate('adventureworks')
+
+    assert catalog.table_names('adventureworks') == ['customer', 'product']
+    assert catalog.table_names('marts') == ['fct_sales']
+    # Otro proceso (mismo caché en disco) tampoco ve la lista vieja
+    other = GlueCatalog(client, ttl=60, cache_dir=tmp_path, clock=clock)
+    assert other.table_names('adventureworks') == ['customer', 'product']
+    assert other.api_calls == 0
+
+    catalog.invalidate()
+    assert list(tmp_path.glob('*.json')) == []
+
+
+def test_datetimes_round_trip_through_disk_cache(glue, catalog, clock, tmp_path):
+    client, stubber = glue
+    expect_tables(stubber, ['customer'])
+    catalog.tables('adventureworks')
+
+    other = GlueCatalog(client, ttl=60, cache_dir=tmp_path, clock=clock)
+    [cached] = other.tables('adventureworks')
+
+    assert other.api_calls == 0
+    assert cached == table('customer')
+    assert cached['UpdateTime'] == UPDATED and cached['UpdateTime'].tzinfo is not None
@@ -0,0 +1,165 @@
+"""Caché de resultados de Athena: tablas leídas por una query, claves y desalojo LRU"""
+
+import os
+from datetime import datetime
+
+import pytest
+from botocore.stub import ANY
+
+from athena_runner import AthenaQueryRunner
+from query_cache import CachedQueryRunner, QueryCache, TableVersions, referenced_tables
+
+
+@pytest.mark.parametrize('sql, expected', [
+    ('SELECT * FROM fct_sales', [('adventureworks', 'fct_sales')]),
+    ('select * from marts.fct_sales f join marts.dim_date d on f.date_key = d.date_key',
+     [('marts', 'dim_date'), ('marts', 'fct_sales')]),
+    ('SELECT * FROM awsdatacatalog."marts"."obt_sales"', [('marts', 'obt_sales')]),
+    ('SELECT * FROM marts.fct_sales f, marts.dim_product AS p, dim_date WHERE f.product_key = p.product_key',
+     [('adventureworks', 'dim_date'), ('marts', 'dim_product'), ('marts', 'fct_sales')]),
+    ('SELECT a, b FROM fct_sales GROUP BY a, b ORDER BY a, b', [('adventureworks', 'fct_sales')]),
+    ('WITH recent AS (SELECT * FROM marts.fct_sales), totals AS (SELECT * FROM recent) SELECT * FROM totals',
+     [('marts', 'fct_sales')]),
+    ("SELECT extract(year FROM orderdate), 'FROM fake' FROM marts.obt_sales", [('marts', 'obt_sales')]),
+    ('SELECT * FROM (SELECT * FROM marts.fct_sales) s JOIN marts.dim_date d ON s.date_key = d.date_key',
+     [('marts', 'dim_date'), ('marts', 'fct_sales')]),
+    # Una lista FROM con un item entre paréntesis no se interpreta
+    ('SELECT * FROM (SELECT * FROM marts.fct_sales) s, marts.dim_product p', None),
+    ('SELECT * FROM marts.fct_sales f, (select 1) z, marts.dim_date d', None),
+])
+def test_referenced_tables(sql, expected):
+    assert referenced_tables(sql) == expected
+
+
+def test_comma_joined_tables_are_all_versioned(tmp_path):
+    catalog = FakeCatalog({'marts': ['fct_sales', 'dim_product']})
+    cached = CachedQueryRunner(FakeRunner(), QueryCache(tmp_path), versions(catalog, tmp_path))
+    sql = 'SELECT count(*) FROM marts.fct_sales f, marts.dim_product p WHERE f.product_key = p.product_key'
+    key = cached.cache_key(sql)
+
+    # Cambia solo la segunda tabla de la lista: la clave tiene que cambiar
+    catalog.touch('marts', 'dim_product')
+    cached.versions = versions(catalog, tmp_path)
+    assert cached.cache_key(sql) != key
+
+
+def test_from_list_with_subquery_is_not_cached(tmp_path):
+    catalog = FakeCatalog({'marts': ['fct_sales', 'dim_date']})
+    cached = CachedQueryRunner(FakeRunner(), QueryCache(tmp_path), versions(catalog, tmp_path))
+    assert cached.cache_key('SELECT * FROM marts.fct_sales f, (select 1) z, marts.dim_date d') is None
+
+
+class FakeCatalog:
+    """GlueCatalog mínimo: tablas con UpdateTime que el test puede cambiar"""
+
+    def __init__(self, databases):
+        self.databases = {
+            database: {name: datetime(2024, 1, 1) for name in names} for database, names in databases.items()
+        }
+
+    def touch(self, database, name):
+        self.databases[database][name] = datetime(2024, 6, 1)
+
+    def tables(self, database, expression=None, max_age=None):
+        return [{'Name': name, 'UpdateTime': updated, 'Parameters': {}}
+                for name, updated in self.databases.get(database, {}).items()]
+
+
+class FakeRunner:
+    database = 'adventureworks'
+    work_group = None
+
+
+def versions(catalog, tmp_path):
+    return TableVersions(catalog, run_results_path=tmp_path / 'none.json', manifest_path=tmp_path / 'none.json')
+
+
+def expect_query(stubber, execution_id, state='SUCCEEDED', rows=(), scanned=1024):
+    stubber.add_response('start_query_execution', {'QueryExecutionId': execution_id},
+                         {'QueryString': ANY, 'QueryExecutionContext': ANY, 'ResultConfiguration': ANY})
+    status = {'State': state}
+    if state != 'SUCCEEDED':
+        status['StateChangeReason'] = 'boom'
+    stubber.add_response('batch_get_query_execution', {'QueryExecutions': [{
+        'QueryExecutionId': execution_id, 'Status': status, 'Statistics': {'DataScannedInBytes': scanned},
+    }]}, {'QueryExecutionIds': [execution_id]})
+    if state == 'SUCCEEDED':
+        result_rows = [['n']] + [list(row) for row in rows]
+        stubber.add_response('get_query_results', {'ResultSet': {'Rows': [
+            {'Data': [{'VarCharValue': value} for value in row]} for row in result_rows
+        ]}}, {'QueryExecutionId': execution_id})
+
+
+@pytest.fixture
+def cached_runner(stubbed_client, clock, tmp_path):
+    athena, stubber = stubbed_client('athena')
+    catalog = FakeCatalog({'marts': ['fct_sales']})
+    runner = AthenaQueryRunner(athena, 'adventureworks', 's3://bucket/athena-results/',
+                               sleep=clock.sleep, clock=clock)
+    cached = CachedQueryRunner(runner, QueryCache(tmp_path / 'cache'), versions(catalog, tmp_path))
+    return cached, stubber, catalog
+
+
+SQL = 'SELECT count(*) AS n FROM marts.fct_sales'
+
+
+def test_cache_hit_skips_athena(cached_runner):
+    cached, stubber, _ = cached_runner
+    expect_query(stubber, 'q1', rows=[['121317']])
+
+    assert cached.query(SQL) == [['121317']]
+    # Mismo SQL con otro formato: hit, sin llamadas a Athena (el Stubber fallaría)
+    assert cached.query('select COUNT(*) as n\n  from marts.fct_sales;') == [['121317']]
+    assert (cached.stats['misses'], cached.stats['hits']) == (1, 1)
+    assert cached.stats['bytes_saved'] == 1024
+
+
+def test_table_version_change_misses(cached_runner, tmp_path):
+    cached, stubber, catalog = cached_runner
+    expect_query(stubber, 'q1', rows=[['100']])
+    expect_query(stubber, 'q2', rows=[['150']])
+
+    assert cached.query(SQL) == [['100']]
+    catalog.touch('marts', 'fct_sales')
+    cached.versions = versions(catalog, tmp_path)
+    assert cached.query(SQL) == [['150']]
+    assert (cached.stats['misses'], cached.stats['hits']) == (2, 0)
+
+
+def test_failed_query_is_not_cached(cached_runner):
+    cached, stubber, _ = cached_runner
+    expect_query(stubber, 'q1', state='FAILED')
+    expect_query(stubber, 'q2', rows=[['100']])
+
+    with pytest.raises(RuntimeError, match='FAILED: boom'):
+        cached.query(SQL)
+    assert cached.cache.entries() == []
+    assert cached.query(SQL) == [['100']]
+    assert len(cached.cache.entries()) == 1
+
+
+def test_uncacheable_query_always_runs(cached_runner):
+    cached, stubber, _ = cached_runner
+    expect_query(stubber, 'q1', rows=[['1']])
+    expect_query(stubber, 'q2', rows=[['1']])
+
+    for _ in range(2):
+        cached.query('SELECT count(*) FROM marts.fct_sales WHERE orderdate > current_date')
+    assert cached.stats['uncached'] == 2
+    assert cached.cache.entries() == []
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    cache = QueryCache(tmp_path)
+    for i, key in enumerate(['a', 'b', 'c']):
+        cache.put(key, {'rows': [['x' * 100]]})
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+    entry_size = cache._path('a').stat().st_size
+    cache.max_bytes = 3 * entry_size
+
+    # 'a' es la más vieja pero se usa ahora: la menos usada pasa a ser 'b'
+    assert cache.get('a') is not None
+    cache.put('d', {'rows': [['x' * 100]]})
+
+    assert sorted(path.stem for path, _, _ in cache.entries()) == ['a', 'c', 'd']
+    assert cache.get('b') is None
@@ -0,0 +1,96 @@
+"""Reescritura de queries sobre obt_sales a los rollups agg_sales_*"""
+
+import pytest
+
+from rollup_router import PROJECT_ROOT, SOURCE_TABLE, load_rollups, route, split_statements
+
+EXAMPLE_QUERIES = PROJECT_ROOT / 'docs' / 'EXAMPLE_QUERIES.sql'
+
+
+@pytest.fixture(scope='module')
+def rollups():
+    return load_rollups()
+
+
+def example_queries():
+    """Queries de docs/EXAMPLE_QUERIES.sql que leen de obt_sales"""
+    statements = split_statements(EXAMPLE_QUERIES.read_text(encoding='utf-8'))
+    return [s for s in statements if SOURCE_TABLE in s.lower()]
+
+
+@pytest.mark.parametrize('sql', [
+    'SELECT * FROM obt_sales',
+    'SELECT * FROM adventureworks.marts.obt_sales LIMIT 10',
+    'SELECT obt_sales.* FROM obt_sales GROUP BY country_name',
+    'SELECT country_name FROM obt_sales',
+    "SELECT country_name, revenue FROM obt_sales WHERE country_name = 'Canada'",
+    'SELECT country_name, SUM(revenue) OVER () FROM obt_sales',
+])
+def test_rows_of_obt_sales_are_not_routed(sql, rollups):
+    result = route(sql, rollups)
+    assert result['rollup'] is None
+    assert result['sql'] == sql
+
+
+def test_select_of_only_aggregates_is_routed(rollups):
+    result = route("SELECT COUNT(*) AS items, SUM(revenue), 'total' FROM obt_sales", rollups)
+    assert result['rollup'] == 'agg_sales_monthly_country'
+    assert result['sql'] == (
+        "SELECT\n"
+        "    SUM(items) AS items,\n"
+        "    SUM(revenue),\n"
+        "    'total'\n"
+        "FROM agg_sales_monthly_country"
+    )
+
+
+def test_distinct_orders_are_not_summed_over_products(rollups):
+    # Una orden tiene varios productos: sumar orders por producto la cuenta varias veces
+    result = route(
+        'SELECT product_name, COUNT(DISTINCT salesorderid) FROM obt_sales GROUP BY product_name',
+        rollups,
+    )
+    assert result['rollup'] is None
+    assert 'agg_sales_daily_product: COUNT(DISTINCT salesorderid) no se puede sumar' in result['reason']
+
+
+def test_example_queries_rewrites(rollups):
+    results = [route(sql, rollups) for sql in example_queries()]
+    assert [r['rollup'] for r in results] == [
+        None,  # UNION ALL
+        'agg_sales_monthly_category',
+        'agg_sales_monthly_country',
+        'agg_sales_daily_product',
+        'agg_sales_monthly_country',
+        'agg_sales_daily_status',
+        'agg_sales_monthly_country',
+        'agg_sales_customer',
+        'agg_sales_daily_status',
+        None,  # COUNT(DISTINCT customerid)
+        None,  # SUM(revenue * 0.40)
+        None,  # CTE con join
+    ]
+    assert results[1]['sql'] == (
+        "SELECT\n"
+        "    product_category_name,\n"
+        "    SUM(orders) AS total_orders,\n"
+        "    SUM(items) AS total_items,\n"
+        "    SUM(orderqty) AS total_quantity,\n"
+        "    SUM(revenue) AS total_revenue,\n"
+        "    ROUND((SUM(unitprice_sum) / SUM(items)), 2) AS avg_unit_price\n"
+        "FROM adventureworks.marts.agg_sales_monthly_category\n"
+        "GROUP BY product_category_name\n"
+        "ORDER BY total_revenue DESC"
+    )
+    assert results[7]['sql'] == (
+        "SELECT\n"
+        "    fullname,\n"
+        "    SUM(orders) AS total_orders,\n"
+        "    SUM(revenue) AS total_revenue,\n"
+        "    ROUND((SUM(revenue) / SUM(items)), 2) AS avg_order_value\n"
+        "FROM adventureworks.marts.agg_sales_customer\n"
+        "WHERE fullname IS NOT NULL\n"
+        "GROUP BY fullname\n"
+        "ORDER BY total_revenue DESC\n"
+        "LIMIT 10"
+    )
@@ -0,0 +1,109 @@
+"""Reintentos de run_dbt por throttling de Athena"""
+
+import subprocess
+
+import pytest
+
+import run_dbt
+
+THROTTLED = 'TooManyRequestsException: Rate exceeded'
+
+
+def node(name, *parents):
+    return {'name': name, 'resource_type': 'model', 'depends_on': {'nodes': [f"model.aw.{p}" for p in parents]}}
+
+
+# stg → x → x_child y stg → y → y_child, y_grandchild; other no estaba en la selección
+MANIFEST = {'nodes': {
+    'model.aw.stg': node('stg'),
+    'model.aw.x': node('x', 'stg'),
+    'model.aw.x_child': node('x_child', 'x'),
+    'model.aw.y': node('y', 'stg'),
+    'model.aw.y_child': node('y_child', 'y'),
+    'model.aw.y_grandchild': node('y_grandchild', 'y_child'),
+    'model.aw.both': node('both', 'x', 'y'),
+    'model.aw.other': node('other', 'y'),
+}}
+
+
+def result(name, status, message=None):
+    return {'unique_id': f"model.aw.{name}", 'status': status, 'message': message}
+
+
+@pytest.fixture
+def dbt(monkeypatch):
+    """Reemplaza dbt: cada invocación devuelve el próximo (código, resultados)"""
+    invocations = []
+    attempts = []
+
+    def run(cmd, cwd=None):
+        invocations.append(cmd)
+        returncode, results = attempts[len(invocations) - 1]
+        monkeypatch.setattr(run_dbt, 'read_run_results', lambda since: results)
+        return subprocess.CompletedProcess(cmd, returncode)
+
+    monkeypatch.setattr(run_dbt.subprocess, 'run', run)
+    monkeypatch.setattr(run_dbt.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(run_dbt, 'dbt_command', lambda *args: ['dbt', *args])
+    return attempts, invocations
+
+
+def selection(cmd):
+    return cmd[cmd.index('--select') + 1:]
+
+
+def test_retry_keeps_failures_of_first_attempt(dbt):
+    attempts, invocations = dbt
+    attempts += [
+        (1, [result('stg', 'success'), result('x', 'error', 'SYNTAX_ERROR: line 1:8'),
+             result('y', 'error', THROTTLED), result('x_child', 'skipped'), result('y_child', 'skipped'),
+             result('y_grandchild', 'skipped'), result('both', 'skipped')]),
+        (0, [result('y', 'success'), result('y_child', 'success'), result('y_grandchild', 'success')]),
+    ]
+
+    returncode, results = run_dbt.run_with_retries(
+        'run', 'athena', 8, ['--select', 'stg+', '--exclude', 'other'], 'athena', MANIFEST)
+
+    # Solo y y los hijos que se saltaron por ella; both también depende de x, que falló
+    assert selection(invocations[1]) == ['y', 'y_child', 'y_grandchild']
+    assert '--exclude' in invocations[1] and '--threads' in invocations[1]
+    assert invocations[1][invocations[1].index('--threads') + 1] == '4'
+    assert returncode == 1
+    assert results['model.aw.x']['status'] == 'error'
+    assert results['model.aw.y']['status'] == 'success'
+    assert results['model.aw.both']['status'] == 'skipped'
+
+
+def test_retry_does_not_add_nodes_outside_selection(dbt):
+    attempts, invocations = dbt
+    attempts += [
+        (1, [result('y', 'error', THROTTLED), result('y_child', 'skipped')]),
+        (0, [result('y', 'success'), result('y_child', 'success')]),
+    ]
+
+    returncode, _ = run_dbt.run_with_retries('run', 'athena', 2, ['-s', 'y', 'y_child'], 'athena', MANIFEST)
+
+    # Con y+ se hubieran ejecutado y_grandchild, both y other
+    assert selection(invocations[1]) == ['y', 'y_child']
+    assert returncode == 0
+
+
+def test_gives_up_after_max_retries(dbt):
+    attempts, invocations = dbt
+    attempts += [(1, [result('y', 'error', THROTTLED)])] * 3
+
+    returncode, results = run_dbt.run_with_retries('run', 'athena', 8, [], 'athena', MANIFEST, max_retries=2)
+
+    assert len(invocations) == 3
+    assert returncode == 1
+    assert results['model.aw.y']['status'] == 'error'
+
+
+def test_other_adapters_are_not_retried(dbt):
+    attempts, invocations = dbt
+    attempts += [(1, [result('y', 'error', THROTTLED)])]
+
+    returncode, _ = run_dbt.run_with_retries('run', 'duckdb', 8, [], 'duckdb', MANIFEST)
+
+    assert len(invocations) == 1
+    assert returncode == 1
@@ -0,0 +1,32 @@
+"""Inferencia de tipos de los seeds"""
+
+import pytest
+
+from schema_inference import infer_type_from_value, profile_rows
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('0', 'bigint'),
+    ('42', 'bigint'),
+    ('-7', 'bigint'),
+    ('007', 'string'),
+    ('00', 'string'),
+    ('-01', 'string'),
+    ('0.5', 'double'),
+    ('2024.994', 'double'),
+    ('1e3', 'double'),
+    ('99999999999999999999', 'string'),
+    ('2011-05-31', 'date'),
+    ('2011-05-31 00:00:00', 'timestamp'),
+    ('10-4020-000676', 'string'),
+    ('', 'string'),
+])
+def test_infer_type_from_value(value, expected):
+    assert infer_type_from_value(value) == expected
+
+
+def test_zero_padded_codes_keep_column_as_string():
+    # Un código con ceros a la izquierda en cualquier fila vuelve string toda la columna
+    profiles = profile_rows([['0', '1'], ['007', '2.5'], ['12', '']], ['postalcode', 'amount'])
+    assert [(p.name, p.sql_type) for p in profiles] == [('postalcode', 'string'), ('amount', 'double')]
+    assert profiles[1].nulls == 1
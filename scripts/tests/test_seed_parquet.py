@@ -0,0 +1,124 @@
+"""Conversión de seeds a Parquet: particiones order_year/order_month y DDL con partition projection"""
+
+import json
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+from seed_parquet import build_parquet_ddl, convert_all
+
+S3_LOCATION = 's3://dbt-adventureworks-raw-123456789012/sales/salesorderheader/'
+
+SEEDS = {
+    'sales/salesorderheader.csv': """salesorderid,orderdate,totaldue
+1,2011-05-31 00:00:00,10.5
+2,2011-06-01 00:00:00,20.25
+3,2012-12-30 00:00:00,7.0
+4,,1.0
+""",
+    # La línea 13 no tiene header: se particiona por su propia modifieddate
+    'sales/salesorderdetail.csv': """salesorderid,salesorderdetailid,modifieddate
+1,10,2011-06-07 00:00:00
+1,11,2011-06-07 00:00:00
+3,12,2013-01-02 00:00:00
+9,13,2011-07-01 00:00:00
+""",
+    'production/product.csv': """productid,name,productnumber
+1,Adjustable Race,AR-5381
+2,Bearing Ball,BA-8327
+""",
+}
+
+
+@pytest.fixture
+def converted(tmp_path):
+    seeds_path = tmp_path / 'seeds'
+    for name, content in SEEDS.items():
+        path = seeds_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    output_dir = tmp_path / 'parquet'
+    tables = convert_all(seeds_path, output_dir)
+    return tables, output_dir
+
+
+def parquet_files(table_dir):
+    return sorted(p.relative_to(table_dir).as_posix() for p in table_dir.glob('**/*.parquet'))
+
+
+def test_orders_are_partitioned_by_order_year_and_month(converted):
+    tables, output_dir = converted
+
+    assert parquet_files(output_dir / 'sales' / 'salesorderheader') == [
+        'order_year=2011/order_month=05/salesorderheader.parquet',
+        'order_year=2011/order_month=06/salesorderheader.parquet',
+        'order_year=2012/order_month=12/salesorderheader.parquet',
+    ]
+    # Las líneas van a la partición de la fecha de su orden, no de su modifieddate
+    assert parquet_files(output_dir / 'sales' / 'salesorderdetail') == [
+        'order_year=2011/order_month=05/salesorderdetail.parquet',
+        'order_year=2011/order_month=07/salesorderdetail.parquet',
+        'order_year=2012/order_month=12/salesorderdetail.parquet',
+    ]
+    assert parquet_files(output_dir / 'production' / 'product') == ['product.parquet']
+    assert tables['salesorderheader']['partition']['year_range'] == [2011, 2012]
+    assert tables['salesorderdetail']['partition']['year_range'] == [2011, 2012]
+    assert 'partition' not in tables['product']
+    assert json.loads((output_dir / 'schema.json').read_text()) == json.loads(json.dumps(tables))
+
+
+def test_partition_files_have_typed_columns(converted):
+    _, output_dir = converted
+    path = output_dir / 'sales' / 'salesorderdetail' / 'order_year=2011' / 'order_month=05' / 'salesorderdetail.parquet'
+    table = pq.read_table(path)
+
+    # Las columnas de partición no se repiten dentro del archivo
+    assert table.schema == pa.schema([
+        ('salesorderid', pa.int64()), ('salesorderdetailid', pa.int64()), ('modifieddate', pa.timestamp('ms')),
+    ])
+    assert table.column('salesorderdetailid').to_pylist() == [10, 11]
+    assert pq.ParquetFile(path).metadata.row_group(0).column(0).compression == 'ZSTD'
+
+    # Leída como dataset Hive, la tabla tiene todas las filas con fecha de orden (la orden 4 no tiene)
+    header = pq.read_table(output_dir / 'sales' / 'salesorderheader', partitioning='hive')
+    assert sorted(header.column('salesorderid').to_pylist()) == [1, 2, 3]
+    assert sorted(zip(header.column('order_year').to_pylist(), header.column('order_month').to_pylist())) == [
+        (2011, 5), (2011, 6), (2012, 12),
+    ]
+
+
+def test_ddl_projects_the_written_partitions(converted):
+    tables, output_dir = converted
+    ddl = build_parquet_ddl('adventureworks', 'salesorderheader', tables['salesorderheader'], S3_LOCATION)
+
+    assert 'CREATE EXTERNAL TABLE adventureworks.salesorderheader (' in ddl
+    assert '`salesorderid` bigint,\n        `orderdate` timestamp,\n        `totaldue` double\n' in ddl
+    assert 'PARTITIONED BY (`order_year` int, `order_month` int)' in ddl
+    assert f"LOCATION '{S3_LOCATION}'" in ddl
+    for prop in ("'parquet.compression'='ZSTD'", "'projection.enabled'='true'",
+                 "'projection.order_year.type'='integer'", "'projection.order_year.range'='2011,2012'",
+                 "'projection.order_month.type'='integer'", "'projection.order_month.range'='1,12'",
+                 "'projection.order_month.digits'='2'"):
+        assert prop in ddl
+
+    # La plantilla de ubicación tiene que apuntar a los directorios que escribe la conversión
+    template = f"{S3_LOCATION}order_year=${{order_year}}/order_month=${{order_month}}/"
+    assert f"'storage.location.template'='{template}'" in ddl
+    written = {
+        S3_LOCATION + path.rsplit('/', 1)[0] + '/'
+        for path in parquet_files(output_dir / 'sales' / 'salesorderheader')
+    }
+    projected = {template.replace('${order_year}', str(year)).replace('${order_month}', f"{month:02d}")
+                 for year, month in [(2011, 5), (2011, 6), (2012, 12)]}
+    assert written == projected
+
+
+def test_ddl_without_partitions(converted):
+    tables, _ = converted
+    ddl = build_parquet_ddl('adventureworks', 'product', tables['product'], 's3://bucket/production/product/')
+
+    assert 'PARTITIONED BY' not in ddl
+    assert 'projection' not in ddl
+    assert "'parquet.compression'='ZSTD'" in ddl
@@ -0,0 +1,90 @@
+"""Sincronización de seeds: qué tablas se reconvierten y suben cuando cambia un CSV"""
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+import seed_parquet
+import sync_seeds
+
+HEADER_COLUMNS = 'salesorderid,orderdate,modifieddate'
+DETAIL_CSV = """salesorderid,salesorderdetailid,modifieddate
+1,10,2011-05-31 00:00:00
+1,11,2011-05-31 00:00:00
+2,12,2011-06-01 00:00:00
+"""
+
+
+def write_seeds(seeds_path, order_1_date):
+    sales = seeds_path / 'sales'
+    sales.mkdir(parents=True, exist_ok=True)
+    (sales / 'salesorderheader.csv').write_text(
+        f"{HEADER_COLUMNS}\n"
+        f"1,{order_1_date},2011-06-07 00:00:00\n"
+        f"2,2011-06-01 00:00:00,2011-06-07 00:00:00\n"
+    )
+    (sales / 'salesorderdetail.csv').write_text(DETAIL_CSV)
+
+
+def detail_partitions(output_dir):
+    table_dir = output_dir / 'sales' / 'salesorderdetail'
+    return sorted(p.relative_to(table_dir).as_posix() for p in table_dir.glob('**/*.parquet'))
+
+
+@pytest.fixture
+def seeds(tmp_path, monkeypatch):
+    """Seeds en tmp_path y conversión a tmp_path/parquet"""
+    seeds_path = tmp_path / 'seeds'
+    output_dir = tmp_path / 'parquet'
+    write_seeds(seeds_path, '2011-05-31 00:00:00')
+
+    convert_all = seed_parquet.convert_all
+    monkeypatch.setattr(seed_parquet, 'DEFAULT_OUTPUT', output_dir)
+    monkeypatch.setattr(seed_parquet, 'convert_all',
+                        lambda output_dir, only=None: convert_all(seeds_path, output_dir, only))
+    monkeypatch.setenv('AWS_ACCOUNT_ID', '123456789012')
+    return seeds_path, output_dir
+
+
+def test_convert_only_header_repartitions_detail(seeds):
+    seeds_path, output_dir = seeds
+    seed_parquet.convert_all(output_dir)
+    assert 'order_year=2011/order_month=05/salesorderdetail.parquet' in detail_partitions(output_dir)
+
+    write_seeds(seeds_path, '2012-07-15 00:00:00')
+    tables = seed_parquet.convert_all(output_dir, only={'salesorderheader'})
+
+    assert set(tables) == {'salesorderheader', 'salesorderdetail'}
+    assert detail_partitions(output_dir) == [
+        'order_year=2011/order_month=06/salesorderdetail.parquet',
+        'order_year=2012/order_month=07/salesorderdetail.parquet',
+    ]
+
+
+def test_header_change_replans_detail(seeds):
+    seeds_path, output_dir = seeds
+    first = sync_seeds.local_state(sync_seeds.find_seeds(seeds_path), {}, 'parquet')
+    previous = {
+        table: {k: entry[k] for k in ('source_sha256', 'files', 'info', 'ddl_sha256')}
+        for table, entry in first.items()
+    }
+
+    # Solo cambia el CSV del header: la orden 1 pasa a julio de 2012
+    write_seeds(seeds_path, '2012-07-15 00:00:00')
+    state = sync_seeds.local_state(sync_seeds.find_seeds(seeds_path), previous, 'parquet')
+    plan = sync_seeds.plan_sync(previous, state, {'salesorderheader', 'salesorderdetail'})
+
+    assert state['salesorderdetail']['source_sha256'] == previous['salesorderdetail']['source_sha256']
+    assert plan['salesorderdetail']['uploads'] == ['order_year=2012/order_month=07/salesorderdetail.parquet']
+    assert plan['salesorderdetail']['deletes'] == ['order_year=2011/order_month=05/salesorderdetail.parquet']
+
+
+def test_unchanged_seeds_plan_nothing(seeds):
+    seeds_path, _ = seeds
+    first = sync_seeds.local_state(sync_seeds.find_seeds(seeds_path), {}, 'parquet')
+    previous = {
+        table: {k: entry[k] for k in ('source_sha256', 'files', 'info', 'ddl_sha256')}
+        for table, entry in first.items()
+    }
+    state = sync_seeds.local_state(sync_seeds.find_seeds(seeds_path), previous, 'parquet')
+    assert sync_seeds.plan_sync(previous, state, {'salesorderheader', 'salesorderdetail'}) == {}
@@ -2,23 +2,37 @@
 """
 Script de verificación post-deployment para estudiantes.
 Verifica que todas las tablas se hayan creado correctamente en Athena.
+
+Las filas de cada mart se leen de la metadata cuando está disponible (las
+filas escritas por dbt en target/run_results.json, o las estadísticas de la
+tabla en Glue); las que falten se cuentan con una sola query UNION ALL.
+Con --count-mode query se cuentan siempre con la query.
+
+Uso:
+    python scripts/verify_deployment.py [--count-mode metadata|query]
 """
 
-import boto3
+import argparse
+import json
 import sys
-import os
-from datetime import datetime
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import aws_session
+from athena_runner import AthenaQueryRunner
+from glue_catalog import GlueCatalog
+from query_cache import CachedQueryRunner, TableVersions
 
 # Configuración
-AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+AWS_REGION = aws_session.AWS_REGION
 ATHENA_DATABASE = 'adventureworks'
+MARTS_SCHEMA = 'marts'
+# Filtro de Glue (estilo Hive) para las tablas del modelo dimensional
+MARTS_EXPRESSION = 'dim_*|fct_*|obt_*|agg_*'
+DBT_TARGET_PATH = Path(__file__).parent.parent / 'adventureworks' / 'target'
 
-# Obtener Account ID
-sts = boto3.client('sts', region_name=AWS_REGION)
-account_id = sts.get_caller_identity()['Account']
-
-SILVER_BUCKET = f"dbt-adventureworks-silver-{account_id}"
-ATHENA_OUTPUT = f"s3://{SILVER_BUCKET}/athena-results/"
+# Margen entre el fin de un modelo en dbt y la última modificación de su tabla en Glue
+GLUE_UPDATE_SLACK = timedelta(minutes=2)
 
 # Colores para terminal
 GREEN = '\033[92m'
@@ -42,73 +56,144 @@ def print_warning(text):
     print(f"{YELLOW}⚠{RESET} {text}")
 
 def get_glue_client():
-    return boto3.client('glue', region_name=AWS_REGION)
+    return aws_session.client('glue')
 
-def get_tables_in_schema(glue_client, schema_name='marts'):
-    """Obtener lista de tablas en un schema específico"""
+def get_tables_in_schema(catalog, schema_name=ATHENA_DATABASE, expression=None):
+    """Obtener lista de tablas de una database de Glue (todas las páginas, filtradas por nombre)"""
     try:
-        response = glue_client.get_tables(DatabaseName=ATHENA_DATABASE)
-        tables = response.get('TableList', [])
-        
-        # Filtrar por schema si está especificado
-        if schema_name:
-            tables = [t for t in tables if t.get('StorageDescriptor', {}).get('Location', '').endswith(f'/{schema_name}/') or schema_name in t.get('Name', '')]
-        
-        return [t['Name'] for t in tables]
+        return catalog.table_names(schema_name, expression)
     except Exception as e:
         print_error(f"Error obteniendo tablas: {e}")
         return []
 
-def count_records(athena_client, table_name):
-    """Contar registros en una tabla"""
+def parse_timestamp(value):
+    """datetime con zona horaria desde un ISO de dbt (terminado en Z)"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')) if value else None
+
+def dbt_row_counts(target_path=DBT_TARGET_PATH):
+    """
+    Filas escritas por cada modelo en la última corrida de dbt: {tabla: (filas, completed_at)}.
+
+    Solo valen los modelos reconstruidos completos (tablas, o incrementales con
+    --full-refresh): un merge incremental informa solo las filas que procesó.
+    """
+    run_results_path = Path(target_path) / 'run_results.json'
+    manifest_path = Path(target_path) / 'manifest.json'
+    if not run_results_path.exists() or not manifest_path.exists():
+        return {}
+
+    run_results = json.loads(run_results_path.read_text())
+    nodes = json.loads(manifest_path.read_text()).get('nodes', {})
+    full_refresh = bool(run_results.get('args', {}).get('full_refresh'))
+
+    counts = {}
+    for result in run_results.get('results', []):
+        node = nodes.get(result.get('unique_id'))
+        if node is None or node.get('resource_type') != 'model' or result.get('status') != 'success':
+            continue
+        materialized = node.get('config', {}).get('materialized')
+        if materialized != 'table' and not (materialized == 'incremental' and full_refresh):
+            continue
+        rows = (result.get('adapter_response') or {}).get('rows_affected')
+        if not isinstance(rows, int) or rows < 0:
+            continue
+        completed = [t.get('completed_at') for t in result.get('timing', []) if t.get('name') == 'execute']
+        counts[node.get('alias') or node['name']] = (rows, parse_timestamp(completed[0]) if completed else None)
+    return counts
+
+def glue_table_metadata(catalog, database=MARTS_SCHEMA):
+    """Metadata de Glue de las tablas de una database: {tabla: dict de get_tables}"""
     try:
-        query = f"SELECT COUNT(*) as count FROM {ATHENA_DATABASE}.marts.{table_name}"
-        
-        response = athena_client.start_query_execution(
-            QueryString=query,
-            QueryExecutionContext={'Database': ATHENA_DATABASE},
-            ResultConfiguration={'OutputLocation': ATHENA_OUTPUT}
-        )
-        
-        query_execution_id = response['QueryExecutionId']
-        
-        # Esperar resultado
-        import time
-        max_wait = 30
-        waited = 0
-        while waited < max_wait:
-            status_response = athena_client.get_query_execution(QueryExecutionId=query_execution_id)
-            status = status_response['QueryExecution']['Status']['State']
-            
-            if status in ['SUCCEEDED', 'FAILED', 'CANCELLED']:
-                break
-            
-            time.sleep(1)
-            waited += 1
-        
-        if status == 'SUCCEEDED':
-            results = athena_client.get_query_results(QueryExecutionId=query_execution_id)
-            count = results['ResultSet']['Rows'][1]['Data'][0]['VarCharValue']
-            return int(count)
-        else:
-            return -1
-            
+        return {t['Name']: t for t in catalog.tables(database, MARTS_EXPRESSION)}
+    except Exception:
+        return {}
+
+def glue_statistics(table):
+    """(filas, bytes) de los parámetros de la tabla en Glue (None si no están)"""
+    parameters = table.get('Parameters', {})
+    rows = parameters.get('numRows') or parameters.get('recordCount')
+    size = parameters.get('totalSize')
+    return (
+        int(rows) if rows not in (None, '', '-1') else None,
+        int(size) if size not in (None, '', '-1') else None,
+    )
+
+def metadata_counts(tables, glue_tables, dbt_counts):
+    """
+    {tabla: (filas, bytes, origen)} para las tablas con conteo en la metadata.
+
+    El conteo de dbt se descarta si la tabla cambió en Glue después de esa corrida
+    (otro deploy o una corrida incremental posterior).
+    """
+    counts = {}
+    for table in tables:
+        metadata = glue_tables.get(table, {})
+        rows, size = glue_statistics(metadata)
+
+        if table in dbt_counts:
+            dbt_rows, completed_at = dbt_counts[table]
+            updated_at = metadata.get('UpdateTime') or metadata.get('CreateTime')
+            if completed_at is None or updated_at is None or updated_at <= completed_at + GLUE_UPDATE_SLACK:
+                counts[table] = (dbt_rows, size, 'dbt run_results')
+                continue
+
+        if rows is not None:
+            counts[table] = (rows, size, 'estadísticas de Glue')
+    return counts
+
+def count_records(runner, tables):
+    """
+    Contar registros de varias tablas con una sola query UNION ALL
+    (con caché: sin cambios en las tablas no se vuelve a consultar).
+    Retorna {tabla: filas}; las que no se pudieron contar quedan fuera.
+    """
+    if not tables:
+        return {}
+    query = "\nUNION ALL\n".join(
+        f"SELECT '{table}' AS table_name, COUNT(*) AS row_count FROM {ATHENA_DATABASE}.{MARTS_SCHEMA}.{table}"
+        for table in tables
+    )
+    try:
+        rows = runner.query(query, label='row_counts')
     except Exception as e:
-        return -1
+        print_warning(f"No se pudieron contar registros: {e}")
+        return {}
+    return {table: int(count) for table, count in rows}
+
+def row_counts(runner, catalog, tables, mode='metadata'):
+    """{tabla: (filas, bytes, origen)}: metadata primero y una query para el resto"""
+    counts = {}
+    if mode == 'metadata':
+        counts = metadata_counts(tables, glue_table_metadata(catalog), dbt_row_counts())
+
+    missing = [table for table in tables if table not in counts]
+    for table, rows in count_records(runner, missing).items():
+        counts[table] = (rows, None, 'COUNT(*)')
+    return counts
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Verificar el deployment en AWS')
+    parser.add_argument('--count-mode', choices=['metadata', 'query'], default='metadata',
+                        help='Filas desde la metadata (con query para las que falten) o siempre con query')
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
     print_header("🔍 Verificación de Deployment - dbt Dimensional Modelling")
     
     print(f"\n{BLUE}Configuración:{RESET}")
-    print(f"  Account ID: {account_id}")
+    print(f"  Account ID: {aws_session.account_id()}")
     print(f"  Región: {AWS_REGION}")
     print(f"  Database: {ATHENA_DATABASE}")
-    print(f"  Silver Bucket: {SILVER_BUCKET}")
+    print(f"  Silver Bucket: {aws_session.silver_bucket()}")
     
-    # Clientes AWS
+    # Clientes AWS (compartidos con los demás scripts del proceso)
     glue = get_glue_client()
-    athena = boto3.client('athena', region_name=AWS_REGION)
-    s3 = boto3.client('s3', region_name=AWS_REGION)
+    catalog = GlueCatalog(glue)
+    athena = aws_session.client('athena')
+    s3 = aws_session.client('s3')
+    runner = CachedQueryRunner(AthenaQueryRunner(athena, ATHENA_DATABASE, aws_session.athena_output()),
+                               versions=TableVersions(catalog))
     
     # 1. Verificar que exista la database
     print_header("1. Verificando Database")
@@ -123,9 +208,7 @@ def main():
     # 2. Verificar buckets S3
     print_header("2. Verificando Buckets S3")
     
-    raw_bucket = f"dbt-adventureworks-raw-{account_id}"
-    
-    for bucket_name in [raw_bucket, SILVER_BUCKET]:
+    for bucket_name in [aws_session.raw_bucket(), aws_session.silver_bucket()]:
         try:
             s3.head_bucket(Bucket=bucket_name)
             print_success(f"Bucket '{bucket_name}' existe")
@@ -140,11 +223,11 @@ def main():
         'address', 'countryregion', 'person', 'stateprovince',  # person
         'product', 'productcategory', 'productsubcategory',  # production
         'creditcard', 'customer', 'salesorderdetail', 'salesorderheader',  # sales
-        'salesorderheadersalesreason', 'salesreason', 'store',
+        'salesorderheadersalesreason', 'salesreason', 'store', 'orderstatus',
         'date'  # date
     ]
     
-    raw_tables = get_tables_in_schema(glue, schema_name=None)
+    raw_tables = get_tables_in_schema(catalog)
     
     missing_raw = []
     for table in expected_raw_tables:
@@ -169,23 +252,37 @@ def main():
         'dim_order_status': 'Dimensión de estados de orden',
         'dim_product': 'Dimensión de productos',
         'fct_sales': 'Tabla de hechos de ventas',
-        'obt_sales': 'One Big Table de ventas'
+        'obt_sales': 'One Big Table de ventas',
+        'agg_sales_monthly_country': 'Rollup mensual por país',
+        'agg_sales_monthly_category': 'Rollup mensual por categoría',
+        'agg_sales_daily_status': 'Rollup diario por estado y tarjeta',
+        'agg_sales_daily_product': 'Rollup diario por producto',
+        'agg_sales_customer': 'Rollup por cliente'
     }
     
-    marts_tables = [t for t in raw_tables if any(t.startswith(prefix) for prefix in ['dim_', 'fct_', 'obt_'])]
+    marts_tables = get_tables_in_schema(catalog, MARTS_SCHEMA, MARTS_EXPRESSION)
+    marts_tables += [t for t in raw_tables if any(t.startswith(prefix) for prefix in ['dim_', 'fct_', 'obt_', 'agg_'])]
     
     missing_marts = []
     results = []
     
+    present_marts = [
+        table for table in expected_marts
+        if table in marts_tables or f"marts.{table}" in marts_tables
+    ]
+    
+    # Contar registros (metadata primero, una sola query para el resto)
+    counts = row_counts(runner, catalog, present_marts, mode=args.count_mode)
+    
     for table, description in expected_marts.items():
-        if table in marts_tables or f"marts.{table}" in marts_tables:
+        if table in present_marts:
             print_success(f"✓ {table}: {description}")
             
-            # Contar registros
-            count = count_records(athena, table)
-            if count >= 0:
+            if table in counts:
+                count, size, source = counts[table]
                 results.append((table, count))
-                print(f"    Registros: {count:,}")
+                size_text = f", {size / 1024 ** 2:.1f} MB" if size is not None else ""
+                print(f"    Registros: {count:,}{size_text} ({source})")
             else:
                 print_warning(f"    No se pudo contar registros")
         else:
@@ -194,6 +291,7 @@ def main():
     
     # Resumen
     print_header("📊 RESUMEN")
+    print(f"  {runner.summary()}\n")
     
     if not missing_raw and not missing_marts:
         print_success("¡Todas las tablas están creadas correctamente!")
@@ -201,7 +299,7 @@ def main():
         if results:
             print(f"\n{BLUE}Conteo de registros:{RESET}")
             for table, count in sorted(results, key=lambda x: x[1], reverse=True):
-                print(f"  {table:20} {count:>10,} registros")
+                print(f"  {table:28} {count:>10,} registros")
         
         print(f"\n{GREEN}✅ Deployment exitoso!{RESET}")
         print(f"\n{BLUE}Próximos pasos:{RESET}")